@@ -2,7 +2,57 @@ import ctypes
 import ctypes.wintypes
 
 # For Python 3.8 and newer, specify the full path to St7API.dll below.
-_ST7API = ctypes.windll.LoadLibrary(r'C:\Program Files\Strand7 R31\Bin64\St7api.dll')
+ST7API_DLL_PATH = r'C:\Program Files\Strand7 R31\Bin64\St7api.dll'
+
+
+class _LazyFunction:
+    """Stand-in for an St7API.dll function until the DLL is first used.
+
+    The argtypes set below are recorded, and on the first call the real function is loaded, given the
+    recorded signature and rebound in this module, so later calls through St7API go straight to the DLL."""
+
+    def __init__(self, library, name):
+        self._library = library
+        self._name = name
+
+    def __call__(self, *args):
+        return self._library.load(self)(*args)
+
+    def __repr__(self):
+        return f"<lazy St7API function {self._name}>"
+
+
+class _LazyLibrary:
+    """Defers ctypes.windll.LoadLibrary until a Strand7 function is called, so that this module (and the
+    modules importing it) can be imported where the DLL is not available."""
+
+    def __init__(self, path):
+        self._path = path
+        self._dll = None
+        self._functions = {}
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _LazyFunction(self, name)
+
+    def load(self, lazy_function):
+        function = self._functions.get(lazy_function._name)
+        if function is None:
+            if self._dll is None:
+                if not hasattr(ctypes, "windll"):
+                    raise OSError(f"St7API.dll can only be loaded on Windows (calling {lazy_function._name}).")
+                self._dll = ctypes.windll.LoadLibrary(self._path)
+            function = getattr(self._dll, lazy_function._name)
+            for attribute in ("argtypes", "restype", "errcheck"):
+                if attribute in lazy_function.__dict__:
+                    setattr(function, attribute, lazy_function.__dict__[attribute])
+            self._functions[lazy_function._name] = function
+            globals()[lazy_function._name] = function
+        return function
+
+
+_ST7API = _LazyLibrary(ST7API_DLL_PATH)
 
 lmMessageBox = 0
 lmWaitRetry = 1
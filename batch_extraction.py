@@ -0,0 +1,660 @@
+"""
+batch_extraction.py
+
+Headless runner extracting many Strand7 models (permanent, SIF and ALS removal models) to Parquet from a
+manifest, as an alternative to the one-model-at-a-time file dialogs of database_extraction.py.
+
+The manifest is a CSV file with the columns ModelFile, ResultFile and Directory (relative paths are taken
+from the manifest's folder). Optional columns named after the ResultType labels (e.g. "Beam Forces") hold
+TRUE/FALSE to select the result types for that model; result types without a column are extracted. Optional
+Version and Model columns write the model into a hive-partitioned dataset under Directory instead
+(Directory/version=<Version>/model=<Model>/result=<name>/), which parquet_views.hive_source reads as one table.
+
+With --dry-run, the models are opened but no results are read, and the summary instead holds the predicted
+rows and file sizes of each result type (see database_extraction.estimate_model_data). Every extraction writes
+an extraction_report.json of its rows, timings and sizes alongside its files. With --pipelined, the Parquet
+encoding of each model overlaps its Strand7 API calls (see database_extraction.parquet_insert). With
+--envelopes, each model also gets a beam_force_envelope.parquet of the extremes of every beam and station.
+--storage-profile chooses the encoding of the files (see database_extraction.STORAGE_PROFILES). With
+--results-only, the results of models already extracted with --results-only are re-extracted from the result
+file alone, using the model_topology.parquet snapshot written by that extraction instead of loading the model
+(see database_extraction.extract_result_file_data), e.g. after a re-solve.
+
+Every file records a fingerprint of the model and result files and the options it was written with (see
+database_extraction.get_input_fingerprint), and the result types whose files still match are skipped, so a
+re-run after re-solving some of the models only re-extracts what changed. --force extracts everything.
+
+With --queue, the manifest's jobs are added to a shared queue folder as one JSON file each, and the runner then
+claims jobs from the queue until none are pending, so runners on any number of workstations drain the same
+queue (a runner given only --queue just claims jobs). A job is claimed by renaming its file, which only one
+runner can do, and its claim is touched as a heartbeat while it runs; a claim left without a heartbeat for
+--stale-after seconds is re-queued. Each extraction is staged beside its output directory and published file
+by file with atomic renames once complete. The manifest paths must resolve to the same files on every machine
+(e.g. UNC paths).
+
+Example:
+    python batch_extraction.py "ALS Manifest.csv" --licences 4 --workers-per-model 2
+    python batch_extraction.py "ALS Manifest.csv" --queue "//server/extraction_queue" --enqueue-only
+    python batch_extraction.py --queue "//server/extraction_queue" --licences 2
+    python batch_extraction.py "ALS Manifest.csv" --dry-run --previous-report "V1_4_5_LB_Gmax/extraction_report.json"
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from getpass import getuser
+from typing import Union
+
+from database_extraction import (MODEL_TOPOLOGY_FILE, STORAGE_PROFILES, ResultType, estimate_model_data,
+                                 extract_model_data, extract_model_data_parallel, extract_result_file_data,
+                                 get_input_fingerprint, is_up_to_date, logger, setup_logging)
+from parquet_views import BEAM_FORCE_ENVELOPE_FILE, get_partition_directory, get_result_file
+
+
+@dataclass(slots=True, frozen=True)
+class ExtractionJob:
+    """Class to encapsulate a single model extraction listed in the manifest."""
+    model_file: pathlib.Path
+    result_file: pathlib.Path
+    directory: pathlib.Path
+    output_options: dict = None
+    partition: dict = None
+
+
+def read_manifest(manifest_fp: Union[str, pathlib.Path]) -> list[ExtractionJob]:
+    """Reads the extraction jobs from a manifest CSV file."""
+    manifest_fp = pathlib.Path(manifest_fp)
+    labels = [rt.label for rt in ResultType]
+
+    jobs = []
+    with open(manifest_fp, newline="") as f:
+        for row in csv.DictReader(f):
+            paths = [manifest_fp.parent / row[column].strip() for column in ("ModelFile", "ResultFile", "Directory")]
+
+            output_options = None
+            if any(label in row for label in labels):
+                output_options = {label: (row.get(label) or "TRUE").strip().upper() for label in labels}
+
+            partition = None
+            if row.get("Version") or row.get("Model"):
+                partition = {"version": row["Version"].strip(), "model": row["Model"].strip()}
+
+            jobs.append(ExtractionJob(*paths, output_options=output_options, partition=partition))
+
+    return jobs
+
+
+def _lock_file(handle) -> bool:
+    """Takes a non-blocking OS lock on an open file, which is released by the OS if the process dies."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock_file(handle):
+    if os.name == "nt":
+        import msvcrt
+        handle.seek(0)
+        msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    handle.close()
+
+
+@contextmanager
+def licence_slots(licence_directory: pathlib.Path, licences: int, count: int = 1, poll_interval: float = 10.0):
+    """Holds `count` of the machine's `licences` Strand7 licence slots for the duration of the context.
+
+    Each slot is a lock file in `licence_directory`, so runners started separately on the same machine share
+    the limit as long as they use the same folder. Either all the slots are taken or none are, so two jobs
+    can never deadlock holding part of what they need."""
+
+    if count > licences:
+        raise ValueError(f"A job needing {count} licences can never run with a limit of {licences}.")
+
+    licence_directory.mkdir(parents=True, exist_ok=True)
+    while True:
+        held = []
+        for slot in range(licences):
+            handle = open(licence_directory / f"slot_{slot}.lock", "a+")
+            if _lock_file(handle):
+                held.append(handle)
+                if len(held) == count:
+                    break
+            else:
+                handle.close()
+
+        if len(held) == count:
+            break
+
+        for handle in held:
+            _unlock_file(handle)
+        time.sleep(poll_interval)
+
+    try:
+        yield
+    finally:
+        for handle in held:
+            _unlock_file(handle)
+
+
+def get_unchanged_result_types(job: ExtractionJob, schema_version: int = 1, envelopes: bool = False,
+                               storage_profile: str = None, all_reaction_nodes: bool = False,
+                               results_only: bool = False) -> list[ResultType]:
+    """Returns the result types selected for the job whose files were written from the same model and result
+    files with the same options, in the same mode (see run_extraction_job), which would be extracted the same
+    again. The beam forces are only unchanged if their envelope is also there when envelopes are accumulated."""
+    directory = job.directory if job.partition is None else get_partition_directory(job.directory, job.partition)
+    hive = job.partition is not None
+    result_file_only = results_only and (directory / MODEL_TOPOLOGY_FILE).exists()
+    unchanged = []
+    for rt in ResultType:
+        if job.output_options is not None and job.output_options[rt.label] != "TRUE":
+            continue
+        fingerprint = get_input_fingerprint(job.model_file, job.result_file, rt, schema_version,
+                                            storage_profile=storage_profile, all_nodes=all_reaction_nodes,
+                                            envelopes=envelopes, result_file_only=result_file_only)
+        if not is_up_to_date(get_result_file(directory, rt.file_name, hive), fingerprint):
+            continue
+        envelope_file = get_result_file(directory, BEAM_FORCE_ENVELOPE_FILE, hive)
+        if envelopes and rt is ResultType.BEAM_FORCES and not envelope_file.exists():
+            continue
+        unchanged.append(rt)
+    return unchanged
+
+
+def get_staging_directory(job: ExtractionJob) -> pathlib.Path:
+    """Gets the folder a staged extraction is written to, beside the output directory (so on the same share and
+    outside any hive-partitioned dataset) and unique to this process."""
+    return job.directory.parent / f".{job.directory.name}.{job.model_file.stem}.{socket.gethostname()}-{os.getpid()}"
+
+
+def publish_staged(staging_directory: pathlib.Path, directory: pathlib.Path):
+    """Moves every file of a staged extraction into the output directory, keeping its relative path.
+
+    Each file is replaced with an atomic rename, so a reader never sees a partly written file, and a model
+    extracted by two workers at once ends up with the files of whichever finished last."""
+    for staged_file in sorted(p for p in staging_directory.rglob("*") if p.is_file()):
+        destination = directory / staged_file.relative_to(staging_directory)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged_file, destination)
+    shutil.rmtree(staging_directory, ignore_errors=True)
+
+
+def run_extraction_job(job: ExtractionJob, scratch_path: pathlib.Path, licence_directory: pathlib.Path,
+                       licences: int, workers_per_model: int = 1, schema_version: int = 1,
+                       pipelined: bool = False, envelopes: bool = False, storage_profile: str = None,
+                       all_reaction_nodes: bool = False, fused: bool = False, results_only: bool = False,
+                       force: bool = False, staged: bool = False) -> dict:
+    """Runs one model extraction once its licence slots are free and returns its summary row.
+
+    The result types whose files are unchanged (see get_unchanged_result_types) are skipped unless force, and a
+    model with nothing to extract does not wait for a licence. If results_only, a model with a topology snapshot
+    from an earlier extraction only has its results re-extracted from the result file, and any other model is
+    extracted in full, writing its snapshot. If staged, the files are written to a staging folder beside the
+    output directory and only moved into place once the whole extraction has succeeded (see publish_staged)."""
+
+    # Concurrent models cannot share a Strand7 scratch folder
+    job_scratch_path = scratch_path / job.model_file.stem
+    job_scratch_path.mkdir(parents=True, exist_ok=True)
+    log_directory = job.directory if job.partition is None else get_partition_directory(job.directory, job.partition)
+    log_directory.mkdir(parents=True, exist_ok=True)
+
+    storage_profiles = None if storage_profile is None else {rt: storage_profile for rt in ResultType}
+    fused_result_types = [rt for rt in ResultType if rt.result_stream is not None] if fused else None
+    summary = {"ModelFile": str(job.model_file), "Directory": str(log_directory), "Status": "COMPLETE",
+               "Start": "", "Seconds": 0.0, "Rows": 0, "Skipped": 0, "Error": ""}
+
+    output_options = job.output_options
+    if not force:
+        unchanged = get_unchanged_result_types(job, schema_version, envelopes, storage_profile, all_reaction_nodes,
+                                               results_only)
+        selected = [rt for rt in ResultType if job.output_options is None or job.output_options[rt.label] == "TRUE"]
+        output_options = {rt.label: "TRUE" if rt in selected and rt not in unchanged else "FALSE" for rt in ResultType}
+        summary["Skipped"] = len(unchanged)
+        if "TRUE" not in output_options.values():
+            summary["Status"] = "UNCHANGED"
+            return summary
+
+    with licence_slots(licence_directory, licences, workers_per_model):
+        start = time.perf_counter()
+        summary["Start"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_file_path = log_directory / f"{datetime.now().strftime('%Y-%m-%d_%H-%M')} Extraction Log File.txt"
+        setup_logging(log_file_path)
+
+        output_directory = job.directory
+        if staged:
+            output_directory = get_staging_directory(job)
+            shutil.rmtree(output_directory, ignore_errors=True)
+
+        try:
+            topology_file = log_directory / MODEL_TOPOLOGY_FILE
+            if results_only and topology_file.exists():
+                rows_written = extract_result_file_data(job.result_file, output_directory,
+                                                        topology_file=topology_file, output_options=output_options,
+                                                        schema_version=schema_version, partition=job.partition,
+                                                        pipelined=pipelined, envelopes=envelopes,
+                                                        storage_profiles=storage_profiles,
+                                                        all_reaction_nodes=all_reaction_nodes,
+                                                        fused=fused_result_types)
+            elif workers_per_model > 1:
+                rows_written = extract_model_data_parallel(job.model_file, job.result_file, job_scratch_path,
+                                                           output_directory, workers=workers_per_model,
+                                                           output_options=output_options,
+                                                           schema_version=schema_version, log_fp=log_file_path,
+                                                           partition=job.partition, pipelined=pipelined,
+                                                           envelopes=envelopes, storage_profiles=storage_profiles,
+                                                           all_reaction_nodes=all_reaction_nodes,
+                                                           fused=fused_result_types, write_topology=results_only)
+            else:
+                rows_written = extract_model_data(job.model_file, job.result_file, job_scratch_path,
+                                                  output_directory, output_options=output_options,
+                                                  schema_version=schema_version,
+                                                  partition=job.partition, pipelined=pipelined, envelopes=envelopes,
+                                                  storage_profiles=storage_profiles,
+                                                  all_reaction_nodes=all_reaction_nodes,
+                                                  fused=fused_result_types, write_topology=results_only)
+
+            if staged:
+                publish_staged(output_directory, job.directory)
+
+            summary["Rows"] = sum(rows_written.values())
+            summary.update(rows_written)
+
+        except Exception as e:
+            logger.exception(e)
+            summary["Status"] = "FAILED"
+            summary["Error"] = f"{type(e).__name__}: {e}"
+            if staged:
+                shutil.rmtree(output_directory, ignore_errors=True)
+
+        summary["Seconds"] = round(time.perf_counter() - start, 1)
+
+    return summary
+
+
+def estimate_extraction_job(job: ExtractionJob, scratch_path: pathlib.Path, licence_directory: pathlib.Path,
+                            licences: int, schema_version: int = 1, previous_report: pathlib.Path = None) -> dict:
+    """Predicts the rows and file sizes of one model extraction and returns its summary row."""
+    summary = {"ModelFile": str(job.model_file), "Status": "ESTIMATED", "Rows": 0, "Bytes": 0, "Error": ""}
+
+    job_scratch_path = scratch_path / job.model_file.stem
+    job_scratch_path.mkdir(parents=True, exist_ok=True)
+    with licence_slots(licence_directory, licences):
+        try:
+            estimates = estimate_model_data(job.model_file, job.result_file, job_scratch_path,
+                                            output_options=job.output_options, schema_version=schema_version,
+                                            previous_report=previous_report)
+            for file_name, estimate in estimates.items():
+                summary[file_name] = estimate["ExpectedRows"]
+                summary["Rows"] += estimate["ExpectedRows"]
+                summary["Bytes"] += estimate["EstimatedBytes"]
+
+        except Exception as e:
+            logger.exception(e)
+            summary["Status"] = "FAILED"
+            summary["Error"] = f"{type(e).__name__}: {e}"
+
+    return summary
+
+
+def write_summary(summaries: list[dict], summary_fp: pathlib.Path):
+    """Writes one row per model with its timing, total row count and the rows written per file."""
+    fieldnames = []
+    for summary in summaries:
+        fieldnames.extend(name for name in summary if name not in fieldnames)
+
+    with open(summary_fp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def run_batch(jobs: list[ExtractionJob], scratch_path: pathlib.Path, licence_directory: pathlib.Path,
+              licences: int, processes: int = None, workers_per_model: int = 1, schema_version: int = 1,
+              pipelined: bool = False, envelopes: bool = False, storage_profile: str = None,
+              all_reaction_nodes: bool = False, fused: bool = False, results_only: bool = False,
+              force: bool = False) -> list[dict]:
+    """Runs the extraction jobs on a bounded process pool.
+
+    The pool runs at most licences // workers_per_model models at once, and the licence slots also hold back
+    jobs while other runners on the machine are using the licences."""
+
+    concurrent_models = max(1, licences // workers_per_model)
+    if processes is not None:
+        concurrent_models = min(concurrent_models, processes)
+
+    summaries = []
+    with ProcessPoolExecutor(max_workers=concurrent_models) as executor:
+        futures = {executor.submit(run_extraction_job, job, scratch_path, licence_directory, licences,
+                                   workers_per_model, schema_version, pipelined, envelopes, storage_profile,
+                                   all_reaction_nodes, fused, results_only, force): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {"ModelFile": str(job.model_file), "Directory": str(job.directory), "Status": "FAILED",
+                           "Error": f"{type(e).__name__}: {e}"}
+            summaries.append(summary)
+            print(f"[{len(summaries)}/{len(jobs)}] {summary['Status']}: {job.model_file.name} "
+                  f"({summary.get('Rows', 0):,.0f} rows, {summary.get('Seconds', 0.0):,.0f}s)")
+
+    # Report the models in manifest order, regardless of the order they finished in
+    order = {str(job.model_file): i for i, job in enumerate(jobs)}
+    summaries.sort(key=lambda s: order[s["ModelFile"]])
+    return summaries
+
+
+# Folders of a shared job queue: a job file moves from pending to claimed when a worker takes it, and on to
+# done or failed when it finishes
+QUEUE_FOLDERS = ("pending", "claimed", "done", "failed")
+
+
+def _write_json_atomic(record: dict, file_path: pathlib.Path):
+    """Writes a JSON file through a temporary file and a rename, so it is never read half written."""
+    temporary_path = file_path.with_name(f".{file_path.name}.{socket.gethostname()}-{os.getpid()}.tmp")
+    with open(temporary_path, "w") as f:
+        json.dump(record, f, indent=2, default=str)
+    os.replace(temporary_path, file_path)
+
+
+def get_job_id(job: ExtractionJob) -> str:
+    """Gets the queue file name of a job, from its model file name and a hash of its full path and partition."""
+    key = json.dumps([str(job.model_file.resolve()), job.partition], sort_keys=True)
+    return f"{job.model_file.stem}-{hashlib.blake2b(key.encode(), digest_size=4).hexdigest()}"
+
+
+def _job_from_record(record: dict) -> ExtractionJob:
+    return ExtractionJob(pathlib.Path(record["ModelFile"]), pathlib.Path(record["ResultFile"]),
+                         pathlib.Path(record["Directory"]), record["OutputOptions"], record["Partition"])
+
+
+def enqueue_jobs(queue_directory: pathlib.Path, jobs: list[ExtractionJob]) -> int:
+    """Adds the jobs to a shared queue folder as one JSON file each, skipping any already pending or claimed, and
+    returns the number added. A job that is done or failed is queued again."""
+    for folder in QUEUE_FOLDERS:
+        (queue_directory / folder).mkdir(parents=True, exist_ok=True)
+
+    added = 0
+    for job in jobs:
+        name = f"{get_job_id(job)}.json"
+        if (queue_directory / "pending" / name).exists() or (queue_directory / "claimed" / name).exists():
+            continue
+        record = {"ModelFile": str(job.model_file.resolve()), "ResultFile": str(job.result_file.resolve()),
+                  "Directory": str(job.directory.resolve()), "OutputOptions": job.output_options,
+                  "Partition": job.partition, "Attempts": 0, "History": []}
+        _write_json_atomic(record, queue_directory / "pending" / name)
+        for folder in ("done", "failed"):
+            (queue_directory / folder / name).unlink(missing_ok=True)
+        added += 1
+    return added
+
+
+def requeue_stale_claims(queue_directory: pathlib.Path, stale_after: float) -> list[str]:
+    """Moves back to pending every claimed job whose heartbeat (the modified time of its claim file) is older
+    than `stale_after` seconds, i.e. whose worker died or lost the share, and returns their names.
+
+    The machines' clocks are taken to agree to well within `stale_after`."""
+    requeued = []
+    for claim in (queue_directory / "claimed").glob("*.json"):
+        try:
+            if time.time() - claim.stat().st_mtime < stale_after:
+                continue
+            os.rename(claim, queue_directory / "pending" / claim.name)
+        except OSError:
+            # Another worker finished, heartbeated or re-queued it first
+            continue
+        logger.warning(f"Re-queued the stale claim {claim.name}.")
+        requeued.append(claim.name)
+    return requeued
+
+
+def claim_job(queue_directory: pathlib.Path, worker_id: str,
+              stale_after: float = 600.0) -> Union[tuple[pathlib.Path, ExtractionJob], None]:
+    """Claims the next pending job by renaming its file into the claimed folder, returning the claim file and
+    the job, or None once nothing is pending. Only one of any number of workers can rename the same file.
+
+    The file is touched before it is renamed, as a rename keeps its modified time, and a job queued more than
+    `stale_after` seconds ago would otherwise arrive as a stale claim that another worker could re-queue."""
+    requeue_stale_claims(queue_directory, stale_after)
+
+    for pending in sorted((queue_directory / "pending").glob("*.json")):
+        claim = queue_directory / "claimed" / pending.name
+        try:
+            os.utime(pending)
+            os.rename(pending, claim)
+        except OSError:
+            continue
+
+        with open(claim) as f:
+            record = json.load(f)
+        record["Attempts"] += 1
+        record["History"].append({"Worker": worker_id, "Claimed": datetime.now().isoformat(timespec="seconds")})
+        _write_json_atomic(record, claim)
+        return claim, _job_from_record(record)
+
+    return None
+
+
+def _holds_claim(claim: pathlib.Path, worker_id: str) -> bool:
+    """Whether the worker made the latest claim of the job. Claim files are named by job alone, so a worker whose
+    claim went stale and was re-queued would otherwise find another worker's claim of the same job there."""
+    try:
+        with open(claim) as f:
+            record = json.load(f)
+    except FileNotFoundError:
+        return False
+    return record["History"][-1]["Worker"] == worker_id
+
+
+@contextmanager
+def heartbeat(claim: pathlib.Path, worker_id: str, interval: float = 30.0):
+    """Touches the claim file every `interval` seconds for the duration of the context, so other workers can
+    tell the job is still running. It stops once the claim is re-queued or taken by another worker."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            if not _holds_claim(claim, worker_id):
+                logger.warning(f"The claim {claim.name} was re-queued by another worker.")
+                return
+            try:
+                os.utime(claim)
+            except FileNotFoundError:
+                logger.warning(f"The claim {claim.name} was re-queued by another worker.")
+                return
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def complete_job(queue_directory: pathlib.Path, claim: pathlib.Path, worker_id: str, summary: dict,
+                 max_attempts: int = 2):
+    """Moves a job to done, or back to pending if it failed with attempts to spare, or else to failed, and
+    records its summary.
+
+    The summary is written to the claim file before it is renamed, since once in pending the job can be claimed
+    at any moment, and writing it there afterwards would recreate the file alongside the new claim. A claim
+    re-queued, or re-claimed by another worker, while the job ran is left alone."""
+    try:
+        with open(claim) as f:
+            record = json.load(f)
+    except FileNotFoundError:
+        record = None
+    if record is None or record["History"][-1]["Worker"] != worker_id:
+        # Re-queued while it ran, so the job is left for the worker that takes it next
+        logger.warning(f"The claim {claim.name} was lost, so its outcome is not recorded.")
+        return
+
+    if summary["Status"] != "FAILED":
+        folder = "done"
+    else:
+        folder = "pending" if record["Attempts"] < max_attempts else "failed"
+    record["History"][-1].update(Finished=datetime.now().isoformat(timespec="seconds"), Summary=summary)
+    _write_json_atomic(record, claim)
+    try:
+        os.rename(claim, queue_directory / folder / claim.name)
+    except FileNotFoundError:
+        logger.warning(f"The claim {claim.name} was lost, so its outcome is not recorded.")
+
+
+def run_queue_worker(queue_directory: pathlib.Path, scratch_path: pathlib.Path, licence_directory: pathlib.Path,
+                     licences: int, workers_per_model: int = 1, schema_version: int = 1, pipelined: bool = False,
+                     envelopes: bool = False, storage_profile: str = None, all_reaction_nodes: bool = False,
+                     fused: bool = False, results_only: bool = False, force: bool = False,
+                     heartbeat_interval: float = 30.0, stale_after: float = 600.0,
+                     max_attempts: int = 2) -> list[dict]:
+    """Claims and runs jobs from a shared queue folder until none are pending, returning their summary rows.
+
+    Each job is extracted to a staging folder and published once complete (see run_extraction_job), so a
+    worker that dies part way leaves the previous outputs in place for the job to be re-run elsewhere."""
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    summaries = []
+    while (claimed := claim_job(queue_directory, worker_id, stale_after)) is not None:
+        claim, job = claimed
+        try:
+            with heartbeat(claim, worker_id, heartbeat_interval):
+                summary = run_extraction_job(job, scratch_path, licence_directory, licences, workers_per_model,
+                                             schema_version, pipelined, envelopes, storage_profile,
+                                             all_reaction_nodes, fused, results_only, force, staged=True)
+        except Exception as e:
+            summary = {"ModelFile": str(job.model_file), "Directory": str(job.directory), "Status": "FAILED",
+                       "Error": f"{type(e).__name__}: {e}"}
+        summary["Worker"] = worker_id
+        complete_job(queue_directory, claim, worker_id, summary, max_attempts)
+        summaries.append(summary)
+        logger.info(f"{summary['Status']}: {job.model_file.name} on {worker_id} "
+                    f"({summary.get('Rows', 0):,.0f} rows, {summary.get('Seconds', 0.0):,.0f}s)")
+    return summaries
+
+
+def run_queue(queue_directory: pathlib.Path, scratch_path: pathlib.Path, licence_directory: pathlib.Path,
+              licences: int, processes: int = None, workers_per_model: int = 1, **options) -> list[dict]:
+    """Drains a shared queue folder with as many worker processes as the machine's licences allow (as for
+    run_batch). Any number of machines can run this against the same queue at once."""
+    concurrent_models = max(1, licences // workers_per_model)
+    if processes is not None:
+        concurrent_models = min(concurrent_models, processes)
+
+    with ProcessPoolExecutor(max_workers=concurrent_models) as executor:
+        futures = [executor.submit(run_queue_worker, queue_directory, scratch_path, licence_directory, licences,
+                                   workers_per_model, **options) for _ in range(concurrent_models)]
+        return [summary for future in futures for summary in future.result()]
+
+
+if __name__ == '__main__':
+
+    default_scratch = pathlib.Path(f"C:\\Users\\{getuser()}\\Documents\\Changi T5_Database_Scratch")
+
+    parser = argparse.ArgumentParser(description="Extracts the Strand7 models listed in a manifest to Parquet files.")
+    parser.add_argument("manifest", type=pathlib.Path, nargs="?", default=None,
+                        help="CSV file with ModelFile, ResultFile and Directory columns")
+    parser.add_argument("--scratch", type=pathlib.Path, default=default_scratch, help="Strand7 scratch folder")
+    parser.add_argument("--licences", type=int, default=1, help="Strand7 licences available on this machine")
+    parser.add_argument("--licence-dir", type=pathlib.Path, default=None,
+                        help="Folder of licence slot lock files shared by all runners on this machine")
+    parser.add_argument("--processes", type=int, default=None, help="Maximum number of models extracted at once")
+    parser.add_argument("--workers-per-model", type=int, default=1,
+                        help="Worker processes (and licences) used by each model extraction")
+    parser.add_argument("--schema-version", type=int, default=1, choices=(1, 2))
+    parser.add_argument("--summary", type=pathlib.Path, default=None, help="Output CSV of timings and row counts")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Predict the rows and file sizes of each model without reading any results")
+    parser.add_argument("--previous-report", type=pathlib.Path, default=None,
+                        help="Run report of an earlier extraction, used for the bytes per row of a dry run")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Write the Parquet files on a separate thread while the results are read")
+    parser.add_argument("--envelopes", action="store_true",
+                        help="Also write the per-beam beam force envelopes to beam_force_envelope.parquet")
+    parser.add_argument("--storage-profile", default=None, choices=list(STORAGE_PROFILES),
+                        help="Parquet encoding of every result file, trading size against write and scan speed")
+    parser.add_argument("--all-reaction-nodes", action="store_true",
+                        help="Extract the nodal reactions of every node rather than only the restrained nodes")
+    parser.add_argument("--fused", action="store_true",
+                        help="Read the node and beam results in one pass over the result cases per entity type")
+    parser.add_argument("--results-only", action="store_true",
+                        help="Re-extract the results of models with a topology snapshot without loading the model")
+    parser.add_argument("--force", action="store_true",
+                        help="Extract every result type, even if its file was written from the same inputs")
+    parser.add_argument("--queue", type=pathlib.Path, default=None,
+                        help="Shared queue folder to add the manifest's jobs to and claim jobs from")
+    parser.add_argument("--enqueue-only", action="store_true",
+                        help="Add the manifest's jobs to the queue without running any of them")
+    parser.add_argument("--stale-after", type=float, default=600.0,
+                        help="Seconds without a heartbeat before another worker re-queues a claimed job")
+    args = parser.parse_args()
+
+    if args.manifest is None and args.queue is None:
+        parser.error("A manifest is needed unless the jobs are claimed from a --queue.")
+
+    licence_dir = args.scratch / "licence_slots" if args.licence_dir is None else args.licence_dir
+    if args.summary is not None:
+        summary_fp = args.summary
+    elif args.queue is not None:
+        summary_fp = args.queue / f"{socket.gethostname()} Summary.csv"
+    else:
+        summary_fp = args.manifest.with_name(f"{args.manifest.stem} Summary.csv")
+
+    extraction_jobs = [] if args.manifest is None else read_manifest(args.manifest)
+
+    if args.queue is not None:
+        if extraction_jobs:
+            print(f"{enqueue_jobs(args.queue, extraction_jobs)} of {len(extraction_jobs)} models added to the queue.")
+        if not args.enqueue_only:
+            batch_start = time.perf_counter()
+            results = run_queue(args.queue, args.scratch, licence_dir, args.licences, args.processes,
+                                args.workers_per_model, schema_version=args.schema_version,
+                                pipelined=args.pipelined, envelopes=args.envelopes,
+                                storage_profile=args.storage_profile, all_reaction_nodes=args.all_reaction_nodes,
+                                fused=args.fused, results_only=args.results_only, force=args.force,
+                                stale_after=args.stale_after)
+            write_summary(results, summary_fp)
+            failed = sum(1 for r in results if r["Status"] == "FAILED")
+            print(f"Queue drained in {time.perf_counter() - batch_start:,.0f}s; this machine ran {len(results)} "
+                  f"models with {failed} failed. Summary written to {summary_fp}.")
+
+    elif args.dry_run:
+        estimates = [estimate_extraction_job(job, args.scratch, licence_dir, args.licences, args.schema_version,
+                                             args.previous_report) for job in extraction_jobs]
+        write_summary(estimates, summary_fp)
+        for job, estimate in zip(extraction_jobs, estimates):
+            print(f"{estimate['Status']}: {job.model_file.name} ({estimate['Rows']:,.0f} rows, "
+                  f"{estimate['Bytes'] / 1e9:,.2f} GB)")
+        print(f"{sum(e['Rows'] for e in estimates):,.0f} rows and {sum(e['Bytes'] for e in estimates) / 1e9:,.2f} GB "
+              f"predicted. Summary written to {summary_fp}.")
+
+    else:
+        print(f"{len(extraction_jobs)} models to extract.")
+
+        batch_start = time.perf_counter()
+        results = run_batch(extraction_jobs, args.scratch, licence_dir, args.licences, args.processes,
+                            args.workers_per_model, args.schema_version, args.pipelined, args.envelopes,
+                            args.storage_profile, args.all_reaction_nodes, args.fused, args.results_only,
+                            args.force)
+        write_summary(results, summary_fp)
+
+        failed = sum(1 for r in results if r["Status"] == "FAILED")
+        print(f"Finished in {time.perf_counter() - batch_start:,.0f}s with {failed} failed extractions. "
+              f"Summary written to {summary_fp}.")
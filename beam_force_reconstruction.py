@@ -0,0 +1,340 @@
+"""
+beam_force_reconstruction.py
+
+Module to reconstruct the principal beam forces at any position along the beams from the stations extracted by
+database_extraction.py and the extracted beam loading, so splice forces can be found at positions that were
+not extracted (or from the end forces alone, extracting with ExtractionFilter(positions=(0.0, 1.0))).
+
+Between the two stations either side of a position, the forces with no load on the beam vary linearly, so the
+position is interpolated between the stations and the effect of the loads in between is added by statics:
+
+    F(x) = interpolated F - (Q(x) - t Q(x1))
+    M(x) = interpolated M + e3 x (I(x) - t I(x1))
+
+where Q(x) is the resultant of the loads from the station x0 to x, I(x) is their moment about x, t is the
+fraction of the way from x0 to x1 and e3 is the beam axis. The forces are the vectors on the principal axes of
+parquet_views.PRINCIPAL_FORCE_VECTORS, acting on the section face looking towards end 2. This holds for linear
+static results, where each combination is the factored sum of its load cases.
+"""
+
+import pathlib
+from dataclasses import dataclass
+from typing import Union
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from parquet_views import (BEAM_FORCES_FILE, BEAM_PROPERTIES_FILE, LOAD_CASES_FILE, PRINCIPAL_FORCE_VECTORS,
+                           get_beam_axes, get_result_path, result_source)
+
+
+BEAM_DISTRIBUTED_LOADING_FILE = "beam_distributed_loading.parquet"
+BEAM_POINT_LOADING_FILE = "beam_point_loading.parquet"
+BEAM_NS_MASS_LOADING_FILE = "beam_ns_mass_loading.parquet"
+
+# Distributed load profiles as (distance from end 1, intensity) knots, from the PA, PB, P1, P2, a and b of the
+# extracted loading, with a and b the distances from end 1. L is the beam length.
+_LOAD_PROFILE_KNOTS = {
+    "Constant": lambda L, PA, PB, P1, P2, a, b: ((0.0, PA), (L, PA)),
+    "Linear": lambda L, PA, PB, P1, P2, a, b: ((0.0, PA), (L, PB)),
+    "Triangular": lambda L, PA, PB, P1, P2, a, b: ((0.0, 0.0), (a, P1), (L, 0.0)),
+    "ThreePoint0": lambda L, PA, PB, P1, P2, a, b: ((0.0, PA), (a, P1), (L, PB)),
+    "ThreePoint1": lambda L, PA, PB, P1, P2, a, b: ((0.0, PA), (a, P1), (b, P2), (L, PB)),
+    "Trapezoidal": lambda L, PA, PB, P1, P2, a, b: ((0.0, 0.0), (a, P1), (b, P2), (L, 0.0))}
+
+_FORCE_COLUMNS = ("Fx", "Fy", "Fz", "Mx", "My", "Mz")
+
+# Column of each principal vector component (axes 1, 2 and 3) in _FORCE_COLUMNS
+_FORCE_INDEX = [_FORCE_COLUMNS.index(name) for name in PRINCIPAL_FORCE_VECTORS["F"]]
+_MOMENT_INDEX = [_FORCE_COLUMNS.index(name) for name in PRINCIPAL_FORCE_VECTORS["M"]]
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class BeamLoads:
+    """Class to encapsulate the beam loading in the principal axes, by beam and load case.
+
+    The distributed loads are linear segments from `start` to `end`, as fractions of the beam length, with the
+    force per unit length on each principal axis at either end of the segment. The point loads are at
+    `point_position`, also a fraction of the length. `lengths` is indexed by beam number."""
+    lengths: np.ndarray
+    beam: np.ndarray
+    load_case: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    start_values: np.ndarray
+    end_values: np.ndarray
+    point_beam: np.ndarray
+    point_load_case: np.ndarray
+    point_position: np.ndarray
+    point_values: np.ndarray
+
+
+def _read_loading(directory: pathlib.Path, file_name: str, columns: list) -> Union[pa.Table, None]:
+    parquet_file = get_result_path(directory, file_name)
+    if not parquet_file.exists():
+        return None
+    return pq.read_table(parquet_file, columns=columns)
+
+
+def _to_principal(values: np.ndarray, beam_axes: np.ndarray, axis_type: np.ndarray) -> np.ndarray:
+    """Gets the principal components of load vectors given in the principal or global axes (axis_type True)."""
+    return np.where(axis_type[:, None], np.einsum("nij,nj->ni", beam_axes, values), values)
+
+
+def _get_segments(table: pa.Table, lengths: np.ndarray, directions: np.ndarray):
+    """Splits distributed loads into linear segments between the knots of their profiles, with `directions`
+    the principal components of each load per unit intensity."""
+
+    beams = table.column("BeamNumber").to_numpy()
+    parameters = np.column_stack([table.column(c).to_numpy() for c in ("PA", "PB", "P1", "P2", "a", "b")])
+    load_types = table.column("LoadType").to_numpy(zero_copy_only=False)
+    segment_rows, starts, ends, start_values, end_values = [], [], [], [], []
+    for load_type, profile in _LOAD_PROFILE_KNOTS.items():
+        rows = np.flatnonzero(load_types == load_type)
+        if len(rows) == 0:
+            continue
+        L = lengths[beams[rows]]
+        knots = profile(L, *parameters[rows].T)
+        positions = np.column_stack([np.broadcast_to(p, L.shape) for p, _ in knots]) / L[:, None]
+        intensities = np.column_stack([np.broadcast_to(q, L.shape) for _, q in knots])
+        for k in range(len(knots) - 1):
+            segment_rows.append(rows)
+            starts.append(positions[:, k])
+            ends.append(positions[:, k + 1])
+            start_values.append(intensities[:, k])
+            end_values.append(intensities[:, k + 1])
+
+    if not segment_rows:
+        return np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), np.empty((0, 3)), np.empty((0, 3))
+    rows = np.concatenate(segment_rows)
+    return (rows, np.concatenate(starts), np.concatenate(ends),
+            np.concatenate(start_values)[:, None] * directions[rows],
+            np.concatenate(end_values)[:, None] * directions[rows])
+
+
+def read_beam_loads(directory: Union[str, pathlib.Path], accelerations: dict = None) -> BeamLoads:
+    """Reads the extracted beam distributed, point and non-structural mass loading of an extraction directory
+    into the principal axes of each beam, using the lengths and principal axes in the beam properties.
+
+    The non-structural masses only load the load cases in `accelerations`, which maps a load case number to
+    its global acceleration vector, e.g. {1: (0.0, 0.0, -9.81)}, in units consistent with the masses."""
+
+    directory = pathlib.Path(directory)
+    beam_properties = pq.read_table(get_result_path(directory, BEAM_PROPERTIES_FILE))
+    axes = get_beam_axes(beam_properties)
+    lengths = np.full(len(axes), np.nan)
+    lengths[beam_properties.column("BeamNumber").to_numpy()] = beam_properties.column("Length").to_numpy()
+    identity = np.eye(3)
+
+    segments = []
+    distributed = _read_loading(directory, BEAM_DISTRIBUTED_LOADING_FILE,
+                                ["LoadAxesType", "BeamNumber", "LoadCase", "Axis", "LoadType", "Projected",
+                                 "PA", "PB", "P1", "P2", "a", "b"])
+    if distributed is not None and distributed.num_rows:
+        beams = distributed.column("BeamNumber").to_numpy()
+        is_global = distributed.column("LoadAxesType").to_numpy(zero_copy_only=False) == "DistGlobal"
+        load_axes = identity[distributed.column("Axis").to_numpy() - 1]
+        directions = _to_principal(load_axes, axes[beams], is_global)
+        # A projected load is given per unit length of the beam projected normal to the load
+        projected = distributed.column("Projected").to_numpy(zero_copy_only=False).astype(bool)
+        beam_direction = axes[beams, 2]
+        factors = np.where(projected, np.sqrt(np.clip(1.0 - np.sum(beam_direction * load_axes, axis=1) ** 2,
+                                                      0.0, 1.0)), 1.0)
+        rows, *segment = _get_segments(distributed, lengths, directions * factors[:, None])
+        segments.append((beams[rows], distributed.column("LoadCase").to_numpy()[rows], *segment))
+
+    ns_mass = _read_loading(directory, BEAM_NS_MASS_LOADING_FILE,
+                            ["BeamNumber", "LoadCase", "LoadType", "PA", "PB", "P1", "P2", "a", "b"])
+    if ns_mass is not None and ns_mass.num_rows and accelerations:
+        load_cases = ns_mass.column("LoadCase").to_numpy()
+        ns_mass = ns_mass.filter(pa.array(np.isin(load_cases, list(accelerations))))
+        beams = ns_mass.column("BeamNumber").to_numpy()
+        load_cases = ns_mass.column("LoadCase").to_numpy()
+        gravity = np.array([accelerations[c] for c in load_cases], dtype=np.float64).reshape(-1, 3)
+        directions = _to_principal(gravity, axes[beams], np.ones(len(beams), dtype=bool))
+        rows, *segment = _get_segments(ns_mass, lengths, directions)
+        segments.append((beams[rows], load_cases[rows], *segment))
+
+    if segments:
+        beam, load_case, start, end, start_values, end_values = (np.concatenate(s) for s in zip(*segments))
+    else:
+        beam, load_case = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        start, end, start_values, end_values = np.empty(0), np.empty(0), np.empty((0, 3)), np.empty((0, 3))
+
+    point = _read_loading(directory, BEAM_POINT_LOADING_FILE,
+                          ["LoadAxesType", "BeamNumber", "LoadCase", "Position", "PointLoadX", "PointLoadY",
+                           "PointLoadZ"])
+    if point is not None and point.num_rows:
+        point_beam = point.column("BeamNumber").to_numpy()
+        point_load_case = point.column("LoadCase").to_numpy()
+        point_position = point.column("Position").to_numpy() / lengths[point_beam]
+        values = np.column_stack([point.column(c).to_numpy() for c in ("PointLoadX", "PointLoadY", "PointLoadZ")])
+        is_global = point.column("LoadAxesType").to_numpy(zero_copy_only=False) == "Global"
+        point_values = _to_principal(values, axes[point_beam], is_global)
+    else:
+        point_beam, point_load_case = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+        point_position, point_values = np.empty(0), np.empty((0, 3))
+
+    return BeamLoads(lengths, beam, load_case, start, end, start_values, end_values, point_beam, point_load_case,
+                     point_position, point_values)
+
+
+def get_load_case_factors(number_of_load_cases: int, combination_factors: np.ndarray = None) -> np.ndarray:
+    """Gets the factor on each load case (columns) of each result case (rows, from result case 1).
+
+    The primary result cases of a linear static solve are the load cases, and each combination row of
+    `combination_factors` (e.g. CombinationSet.factors) factors the primary result cases."""
+    factors = np.eye(number_of_load_cases)
+    if combination_factors is None:
+        return factors
+    return np.vstack([factors, np.asarray(combination_factors, dtype=np.float64)[:, :number_of_load_cases]])
+
+
+def _pair_with_loads(request_beams: np.ndarray, load_beams: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Pairs every request with every load on the same beam, returning the request and load indices."""
+    order = np.argsort(load_beams, kind="stable")
+    first = np.searchsorted(load_beams[order], request_beams, side="left")
+    counts = np.searchsorted(load_beams[order], request_beams, side="right") - first
+    requests = np.repeat(np.arange(len(request_beams)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return requests, order[np.repeat(first, counts) + offsets]
+
+
+def _segment_integrals(start, end, start_values, end_values, window_start, window_end, lever):
+    """Integrates linear load segments over a window: the resultant, and its moment arm weighted integral
+    (lever - s) q(s) ds, both in fractions of the beam length."""
+    u = np.maximum(window_start, start)
+    v = np.minimum(window_end, end)
+    active = (v > u)[:, None]
+    span = np.where(end > start, end - start, 1.0)
+    slope = (end_values - start_values) / span[:, None]
+
+    def antiderivatives(p):
+        arm = (lever - start)[:, None]
+        p = p[:, None]
+        return (start_values * p + slope * p ** 2 / 2,
+                start_values * (arm * p - p ** 2 / 2) + slope * (arm * p ** 2 / 2 - p ** 3 / 3))
+
+    resultant_v, moment_v = antiderivatives(np.maximum(v, u) - start)
+    resultant_u, moment_u = antiderivatives(u - start)
+    return np.where(active, resultant_v - resultant_u, 0.0), np.where(active, moment_v - moment_u, 0.0)
+
+
+def _get_load_effects(loads: BeamLoads, beams: np.ndarray, positions: np.ndarray, x0: np.ndarray,
+                      x1: np.ndarray, t: np.ndarray, number_of_load_cases: int) -> np.ndarray:
+    """Gets the change to the interpolated forces due to the loads between the stations, for every request
+    (rows) and load case (columns), as the six force components."""
+
+    effects = np.zeros((len(beams), number_of_load_cases, 6))
+    lengths = loads.lengths[beams]
+
+    def add(requests, load_cases, resultants, moments):
+        # Resultants and moments are of the loads over [x0, x] less t times those over [x0, x1]
+        forces = np.zeros((len(requests), 6))
+        forces[:, _FORCE_INDEX] = -resultants
+        forces[:, _MOMENT_INDEX] = np.column_stack([-moments[:, 1], moments[:, 0], np.zeros(len(requests))])
+        np.add.at(effects, (requests, load_cases - 1), forces)
+
+    # The segment integrals are over fractions of the length, so are scaled by the length (and its square for
+    # the moments), as are the lever arms of the point loads
+    requests, segments = _pair_with_loads(beams, loads.beam)
+    if len(requests):
+        segment = (loads.start[segments], loads.end[segments], loads.start_values[segments],
+                   loads.end_values[segments])
+        resultant, moment = _segment_integrals(*segment, x0[requests], positions[requests], positions[requests])
+        resultant_1, moment_1 = _segment_integrals(*segment, x0[requests], x1[requests], x1[requests])
+        fraction = t[requests, None]
+        length = lengths[requests, None]
+        add(requests, loads.load_case[segments], (resultant - fraction * resultant_1) * length,
+            (moment - fraction * moment_1) * length ** 2)
+
+    requests, points = _pair_with_loads(beams, loads.point_beam)
+    if len(requests):
+        position = loads.point_position[points]
+        values = loads.point_values[points]
+        # A load at a station is taken to act just past it, so the station's forces are those before the load
+        to_position = ((position >= x0[requests]) & (position < positions[requests]))[:, None]
+        to_station = ((position >= x0[requests]) & (position < x1[requests]))[:, None]
+        fraction = t[requests, None]
+        resultant = values * (to_position - fraction * to_station)
+        moment = values * (to_position * (positions[requests] - position)[:, None] -
+                           fraction * to_station * (x1[requests] - position)[:, None]) * lengths[requests, None]
+        add(requests, loads.point_load_case[points], resultant, moment)
+
+    return effects
+
+
+def reconstruct_beam_forces(directory: Union[str, pathlib.Path], beam_positions: list[tuple[int, float]],
+                            result_cases: list[int] = None, loads: BeamLoads = None,
+                            load_case_factors: np.ndarray = None, accelerations: dict = None) -> pa.Table:
+    """Gets the principal beam forces at each (beam number, position) of `beam_positions`, with the position a
+    fraction of the beam length, for every result case (or those in `result_cases`) of an extraction directory.
+
+    The loads are read with read_beam_loads unless given. By default result case n is taken to be load case n,
+    as for the primary result cases of a linear static solve, and a ValueError is raised for any result case
+    past the load cases (those in load_cases.parquet, or the highest loaded). The combinations need
+    `load_case_factors` (see get_load_case_factors), as without them their loading would be silently left out.
+    Returns a table of BeamNumber, ResultCase, Position and Fx, Fy, Fz, Mx, My and Mz, ordered by the requests
+    then the result cases."""
+
+    directory = pathlib.Path(directory)
+    request_beams = np.array([b for b, _ in beam_positions], dtype=np.int32)
+    positions = np.array([p for _, p in beam_positions], dtype=np.float64)
+    if np.any((positions < 0.0) | (positions > 1.0)):
+        raise ValueError("Positions must be fractions of the beam length, from 0.0 to 1.0.")
+
+    beams = np.unique(request_beams)
+    case_filter = "" if result_cases is None else f" AND ResultCase IN ({', '.join(str(int(c)) for c in result_cases)})"
+    stations = duckdb.sql(f"""SELECT BeamNumber, ResultCase, Position, {', '.join(_FORCE_COLUMNS)}
+    FROM {result_source(get_result_path(directory, BEAM_FORCES_FILE))}
+    WHERE BeamNumber IN ({', '.join(str(b) for b in beams)}){case_filter}""").fetchnumpy()
+
+    station_positions = np.unique(stations["Position"])
+    cases = np.unique(stations["ResultCase"])
+    station_beams = np.searchsorted(beams, stations["BeamNumber"])
+    missing = np.setdiff1d(beams, stations["BeamNumber"])
+    if len(missing) or len(station_positions) < 2:
+        raise ValueError(f"Beam forces at two or more stations are needed for every beam; "
+                         f"{len(station_positions)} stations were found and beams {missing.tolist()} are missing.")
+
+    # Station forces by beam, result case and station
+    forces = np.full((len(beams), len(cases), len(station_positions), 6), np.nan)
+    forces[station_beams, np.searchsorted(cases, stations["ResultCase"]),
+           np.searchsorted(station_positions, stations["Position"])] = np.column_stack(
+        [np.asarray(stations[c], dtype=np.float64) for c in _FORCE_COLUMNS])
+
+    # The stations either side of each position, and the fraction of the way between them
+    lower = np.clip(np.searchsorted(station_positions, positions, side="right") - 1, 0, len(station_positions) - 2)
+    x0, x1 = station_positions[lower], station_positions[lower + 1]
+    t = (positions - x0) / (x1 - x0)
+    rows = np.searchsorted(beams, request_beams)
+    interpolated = (forces[rows, :, lower] * (1.0 - t)[:, None, None] +
+                    forces[rows, :, lower + 1] * t[:, None, None])
+
+    if loads is None:
+        loads = read_beam_loads(directory, accelerations)
+    number_of_load_cases = int(max(loads.load_case.max(initial=0), loads.point_load_case.max(initial=0)))
+    if number_of_load_cases:
+        if load_case_factors is None:
+            load_cases_file = get_result_path(directory, LOAD_CASES_FILE)
+            model_load_cases = pq.read_metadata(load_cases_file).num_rows if load_cases_file.exists() else 0
+            if int(cases.max()) > max(number_of_load_cases, model_load_cases):
+                raise ValueError(f"Result case {int(cases.max())} is not a load case, so its load case factors "
+                                 f"are needed, e.g. get_load_case_factors(number_of_load_cases, "
+                                 f"CombinationSet.factors).")
+            load_case_factors = get_load_case_factors(max(number_of_load_cases, int(cases.max())))
+        if int(cases.max()) > len(load_case_factors):
+            raise ValueError(f"Result case {int(cases.max())} has no load case factors.")
+        factors = np.zeros((len(cases), number_of_load_cases))
+        available = min(number_of_load_cases, load_case_factors.shape[1])
+        factors[:, :available] = load_case_factors[cases - 1, :available]
+        effects = _get_load_effects(loads, request_beams, positions, x0, x1, t, number_of_load_cases)
+        interpolated += np.einsum("rlk,cl->rck", effects, factors)
+
+    columns = {"BeamNumber": pa.array(np.repeat(request_beams, len(cases)), type=pa.int32()),
+               "ResultCase": pa.array(np.tile(cases, len(request_beams)).astype(np.int32)),
+               "Position": pa.array(np.repeat(positions, len(cases)))}
+    columns.update({name: pa.array(interpolated[:, :, i].ravel()) for i, name in enumerate(_FORCE_COLUMNS)})
+    return pa.table(columns)
@@ -0,0 +1,83 @@
+"""
+Benchmark of a single-beam lookup across a multi-model beam force dataset (e.g. the 4 permanent and 143 ALS
+models), comparing files written in extraction order with files clustered by database_extraction.cluster_parquet_file.
+
+The models are extracted from fake_st7_backend into a hive-partitioned dataset, which is then copied and
+clustered, so both datasets hold exactly the same rows.
+
+Example:
+    python -m benchmarks.beam_lookup_benchmark --models 147 --beams 2000 --cases 50
+"""
+
+import argparse
+import logging
+import pathlib
+import shutil
+import statistics
+import tempfile
+import time
+
+import duckdb
+import numpy as np
+
+import database_extraction as de
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+from parquet_views import get_result_file, hive_source
+
+
+def build_datasets(root: pathlib.Path, models: int, beams: int, cases: int) -> tuple[pathlib.Path, pathlib.Path]:
+    """Extracts the models in extraction order, then copies the dataset and clusters every beam force file."""
+    output_options = {rt.label: "FALSE" for rt in ResultType}
+    output_options[ResultType.BEAM_FORCES.label] = "TRUE"
+
+    unsorted_root = root / "extraction_order"
+    for model in range(models):
+        de.set_st7_backend(FakeSt7Backend(nodes=beams, beams=beams, plates=0, primary_combinations=cases, seed=model))
+        de.extract_model_data(pathlib.Path(f"ALS_{model:03d}.st7"), pathlib.Path(f"ALS_{model:03d}.LSA"), root,
+                              unsorted_root, output_options=output_options,
+                              partition={"version": "V1", "model": f"ALS_{model:03d}"})
+
+    clustered_root = root / "clustered"
+    shutil.copytree(unsorted_root, clustered_root)
+    for model_directory in clustered_root.glob("version=*/model=*"):
+        de.cluster_parquet_file(get_result_file(model_directory, ResultType.BEAM_FORCES.file_name, hive=True),
+                                ResultType.BEAM_FORCES.sort_columns)
+
+    return unsorted_root, clustered_root
+
+
+def time_lookups(root: pathlib.Path, beam_numbers: list[int]) -> list[float]:
+    conn = duckdb.connect()
+    source = hive_source(root, ResultType.BEAM_FORCES.file_name)
+    durations = []
+    for beam in beam_numbers:
+        start = time.perf_counter()
+        conn.execute(f"SELECT model, ResultCase, Position, Fx, Fy, Fz, Mx, My, Mz FROM {source} "
+                     f"WHERE BeamNumber = {beam}").fetchall()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks single-beam lookups across a multi-model dataset.")
+    parser.add_argument("--models", type=int, default=147)
+    parser.add_argument("--beams", type=int, default=2_000)
+    parser.add_argument("--cases", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=20)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    lookup_beams = np.random.default_rng(0).integers(1, args.beams + 1, args.lookups).tolist()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        start = time.perf_counter()
+        datasets = build_datasets(pathlib.Path(temp_dir), args.models, args.beams, args.cases)
+        print(f"Built {args.models} models x {args.beams * args.cases * 5:,.0f} rows in {time.perf_counter() - start:.0f}s")
+
+        for label, dataset_root in zip(("Extraction order", "Clustered"), datasets):
+            size = sum(f.stat().st_size for f in dataset_root.rglob("*.parquet"))
+            time_lookups(dataset_root, lookup_beams[:1])  # Warm the file system cache
+            lookup_times = time_lookups(dataset_root, lookup_beams)
+            print(f"{label:<18} {size / 1e6:>8.1f} MB   median lookup {statistics.median(lookup_times) * 1000:>8.1f} ms")
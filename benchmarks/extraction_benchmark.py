@@ -0,0 +1,64 @@
+"""
+Benchmark of every ResultType extractor through database_extraction.parquet_insert, run against the synthetic
+model of fake_st7_backend, so that the extraction hot path can be profiled without Strand7.
+
+Example:
+    python -m benchmarks.extraction_benchmark --beams 25000 --nodes 20000 --cases 200
+"""
+
+import argparse
+import ctypes
+import pathlib
+import tempfile
+import time
+
+import database_extraction as de
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+def run_benchmark(backend: FakeSt7Backend, directory: pathlib.Path, result_types: list[ResultType],
+                  schema_version: int = 1) -> list[tuple[ResultType, int, float]]:
+    de.set_st7_backend(backend)
+    uID, primary_combo_count, secondary_combo_count = de.initialize_model(pathlib.Path("benchmark.st7"),
+                                                                          pathlib.Path("benchmark.LSA"), directory)
+    load_case_count = ctypes.c_int(0)
+    de._check_St7_error_message(backend.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+    mctx = de.ModelExtractionContext(pathlib.Path("benchmark.st7"), pathlib.Path("benchmark.LSA"), uID,
+                                     load_case_count, primary_combo_count, secondary_combo_count, directory,
+                                     dimensions=de.read_model_dimensions(uID))
+
+    timings = []
+    for rt in result_types:
+        start = time.perf_counter()
+        rows = de.parquet_insert(mctx, rt, schema_version=schema_version)
+        timings.append((rt, rows, time.perf_counter() - start))
+
+    de.close_model(uID)
+    return timings
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks the extractors against a synthetic Strand7 model.")
+    parser.add_argument("--nodes", type=int, default=10_000)
+    parser.add_argument("--beams", type=int, default=10_000)
+    parser.add_argument("--plates", type=int, default=2_000)
+    parser.add_argument("--cases", type=int, default=50, help="Number of primary combinations")
+    parser.add_argument("--schema-version", type=int, default=1, choices=(1, 2))
+    parser.add_argument("--result-types", nargs="*", default=None, help="ResultType names, e.g. BEAM_FORCES")
+    args = parser.parse_args()
+
+    fake_backend = FakeSt7Backend(nodes=args.nodes, beams=args.beams, plates=args.plates,
+                                  primary_combinations=args.cases)
+    selected = list(ResultType) if args.result_types is None else [ResultType[name] for name in args.result_types]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = run_benchmark(fake_backend, pathlib.Path(temp_dir), selected, args.schema_version)
+
+    print(f"{'Result type':<28}{'Rows':>14}{'Seconds':>10}{'Rows/s':>14}")
+    for result_type, row_count, duration in results:
+        print(f"{result_type.label:<28}{row_count:>14,.0f}{duration:>10.2f}{row_count / duration:>14,.0f}")
+    total_rows = sum(r[1] for r in results)
+    total_time = sum(r[2] for r in results)
+    print(f"{'Total':<28}{total_rows:>14,.0f}{total_time:>10.2f}{total_rows / total_time:>14,.0f}")
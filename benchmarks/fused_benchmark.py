@@ -0,0 +1,74 @@
+"""
+Benchmark of database_extraction.parquet_insert_fused, which reads several result types of the same entity type
+in one traversal of the result cases, against a parquet_insert per result type.
+
+The fake_st7_backend adds a per-call latency standing in for Strand7 reading the result file, and a latency on
+every change of result case standing in for Strand7 loading that case, which the fused traversal pays once per
+case rather than once per result type and case.
+
+Example:
+    python -m benchmarks.fused_benchmark --beams 10000 --cases 50 --case-latency 0.05
+"""
+
+import argparse
+import ctypes
+import logging
+import pathlib
+import tempfile
+import time
+
+import database_extraction as de
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+def open_context(backend: FakeSt7Backend, directory: pathlib.Path) -> de.ModelExtractionContext:
+    de.set_st7_backend(backend)
+    uID, primary_combo_count, secondary_combo_count = de.initialize_model(pathlib.Path("benchmark.st7"),
+                                                                          pathlib.Path("benchmark.LSA"), directory)
+    load_case_count = ctypes.c_int(0)
+    de._check_St7_error_message(backend.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+    return de.ModelExtractionContext(pathlib.Path("benchmark.st7"), pathlib.Path("benchmark.LSA"), uID,
+                                     load_case_count, primary_combo_count, secondary_combo_count, directory,
+                                     dimensions=de.read_model_dimensions(uID))
+
+
+def run_benchmark(backend: FakeSt7Backend, directory: pathlib.Path, result_types: list[ResultType],
+                  fused: bool) -> tuple[int, float]:
+    mctx = open_context(backend, directory)
+    start = time.perf_counter()
+    if fused:
+        rows = sum(de.parquet_insert_fused(mctx, result_types).values())
+    else:
+        rows = sum(de.parquet_insert(mctx, rt) for rt in result_types)
+    duration = time.perf_counter() - start
+    de.close_model(mctx.uID)
+    return rows, duration
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks the fused result extraction against a synthetic model.")
+    parser.add_argument("--nodes", type=int, default=10_000)
+    parser.add_argument("--beams", type=int, default=10_000)
+    parser.add_argument("--cases", type=int, default=50, help="Number of primary combinations")
+    parser.add_argument("--latency", type=float, default=5e-6, help="Seconds added to every result call")
+    parser.add_argument("--case-latency", type=float, default=0.05,
+                        help="Seconds added to every result call on a different result case to the previous one")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    fake_backend = FakeSt7Backend(nodes=args.nodes, beams=args.beams, plates=0, primary_combinations=args.cases,
+                                  call_latency=args.latency, case_latency=args.case_latency)
+    groups = {"Nodes": [ResultType.NODAL_REACTIONS, ResultType.NODAL_DISPLACEMENTS],
+              "Beams": [ResultType.BEAM_FORCES, ResultType.BEAM_DISPLACEMENTS]}
+
+    print(f"{'Entities':<10}{'Mode':<12}{'Rows':>12}{'Seconds':>9}{'Rows/s':>12}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, group in groups.items():
+            durations = []
+            for mode, fused in (("Separate", False), ("Fused", True)):
+                row_count, duration = run_benchmark(fake_backend, pathlib.Path(temp_dir), group, fused)
+                durations.append(duration)
+                print(f"{name:<10}{mode:<12}{row_count:>12,.0f}{duration:>9.2f}{row_count / duration:>12,.0f}")
+            print(f"{name:<10}{'Speed-up':<12}{durations[0] / durations[1]:>21.2f}x")
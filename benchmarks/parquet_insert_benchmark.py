@@ -0,0 +1,151 @@
+"""
+Benchmark comparing the row-tuple and typed column buffer paths through database_extraction.parquet_insert.
+
+Both paths write the real ResultType schemas from ctypes result arrays of the same shape the Strand7 API
+fills, so the difference in rows/s is the cost of boxing every value into a Python tuple and list.
+"""
+
+import ctypes
+import pathlib
+import tempfile
+import time
+from dataclasses import replace
+
+import numpy as np
+
+import database_extraction as de
+from database_extraction import ColumnBuffer, ParquetSettings, ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+BEAM_COUNT = 2_000
+NODE_COUNT = 10_000
+CASE_COUNT = 20
+POSITION_VALUES = (0.0, 0.25, 0.5, 0.75, 1.0)
+CASE_NAMES = [f"{c}: S2_Gmax + Ld(Wind Y Pos Down) + Ac(LL + T (+ve) + EHF +X)" for c in range(1, CASE_COUNT + 1)]
+
+
+class _BenchmarkResult:
+    """Stands in for a ResultType member so that parquet_insert can be driven with a benchmark extractor."""
+
+    def __init__(self, settings: ParquetSettings):
+        self.value = settings
+
+    def __getattr__(self, item):
+        return getattr(self.value, item)
+
+
+def _fill_results(values: ctypes.Array, seed: int):
+    """Mimics the Strand7 API filling a result array for one entity and result case."""
+    np.ctypeslib.as_array(values)[:] = np.random.default_rng(seed).standard_normal(len(values))
+
+
+def legacy_beam_forces(mctx, pfs: ParquetSettings):
+    """The original per-row beam force extraction loop, yielding one tuple per station."""
+    forces = (ctypes.c_double * (len(pfs.position_values) * 6))()
+    for case_number, case_name in enumerate(CASE_NAMES, start=1):
+        _fill_results(forces, case_number)
+        for beam in range(1, BEAM_COUNT + 1):
+            for i in range(len(pfs.position_values)):
+                position = f"{pfs.position_values[i]:.2f}"
+                fx = forces[(i * 6) + 0]
+                fy = forces[(i * 6) + 1]
+                fz = forces[(i * 6) + 2]
+                mx = forces[(i * 6) + 3]
+                my = forces[(i * 6) + 5]
+                mz = forces[(i * 6) + 4]
+                sid = f"{beam}-{case_number}-{position}"
+                yield sid, beam, case_number, case_name, float(position), fx, fy, fz, mx, my, mz
+
+
+def columnar_beam_forces(mctx, pfs: ParquetSettings):
+    """The typed column buffer beam force extraction loop used by extract_beam_forces."""
+    number_of_positions = len(pfs.position_values)
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size,
+                          blocks={"forces": {"Fx": 0, "Fy": 1, "Fz": 2, "Mx": 3, "My": 5, "Mz": 4}},
+                          derived={"ResultId": de._result_id_column("BeamNumber", pfs.position_values),
+                                   "ResultCaseName": de._case_name_column(CASE_NAMES),
+                                   "Position": de._station_position_column(pfs.position_values)},
+                          working={"Station": np.int8})
+    station_indices = np.arange(number_of_positions, dtype=np.int8)
+    forces = (ctypes.c_double * (number_of_positions * 6))()
+    force_values = np.ctypeslib.as_array(forces).reshape(number_of_positions, 6)
+
+    for case_number in range(1, CASE_COUNT + 1):
+        _fill_results(forces, case_number)
+        for beam in range(1, BEAM_COUNT + 1):
+            if not buffer.has_room(number_of_positions):
+                yield buffer.flush()
+            rows = buffer.reserve(number_of_positions)
+            buffer.columns["BeamNumber"][rows] = beam
+            buffer.columns["ResultCase"][rows] = case_number
+            buffer.columns["Station"][rows] = station_indices
+            buffer.blocks["forces"][rows] = force_values
+
+    if buffer.size:
+        yield buffer.flush()
+
+
+def legacy_nodal_results(mctx, pfs: ParquetSettings):
+    """The original per-row nodal result extraction loop."""
+    values = (ctypes.c_double * 6)()
+    for case_number, case_name in enumerate(CASE_NAMES, start=1):
+        _fill_results(values, case_number)
+        for node in range(1, NODE_COUNT + 1):
+            yield (f"{node}-{case_number}", node, case_number, case_name,
+                   values[0], values[1], values[2], values[3], values[4], values[5])
+
+
+def columnar_nodal_results(mctx, pfs: ParquetSettings):
+    """The typed column buffer nodal result extraction loop used by extract_nodal_reactions."""
+    result_fields = [f.name for f in pfs.schema][-6:]
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size,
+                          blocks={"results": {name: i for i, name in enumerate(result_fields)}},
+                          derived={"ResultId": de._result_id_column("NodeNumber"),
+                                   "ResultCaseName": de._case_name_column(CASE_NAMES)})
+    values = (ctypes.c_double * 6)()
+    result_values = np.ctypeslib.as_array(values)
+
+    for case_number in range(1, CASE_COUNT + 1):
+        _fill_results(values, case_number)
+        for node in range(1, NODE_COUNT + 1):
+            if not buffer.has_room(1):
+                yield buffer.flush()
+            row = buffer.reserve(1).start
+            buffer.columns["NodeNumber"][row] = node
+            buffer.columns["ResultCase"][row] = case_number
+            buffer.blocks["results"][row] = result_values
+
+    if buffer.size:
+        yield buffer.flush()
+
+
+def run_benchmark(rt: ResultType, extractor, directory: pathlib.Path) -> tuple[int, float]:
+    settings = replace(rt.value, extractor=extractor, position_values=POSITION_VALUES)
+    mctx = de.ModelExtractionContext(pathlib.Path("benchmark.st7"), pathlib.Path("benchmark.LSA"), ctypes.c_int(1),
+                                     ctypes.c_int(0), ctypes.c_int(CASE_COUNT), ctypes.c_int(0), directory)
+    start = time.perf_counter()
+    rows = de.parquet_insert(mctx, _BenchmarkResult(settings))
+    duration = time.perf_counter() - start
+    return rows, duration
+
+
+if __name__ == '__main__':
+
+    benchmarks = [(ResultType.BEAM_FORCES, legacy_beam_forces, columnar_beam_forces),
+                  (ResultType.NODAL_REACTIONS, legacy_nodal_results, columnar_nodal_results),
+                  (ResultType.NODAL_DISPLACEMENTS, legacy_nodal_results, columnar_nodal_results)]
+
+    # The extractors fill the results themselves, but the row estimates take the totals from the model
+    de.set_st7_backend(FakeSt7Backend(nodes=NODE_COUNT, beams=BEAM_COUNT, plates=0, primary_combinations=CASE_COUNT))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for result_type, legacy, columnar in benchmarks:
+            legacy_rows, legacy_time = run_benchmark(result_type, legacy, pathlib.Path(temp_dir))
+            columnar_rows, columnar_time = run_benchmark(result_type, columnar, pathlib.Path(temp_dir))
+            assert legacy_rows == columnar_rows
+
+            print(f"{result_type.label} ({legacy_rows:,.0f} rows)")
+            print(f"\tRow tuples:     {legacy_rows / legacy_time:>12,.0f} rows/s ({legacy_time:.2f}s)")
+            print(f"\tColumn buffers: {columnar_rows / columnar_time:>12,.0f} rows/s ({columnar_time:.2f}s)")
+            print(f"\tSpeed-up:       {legacy_time / columnar_time:>12.1f}x")
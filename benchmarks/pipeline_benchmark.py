@@ -0,0 +1,76 @@
+"""
+Benchmark of the pipelined database_extraction.parquet_insert, where the Parquet encoding runs on a writer
+thread while the extractor keeps calling Strand7, against the sequential insert.
+
+The fake_st7_backend adds a per-call latency standing in for Strand7 reading the result file, so the API
+time is realistic and the overlap with the encoding shows in the throughput.
+
+Example:
+    python -m benchmarks.pipeline_benchmark --beams 10000 --cases 50 --latency 50e-6
+"""
+
+import argparse
+import ctypes
+import logging
+import pathlib
+import tempfile
+import time
+
+import database_extraction as de
+from database_extraction import ExtractionTelemetry, ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+def run_benchmark(backend: FakeSt7Backend, directory: pathlib.Path, rt: ResultType, pipelined: bool,
+                  schema_version: int = 1, queue_size: int = 4) -> tuple[ExtractionTelemetry, float]:
+    de.set_st7_backend(backend)
+    uID, primary_combo_count, secondary_combo_count = de.initialize_model(pathlib.Path("benchmark.st7"),
+                                                                          pathlib.Path("benchmark.LSA"), directory)
+    load_case_count = ctypes.c_int(0)
+    de._check_St7_error_message(backend.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+    mctx = de.ModelExtractionContext(pathlib.Path("benchmark.st7"), pathlib.Path("benchmark.LSA"), uID,
+                                     load_case_count, primary_combo_count, secondary_combo_count, directory,
+                                     dimensions=de.read_model_dimensions(uID))
+
+    telemetry = ExtractionTelemetry(rt.label, rt.file_name)
+    start = time.perf_counter()
+    de.parquet_insert(mctx, rt, schema_version=schema_version, telemetry=telemetry, pipelined=pipelined,
+                      queue_size=queue_size)
+    duration = time.perf_counter() - start
+
+    de.close_model(uID)
+    return telemetry, duration
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks the pipelined Parquet writer against a synthetic model.")
+    parser.add_argument("--nodes", type=int, default=10_000)
+    parser.add_argument("--beams", type=int, default=10_000)
+    parser.add_argument("--plates", type=int, default=2_000)
+    parser.add_argument("--cases", type=int, default=50, help="Number of primary combinations")
+    parser.add_argument("--latency", type=float, default=50e-6, help="Seconds added to every result call")
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--schema-version", type=int, default=1, choices=(1, 2))
+    parser.add_argument("--result-types", nargs="*", default=["BEAM_FORCES", "NODAL_REACTIONS", "PLATE_LOCAL_STRESSES"],
+                        help="ResultType names, e.g. BEAM_FORCES")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    fake_backend = FakeSt7Backend(nodes=args.nodes, beams=args.beams, plates=args.plates,
+                                  primary_combinations=args.cases, call_latency=args.latency)
+
+    print(f"{'Result type':<28}{'Mode':<12}{'Rows':>12}{'Seconds':>9}{'Rows/s':>12}"
+          f"{'API s':>8}{'Encode s':>10}{'Wait s':>8}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in args.result_types:
+            result_type = ResultType[name]
+            durations = []
+            for mode, pipelined in (("Sequential", False), ("Pipelined", True)):
+                telemetry, duration = run_benchmark(fake_backend, pathlib.Path(temp_dir), result_type, pipelined,
+                                                    args.schema_version, args.queue_size)
+                durations.append(duration)
+                print(f"{result_type.label:<28}{mode:<12}{telemetry.rows:>12,.0f}{duration:>9.2f}"
+                      f"{telemetry.rows / duration:>12,.0f}{telemetry.api_seconds:>8.2f}"
+                      f"{telemetry.encode_seconds:>10.2f}{telemetry.queue_wait_seconds:>8.2f}")
+            print(f"{result_type.label:<28}{'Speed-up':<12}{durations[0] / durations[1]:>33.2f}x")
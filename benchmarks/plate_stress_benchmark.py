@@ -0,0 +1,37 @@
+"""
+Benchmark of the plate local and combined stress extractors, run against the synthetic model of fake_st7_backend
+at the scale of the roof glazing (tens of thousands of plates over hundreds of result cases).
+
+Example:
+    python -m benchmarks.plate_stress_benchmark --plates 50000 --cases 500
+"""
+
+import argparse
+import logging
+import pathlib
+import tempfile
+
+from benchmarks.extraction_benchmark import run_benchmark
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks the plate stress extractors against a synthetic model.")
+    parser.add_argument("--plates", type=int, default=50_000)
+    parser.add_argument("--cases", type=int, default=500, help="Number of primary combinations")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    fake_backend = FakeSt7Backend(nodes=args.plates, beams=0, plates=args.plates, primary_combinations=args.cases)
+    result_types = [ResultType.PLATE_LOCAL_STRESSES, ResultType.PLATE_COMBINED_STRESSES]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results = run_benchmark(fake_backend, pathlib.Path(temp_dir), result_types)
+
+    print(f"{'Result type':<28}{'API calls':>14}{'Rows':>14}{'Seconds':>10}{'Calls/s':>12}{'Rows/s':>14}")
+    for result_type, row_count, duration in results:
+        api_calls = args.plates * args.cases * len(result_type.surfaces)
+        print(f"{result_type.label:<28}{api_calls:>14,.0f}{row_count:>14,.0f}{duration:>10.2f}"
+              f"{api_calls / duration:>12,.0f}{row_count / duration:>14,.0f}")
@@ -0,0 +1,66 @@
+"""
+Benchmark of database_extraction.extract_result_file_data, which re-extracts the results from the result file
+alone using the topology snapshot of an earlier extraction, against a full extract_model_data of the same
+result types.
+
+The fake_st7_backend adds an `open_latency` to opening the model, standing in for Strand7 loading the model
+database, which the result-file-only extraction skips along with the model dimensions and dimension tables.
+The targeted extraction reads the beam forces of a few groups and result cases, where start-up dominates.
+
+Example:
+    python -m benchmarks.result_file_benchmark --beams 20000 --cases 50 --open-latency 20
+"""
+
+import argparse
+import logging
+import pathlib
+import tempfile
+import time
+
+import database_extraction as de
+from database_extraction import ExtractionFilter, ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks the result-file-only extraction against a synthetic model.")
+    parser.add_argument("--nodes", type=int, default=20_000)
+    parser.add_argument("--beams", type=int, default=20_000)
+    parser.add_argument("--cases", type=int, default=50, help="Number of primary combinations")
+    parser.add_argument("--groups", type=int, default=2, help="Number of the 10 groups extracted")
+    parser.add_argument("--latency", type=float, default=5e-6, help="Seconds added to every result call")
+    parser.add_argument("--open-latency", type=float, default=10.0, help="Seconds added to opening the model")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    fake_backend = FakeSt7Backend(nodes=args.nodes, beams=args.beams, plates=0, primary_combinations=args.cases,
+                                  call_latency=args.latency, open_latency=args.open_latency)
+    de.set_st7_backend(fake_backend)
+
+    result_types = (ResultType.NODAL_REACTIONS, ResultType.BEAM_FORCES)
+    output_options = {rt.label: "TRUE" if rt in result_types else "FALSE" for rt in ResultType}
+    groups = tuple(f"Model\\Group {i}" for i in range(1, args.groups + 1))
+    result_filters = {ResultType.BEAM_FORCES: ExtractionFilter(groups=groups, result_cases=(1, 2, 3))}
+
+    print(f"{'Mode':<28}{'Rows':>12}{'Seconds':>9}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = pathlib.Path(temp_dir)
+        result_file = directory / "benchmark.LSA"
+        result_file.touch()
+
+        durations = {}
+        for mode, write_topology in (("Full (writing snapshot)", True), ("Full", False)):
+            start = time.perf_counter()
+            rows = de.extract_model_data(directory / "benchmark.st7", result_file, directory, directory,
+                                         output_options=output_options, result_filters=result_filters,
+                                         write_topology=write_topology)
+            durations[mode] = time.perf_counter() - start
+            print(f"{mode:<28}{sum(rows.values()):>12,.0f}{durations[mode]:>9.2f}")
+
+        start = time.perf_counter()
+        rows = de.extract_result_file_data(result_file, directory, output_options=output_options,
+                                           result_filters=result_filters)
+        duration = time.perf_counter() - start
+        print(f"{'Result file only':<28}{sum(rows.values()):>12,.0f}{duration:>9.2f}")
+        print(f"{'Speed-up':<28}{durations['Full'] / duration:>21.2f}x")
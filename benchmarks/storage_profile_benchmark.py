@@ -0,0 +1,100 @@
+"""
+Benchmark of the database_extraction.STORAGE_PROFILES on a synthetic beam force table, reporting the write
+speed, file size, DuckDB scan time of a per-beam envelope and the largest value error of each profile.
+
+The forces vary smoothly along each beam and between cases, as real results do, so the encodings see the
+same kind of redundancy as in the extracted files.
+
+Example:
+    python -m benchmarks.storage_profile_benchmark --beams 20000 --cases 50
+"""
+
+import argparse
+import pathlib
+import tempfile
+import time
+
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import database_extraction as de
+from database_extraction import ResultType
+
+
+def build_beam_forces(beams: int, cases: int, batch_size: int, seed: int = 0) -> list[pa.RecordBatch]:
+    """Builds the beam forces (v2 layout) of every beam, case and station as RecordBatches of `batch_size` rows."""
+    rng = np.random.default_rng(seed)
+    positions = np.array(ResultType.BEAM_FORCES.position_values)
+    intercepts = rng.normal(0.0, 200.0, (beams, 6))
+    slopes = rng.normal(0.0, 50.0, (beams, 6))
+    case_factors = rng.uniform(-1.5, 1.5, cases)
+
+    # Rows in extraction order: case, then beam, then station
+    beam_numbers = np.tile(np.repeat(np.arange(1, beams + 1, dtype=np.int32), len(positions)), cases)
+    stations = np.tile(np.arange(len(positions), dtype=np.int8), beams * cases)
+    result_cases = np.repeat(np.arange(1, cases + 1, dtype=np.int16), beams * len(positions))
+    forces = ((intercepts[beam_numbers - 1] + slopes[beam_numbers - 1] * positions[stations][:, None]) *
+              case_factors[result_cases - 1][:, None])
+
+    schema = ResultType.BEAM_FORCES.slim_schema
+    batches = []
+    for start in range(0, len(beam_numbers), batch_size):
+        rows = slice(start, start + batch_size)
+        columns = {"BeamNumber": beam_numbers[rows], "ResultCase": result_cases[rows], "Station": stations[rows]}
+        columns.update({name: forces[rows, i] for i, name in enumerate(("Fx", "Fy", "Fz", "Mx", "My", "Mz"))})
+        batches.append(pa.RecordBatch.from_arrays([pa.array(columns[f.name], type=f.type) for f in schema],
+                                                  schema=schema))
+    return batches
+
+
+def write_profile(batches: list[pa.RecordBatch], file_path: pathlib.Path, profile: de.StorageProfile) -> float:
+    start = time.perf_counter()
+    schema = profile.apply(batches[0].schema)
+    with pq.ParquetWriter(file_path, schema=schema, **profile.writer_options(schema)) as writer:
+        for batch in batches:
+            writer.write_batch(profile.convert(batch, schema))
+    return time.perf_counter() - start
+
+
+def time_envelope_scan(file_path: pathlib.Path, repeats: int = 3) -> float:
+    """Median time of the per-beam max/min of every component, as the envelope reports compute it."""
+    components = ", ".join(f"max({c}), min({c})" for c in ("Fx", "Fy", "Fz", "Mx", "My", "Mz"))
+    conn = duckdb.connect()
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        conn.execute(f"SELECT BeamNumber, {components} FROM '{file_path}' GROUP BY BeamNumber").fetchall()
+        durations.append(time.perf_counter() - start)
+    conn.close()
+    return sorted(durations)[len(durations) // 2]
+
+
+def max_error(file_path: pathlib.Path, reference_path: pathlib.Path) -> float:
+    error = ", ".join(f"max(abs(CAST(a.{c} AS DOUBLE) - b.{c}))" for c in ("Fx", "Fy", "Fz", "Mx", "My", "Mz"))
+    return max(duckdb.sql(f"SELECT {error} FROM '{file_path}' a POSITIONAL JOIN '{reference_path}' b").fetchone())
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks the Parquet storage profiles on synthetic beam forces.")
+    parser.add_argument("--beams", type=int, default=20_000)
+    parser.add_argument("--cases", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=ResultType.BEAM_FORCES.value.batch_size)
+    args = parser.parse_args()
+
+    beam_force_batches = build_beam_forces(args.beams, args.cases, args.batch_size)
+    row_count = sum(b.num_rows for b in beam_force_batches)
+    print(f"{row_count:,.0f} beam force rows")
+    print(f"{'Profile':<12}{'Write s':>9}{'Rows/s':>13}{'Size MB':>10}{'Scan ms':>10}{'Max error':>12}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        reference = pathlib.Path(temp_dir) / f"{de.DEFAULT_STORAGE_PROFILE}.parquet"
+        for name, storage_profile in de.STORAGE_PROFILES.items():
+            profile_path = pathlib.Path(temp_dir) / f"{name}.parquet"
+            write_time = write_profile(beam_force_batches, profile_path, storage_profile)
+            scan_time = time_envelope_scan(profile_path)
+            print(f"{name:<12}{write_time:>9.2f}{row_count / write_time:>13,.0f}"
+                  f"{profile_path.stat().st_size / 1e6:>10.1f}{scan_time * 1000:>10.1f}"
+                  f"{max_error(profile_path, reference):>12.2g}")
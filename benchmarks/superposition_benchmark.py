@@ -0,0 +1,68 @@
+"""
+Benchmark of database_extraction's superposition mode, which reads only the primary load cases from Strand7 and
+superposes the combinations, against extracting every Strand7-solved combination, on the synthetic model of
+fake_st7_backend. The fake answers an API call far faster than Strand7, so the reduction in API calls is the
+better guide to the saving on a real model.
+
+Example:
+    python -m benchmarks.superposition_benchmark --beams 5000 --nodes 5000 --primary-cases 80 --combinations 1400
+"""
+
+import argparse
+import logging
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+
+import database_extraction as de
+from database_extraction import CombinationSet, ResultType
+from fake_st7_backend import FakeSt7Backend
+
+
+def random_combinations(number_of_combinations: int, number_of_primary_cases: int, seed: int = 0) -> CombinationSet:
+    """Sparse factor matrix resembling the Eurocode combinations, with about a quarter of the cases in each."""
+    rng = np.random.default_rng(seed)
+    factors = rng.choice([1.0, 1.35, 1.5, 0.75, 0.9], size=(number_of_combinations, number_of_primary_cases))
+    factors[rng.random(factors.shape) > 0.25] = 0.0
+    return CombinationSet(tuple(f"Combination {i + 1}" for i in range(number_of_combinations)), factors)
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Benchmarks superposed against Strand7-solved combinations.")
+    parser.add_argument("--nodes", type=int, default=2_000)
+    parser.add_argument("--beams", type=int, default=2_000)
+    parser.add_argument("--primary-cases", type=int, default=80)
+    parser.add_argument("--combinations", type=int, default=1_400)
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    combinations = random_combinations(args.combinations, args.primary_cases)
+    de.set_st7_backend(FakeSt7Backend(nodes=args.nodes, beams=args.beams, plates=0,
+                                      primary_combinations=args.primary_cases, combination_factors=combinations.factors))
+
+    output_options = {rt.label: "FALSE" for rt in ResultType}
+    for rt in (ResultType.BEAM_FORCES, ResultType.NODAL_REACTIONS):
+        output_options[rt.label] = "TRUE"
+    # Strand7 extraction reads every result case, the primary cases as well as the combinations
+    calls = {"Strand7 combinations": args.primary_cases + args.combinations, "Superposed": args.primary_cases}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = pathlib.Path(temp_dir)
+        print(f"{'Mode':<22}{'API calls':>14}{'Rows':>14}{'Seconds':>10}")
+        for mode, mode_combinations in (("Strand7 combinations", None), ("Superposed", combinations)):
+            start = time.perf_counter()
+            rows = de.extract_model_data(pathlib.Path("benchmark.st7"), pathlib.Path("benchmark.LSA"), temp_dir,
+                                         temp_dir / mode, output_options=output_options, schema_version=2,
+                                         combinations=mode_combinations)
+            duration = time.perf_counter() - start
+            api_calls = calls[mode] * (args.beams + args.nodes)
+            print(f"{mode:<22}{api_calls:>14,.0f}{sum(rows.values()):>14,.0f}{duration:>10.2f}")
+
+        print("\nVerification (largest difference relative to the largest result):")
+        for file_name, difference in de.verify_superposition(pathlib.Path("benchmark.st7"),
+                                                             pathlib.Path("benchmark.LSA"), temp_dir,
+                                                             combinations).items():
+            print(f"{file_name:<32}{difference:.2e}")
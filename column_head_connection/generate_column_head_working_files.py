@@ -1,6 +1,7 @@
 
 
 import duckdb
+from parquet_views import result_source
 import logging
 import time
 
@@ -75,7 +76,7 @@ def get_full_beam_force_query(bf_perm_parq_files: dict, bf_als_parq_files: dict,
     # First column_query the permanent models for the end forces that occur for our target beams
     perm_prequery = "\n UNION ALL ".join(f"SELECT "
                                     f"BeamNumber, ResultCaseName, ResultCase, Position, '{model_name}' AS Model, "
-                                    f"Fx, Fy, Fz, Mx, My, Mz FROM '{bf_perm_parq_file}' "
+                                    f"Fx, Fy, Fz, Mx, My, Mz FROM {result_source(bf_perm_parq_file)} "
                                     f"WHERE Position IN (0.0, 1.0) AND ResultCaseName NOT LIKE '%BIF%'"
                                     f"AND BeamNumber IN {beam_numbers}" for model_name,
                                     bf_perm_parq_file in bf_perm_parq_files.items())
@@ -85,7 +86,7 @@ def get_full_beam_force_query(bf_perm_parq_files: dict, bf_als_parq_files: dict,
     als_prequery = "\n UNION ALL ".join(f"""SELECT
                                             BeamIDNumber AS BeamNumber, ResultCaseName, ResultCase, Position, 
                                             '{model_name}' AS Model, Fx, Fy, Fz, Mx, My, Mz 
-                                            FROM '{bf_als_parq_file}' AS BF
+                                            FROM {result_source(bf_als_parq_file)} AS BF
                                             JOIN '{bp_als_parq_files[model_name]}' 
                                             AS BP ON BP.BeamNumber = BF.BeamNumber
                                             WHERE Position IN (0.0, 1.0) AND ResultCaseName NOT LIKE '%BIF%'
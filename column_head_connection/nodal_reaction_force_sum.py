@@ -14,6 +14,7 @@ Leaf 03-07\03-07\1D\G28 BracingPlanBot
 """
 
 import duckdb
+from parquet_views import result_source
 import csv
 from math import cos, sin, radians
 
@@ -1414,7 +1415,7 @@ def get_full_beam_force_query(location: str, bf_parq_files: dict, bp_parq_files:
 
     prequery = "\n UNION ALL ".join(f"SELECT "
                                     f"BeamNumber, ResultCaseName, ResultCase, Position, '{model_name}' AS Model, "
-                                    f"Fx, Fy, Fz, Mx, My, Mz FROM '{bf_parq_files[model_name]}' "
+                                    f"Fx, Fy, Fz, Mx, My, Mz FROM {result_source(bf_parq_files[model_name])} "
                                     f"WHERE Position IN (0.0, 1.0) AND ResultCaseName NOT LIKE '%BIF%' "
                                     f"AND BeamNumber IN {model_element_dict[model_name]} "
                                     f"AND BeamNumber NOT IN {excluded_beams[model_name][location]}" for model_name in bf_parq_files)
@@ -9,19 +9,40 @@ __version__ = "1.4.2"
 
 
 import ctypes
+import hashlib
+import json
+import os
 import pathlib
+import platform
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from getpass import getuser
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from enum import Enum
+from functools import lru_cache
 import logging
 from datetime import datetime
 from typing import Callable, Iterable, Union
-import tkinter as tk
-from tkinter import filedialog
+import duckdb
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 import St7API as St7
-from St7API import kMaxStrLen
+from eurocode_load_combinations import read_combination_file
+from parquet_views import (SCHEMA_VERSION_KEY, STATION_POSITIONS_KEY, STORAGE_PROFILE_KEY, RESULT_CASES_FILE, PROPERTIES_FILE, GROUPS_FILE,
+                           STATION_INTERPOLATION_KEY, LOAD_CASES_FILE, BEAM_FORCE_ENVELOPE_FILE, get_partition_directory, get_result_file)
+
+CHECKPOINT_JOURNAL_FILE = "extraction_journal.jsonl"
+RUN_REPORT_FILE = "extraction_report.json"
+MODEL_TOPOLOGY_FILE = "model_topology.parquet"
+MODEL_TOPOLOGY_KEY = b"model_topology"
+FINGERPRINT_KEY = b"input_fingerprint"
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +91,111 @@ class ErrorContext:
         logger.warning(f"Number of unique entities triggering warnings: {len(self.warning_entities):,.0f}\n")
 
 
+@dataclass(slots=True)
+class ExtractionTelemetry:
+    """Class to encapsulate the progress and timing counters of one result type's extraction.
+
+    The extractor time is split into the Arrow conversion of the column buffers and the rest, which is the
+    Strand7 API calls and the Python filling the buffers around them. The write time is the Arrow conversion
+    of tuple rows and the Parquet encoding and compression."""
+    label: str
+    file_name: str
+    expected_rows: int = None
+    rows: int = 0
+    batches: int = 0
+    extractor_seconds: float = 0.0
+    conversion_seconds: float = 0.0
+    write_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    bytes_written: int = 0
+    start: float = field(default_factory=time.perf_counter)
+    end: float = None
+    last_progress: float = field(default_factory=time.perf_counter)
+
+    @property
+    def seconds(self) -> float:
+        return (time.perf_counter() if self.end is None else self.end) - self.start
+
+    @property
+    def api_seconds(self) -> float:
+        return self.extractor_seconds - self.conversion_seconds
+
+    @property
+    def encode_seconds(self) -> float:
+        return self.write_seconds + self.conversion_seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / max(self.seconds, 1e-9)
+
+    @property
+    def eta_seconds(self) -> float:
+        if self.expected_rows is None or not self.rows:
+            return None
+        return max(self.expected_rows - self.rows, 0) / self.rows_per_second
+
+    def log_progress(self, logger):
+        self.last_progress = time.perf_counter()
+        if self.expected_rows:
+            progress = f"{self.rows:,.0f} of {self.expected_rows:,.0f} rows ({self.rows / self.expected_rows:.1%})"
+        else:
+            progress = f"{self.rows:,.0f} rows"
+        eta = "" if self.eta_seconds is None else f", ETA {self.eta_seconds / 60:,.1f} min"
+        logger.info(f"{self.label}: {progress} at {self.rows_per_second:,.0f} rows/s "
+                    f"(API {self.api_seconds:,.1f}s, encoding {self.encode_seconds:,.1f}s){eta}")
+
+    def as_dict(self) -> dict:
+        return {"Label": self.label, "FileName": self.file_name, "ExpectedRows": self.expected_rows,
+                "Rows": self.rows, "Batches": self.batches, "Seconds": round(self.seconds, 3),
+                "ApiSeconds": round(self.api_seconds, 3), "EncodeSeconds": round(self.encode_seconds, 3),
+                "QueueWaitSeconds": round(self.queue_wait_seconds, 3),
+                "RowsPerSecond": round(self.rows_per_second, 1), "BytesWritten": self.bytes_written}
+
+
+@dataclass(slots=True, frozen=True, eq=False)
+class CombinationSet:
+    """Class to encapsulate the load combinations superposed from the primary load case results.
+
+    Row i of the factors holds the factor on each primary result case (columns 1..n) for combination i, which
+    is written as result case primary_combo_count + i + 1, i.e. its number when Strand7 solves the same file."""
+    names: tuple
+    factors: np.ndarray
+
+
+@dataclass(slots=True, frozen=True)
+class ModelDimensions:
+    """Class to encapsulate the names of the model's properties, groups, load cases and freedom cases.
+
+    They are read once when the model is opened (see read_model_dimensions), so the extractors look names up
+    by number rather than calling the API for every entity and load, and are written to the small properties,
+    groups and load cases tables alongside the result files. Whether each node is restrained (or spring
+    supported) is cached the first time the restraints are read (see _get_restrained_nodes)."""
+    beam_properties: dict
+    plate_properties: dict
+    groups: dict
+    load_cases: tuple
+    freedom_cases: tuple
+    restrained_nodes: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True, frozen=True)
+class ModelTopology:
+    """Class to encapsulate what the result extraction needs from the model, so the results can be re-extracted
+    from the result file alone (see extract_result_file_data).
+
+    It is snapshotted to model_topology.parquet by a full extraction (see write_model_topology): the entity
+    totals, result case names, model dimensions (with every node in the restrained nodes cache), and the group
+    and end nodes of every node and beam, in arrays indexed by entity number."""
+    model_file: str
+    totals: dict
+    case_names: tuple
+    primary_combo_count: int
+    secondary_combo_count: int
+    dimensions: ModelDimensions
+    entity_groups: dict
+    beam_end_nodes: np.ndarray
+
+
 @dataclass(slots=True, frozen=True)
 class ModelExtractionContext:
     """Class to encapsulate information about the model required for the extraction functions."""
@@ -80,6 +206,204 @@ class ModelExtractionContext:
     primary_combo_count: ctypes.c_int
     secondary_combo_count: ctypes.c_int
     directory: pathlib.Path
+    result_cases: range = None
+    hive: bool = False
+    combinations: CombinationSet = None
+    dimensions: ModelDimensions = None
+    topology: ModelTopology = None
+    scratch_path: pathlib.Path = None
+    interpolate_stations: bool = False
+
+
+@dataclass(slots=True, frozen=True)
+class ExtractionFilter:
+    """Class to encapsulate the selection of a result type applied before the Strand7 API calls.
+
+    Entities are beam or node numbers, and groups are full group names (as in the beam properties GroupName).
+    Result cases are kept if they are in result_cases (all if None), their name is not in excluded_case_names,
+    and their name contains none of excluded_case_text (e.g. "BIF"). Positions replace the station positions
+    of beam results, e.g. (0.0, 1.0) for end forces only."""
+    entities: tuple = None
+    groups: tuple = None
+    result_cases: tuple = None
+    excluded_case_names: tuple = ()
+    excluded_case_text: tuple = ()
+    positions: tuple = None
+
+    def selects_case(self, case_number: int, case_name: str) -> bool:
+        if self.result_cases is not None and case_number not in self.result_cases:
+            return False
+        if case_name in self.excluded_case_names:
+            return False
+        return not any(text in case_name for text in self.excluded_case_text)
+
+
+DEFAULT_STORAGE_PROFILE = "default"
+
+# Float columns that key the rows, which the storage profiles leave as float64
+_KEY_FLOAT_COLUMNS = ("Position",)
+
+# Force and moment columns, which a profile with decimal places stores as fixed-precision integers
+_QUANTISED_COLUMNS = ("Fx", "Fy", "Fz", "Mx", "My", "Mz", "Rx", "Ry", "Rz", "Rxx", "Ryy", "Rzz")
+
+
+@dataclass(slots=True, frozen=True)
+class StorageProfile:
+    """Class to encapsulate how a result file is encoded, trading file size against write and scan speed.
+
+    The value columns are the float64 columns other than the keys (e.g. Position). They can be narrowed to
+    float32 and stored BYTE_STREAM_SPLIT, which groups the bytes of the values so that they compress better.
+    With decimal places, the force and moment columns are instead rounded and stored as int32 decimals,
+    i.e. DECIMAL(9, decimal_places), which is lossy past those places. 3 places only holds +/-999,999.999 in
+    the model units (kN and kNm for the roof models), so a column of a file with a value that does not fit,
+    or is not finite, is stored as float64 instead rather than being clipped (see _ProfiledWriter)."""
+    name: str
+    compression: str = "snappy"
+    compression_level: int = None
+    dictionary_strings_only: bool = False
+    float32: bool = False
+    byte_stream_split: bool = False
+    decimal_places: int = None
+
+    def _get_type(self, f: pa.Field) -> pa.DataType:
+        if not pa.types.is_float64(f.type) or f.name in _KEY_FLOAT_COLUMNS:
+            return f.type
+        if self.decimal_places is not None and f.name in _QUANTISED_COLUMNS:
+            return pa.decimal128(9, self.decimal_places)
+        return pa.float32() if self.float32 else f.type
+
+    def apply(self, schema: pa.Schema) -> pa.Schema:
+        """Gets the schema a file is written with, recording the profile in its key-value metadata."""
+        metadata = dict(schema.metadata or {})
+        if self.name != DEFAULT_STORAGE_PROFILE:
+            metadata[STORAGE_PROFILE_KEY] = self.name.encode()
+        return pa.schema([f.with_type(self._get_type(f)) for f in schema], metadata=metadata or None)
+
+    def writer_options(self, schema: pa.Schema) -> dict:
+        """Gets the ParquetWriter options for a schema returned by apply."""
+        encodings = {}
+        for f in schema:
+            if pa.types.is_decimal(f.type):
+                encodings[f.name] = "DELTA_BINARY_PACKED"
+            elif self.byte_stream_split and pa.types.is_floating(f.type) and f.name not in _KEY_FLOAT_COLUMNS:
+                encodings[f.name] = "BYTE_STREAM_SPLIT"
+
+        if self.dictionary_strings_only:
+            use_dictionary = [f.name for f in schema if pa.types.is_string(f.type)]
+        else:
+            # Columns with an explicit encoding cannot also be dictionary encoded
+            use_dictionary = [name for name in schema.names if name not in encodings] if encodings else True
+
+        options = {"compression": self.compression, "compression_level": self.compression_level,
+                   "use_dictionary": use_dictionary}
+        if encodings:
+            options["column_encoding"] = encodings
+        if self.decimal_places is not None:
+            options["store_decimal_as_integer"] = True
+        return options
+
+    def convert(self, data: Union[pa.RecordBatch, pa.Table], schema: pa.Schema) -> Union[pa.RecordBatch, pa.Table]:
+        """Casts a batch or table of the extraction schema to a schema returned by apply."""
+        if all(data.schema.field(f.name).type == f.type for f in schema):
+            return data
+        columns = []
+        for f in schema:
+            column = data.column(f.name)
+            if pa.types.is_decimal(f.type) and not pa.types.is_decimal(column.type):
+                # Rounded first, as the safe cast raises on any digits past the scale as well as on overflow
+                column = pc.round(column, f.type.scale)
+            columns.append(column.cast(f.type))
+        return type(data).from_arrays(columns, schema=schema)
+
+    def get_overflowing_columns(self, data: Union[pa.RecordBatch, pa.Table], schema: pa.Schema) -> list[str]:
+        """Gets the float columns of a batch or table with values that do not fit the decimals of a schema
+        returned by apply, once rounded to their scale."""
+        if self.decimal_places is None:
+            return []
+        overflowing = []
+        for f in schema:
+            column = data.column(f.name)
+            if pa.types.is_decimal(f.type) and pa.types.is_floating(column.type):
+                limit = 10.0 ** (f.type.precision - f.type.scale) - 10.0 ** -f.type.scale
+                values = np.round(column.fill_null(0.0).to_numpy(), f.type.scale)
+                if not (np.isfinite(values).all() and np.abs(values).max(initial=0.0) <= limit):
+                    overflowing.append(f.name)
+        return overflowing
+
+    @staticmethod
+    def widen(schema: pa.Schema, names: Iterable[str]) -> pa.Schema:
+        """Gets a schema returned by apply with the named columns stored as float64 instead."""
+        names = set(names)
+        return pa.schema([f.with_type(pa.float64()) if f.name in names else f for f in schema],
+                         metadata=schema.metadata)
+
+
+STORAGE_PROFILES = {profile.name: profile for profile in (
+    StorageProfile(DEFAULT_STORAGE_PROFILE),
+    # Light compression, and no dictionaries on the float columns, which never repeat enough to pay for them
+    StorageProfile("fast-write", compression="lz4", dictionary_strings_only=True),
+    StorageProfile("compact", compression="zstd", compression_level=3, dictionary_strings_only=True, float32=True,
+                   byte_stream_split=True),
+    StorageProfile("archival", compression="zstd", compression_level=15, dictionary_strings_only=True,
+                   byte_stream_split=True, decimal_places=3))}
+
+
+def get_storage_profile(name: str = None) -> StorageProfile:
+    if name is None:
+        return STORAGE_PROFILES[DEFAULT_STORAGE_PROFILE]
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile {name!r}. Expected one of {', '.join(STORAGE_PROFILES)}.")
+    return STORAGE_PROFILES[name]
+
+
+def _get_file_storage_profile(schema: pa.Schema) -> StorageProfile:
+    """Gets the storage profile a file was written with, so that rewriting it (e.g. clustering) keeps it."""
+    metadata = schema.metadata or {}
+    return get_storage_profile(metadata.get(STORAGE_PROFILE_KEY, DEFAULT_STORAGE_PROFILE.encode()).decode())
+
+
+class _ProfiledWriter:
+    """ParquetWriter for a result file written with a storage profile, converting the batches and tables of the
+    extraction schema to the profile's schema (see StorageProfile.convert).
+
+    If a batch has a value that does not fit a decimal column, the rows already written are rewritten with that
+    column as float64, one row group at a time, and the file carries on as float64 for it."""
+
+    def __init__(self, file_path: pathlib.Path, schema: pa.Schema, profile: StorageProfile):
+        self.file_path = file_path
+        self.schema = schema
+        self.profile = profile
+        self._writer = pq.ParquetWriter(file_path, schema=schema, **profile.writer_options(schema))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, data: Union[pa.RecordBatch, pa.Table]):
+        overflowing = self.profile.get_overflowing_columns(data, self.schema)
+        if overflowing:
+            self._widen(overflowing)
+        self._writer.write(self.profile.convert(data, self.schema))
+
+    def _widen(self, names: list[str]):
+        logger.warning(f"{', '.join(names)} in {self.file_path.name} do not fit the {self.profile.name} storage "
+                       f"profile's decimals, so are stored as float64.")
+        self._writer.close()
+        written_path = self.file_path.with_name(self.file_path.name + ".narrow")
+        os.replace(self.file_path, written_path)
+
+        self.schema = self.profile.widen(self.schema, names)
+        self._writer = pq.ParquetWriter(self.file_path, schema=self.schema, **self.profile.writer_options(self.schema))
+        with pq.ParquetFile(written_path) as written:
+            for row_group in range(written.num_row_groups):
+                table = written.read_row_group(row_group).cast(self.schema)
+                self._writer.write_table(table, row_group_size=table.num_rows)
+        written_path.unlink()
+
+    def close(self):
+        self._writer.close()
 
 
 @dataclass(slots=True, frozen=True)
@@ -89,6 +413,287 @@ class ParquetSettings:
     schema: pa.Schema
     extractor: Callable[[ModelExtractionContext, "ParquetSettings"], Iterable]
     position_values: tuple = (0.0, 0.25, 0.5, 0.75, 1.0)
+    batch_size: int = 50_000
+    slim_schema: pa.Schema = None
+    case_sharded: bool = False
+    sort_columns: tuple = ()
+    superposition_extractor: Callable[[ModelExtractionContext, "ParquetSettings"], Iterable] = None
+    result_filter: ExtractionFilter = None
+    sample_location: int = None
+    surfaces: tuple = ()
+    load_attributes: tuple = ()
+    telemetry: ExtractionTelemetry = None
+    pipelined: bool = False
+    envelope: "BeamForceEnvelope" = None
+    storage_profile: str = DEFAULT_STORAGE_PROFILE
+    restrained_only: bool = False
+    result_stream: Callable[[ModelExtractionContext, "ParquetSettings", list], "_ResultStream"] = None
+    result_file_readable: bool = False
+    fingerprint: str = None
+    station_interpolation: str = None
+
+
+class ColumnBuffer:
+    """Preallocated, typed column buffers used to stream extraction results into RecordBatches.
+
+    One NumPy array is allocated per schema field (plus any working columns). Blocks are 2D arrays
+    whose columns back several fields at once, so a whole ctypes result array can be copied in a
+    single assignment. Derived fields (e.g. the string ids) are computed from the filled columns
+    when the buffer is flushed, rather than once per row. A deferred buffer only copies the filled
+    columns when flushed, and leaves their conversion to the writer thread (see PendingBatch). An
+    accumulator (e.g. a BeamForceEnvelope) is updated with the filled columns of every flush."""
+
+    def __init__(self, schema: pa.Schema, capacity: int, blocks: dict = None, derived: dict = None,
+                 working: dict = None, telemetry: ExtractionTelemetry = None, deferred: bool = False,
+                 accumulator=None):
+        self.schema = schema
+        self.capacity = capacity
+        self.derived = derived or {}
+        self.telemetry = telemetry
+        self.deferred = deferred
+        self.accumulator = accumulator
+        self.size = 0
+        self.blocks = {}
+        self.columns = {}
+
+        for block_name, block_fields in (blocks or {}).items():
+            block = np.empty((capacity, max(block_fields.values()) + 1), dtype=np.float64)
+            self.blocks[block_name] = block
+            for field_name, column_index in block_fields.items():
+                self.columns[field_name] = block[:, column_index]
+
+        for f in schema:
+            if f.name not in self.columns and f.name not in self.derived:
+                self.columns[f.name] = np.empty(capacity, dtype=_numpy_dtype(f.type))
+
+        for name, dtype in (working or {}).items():
+            self.columns.setdefault(name, np.empty(capacity, dtype=dtype))
+
+    def has_room(self, rows: int) -> bool:
+        return self.size + rows <= self.capacity
+
+    def reserve(self, rows: int) -> slice:
+        """Claims the next `rows` rows of the buffer and returns them as a slice for filling."""
+        start = self.size
+        self.size += rows
+        return slice(start, self.size)
+
+    def flush(self) -> Union[pa.RecordBatch, "PendingBatch"]:
+        """Converts the filled rows into a RecordBatch (a PendingBatch if deferred) and resets the buffer for reuse."""
+        start = time.perf_counter()
+        if self.accumulator is not None:
+            self.accumulator.update({name: column[:self.size] for name, column in self.columns.items()})
+        if self.deferred:
+            # The copies detach the rows from the buffer, which is overwritten by the next fill
+            batch = PendingBatch(self.schema, self.derived,
+                                 {name: column[:self.size].copy() for name, column in self.columns.items()})
+        else:
+            filled = {name: column[:self.size] for name, column in self.columns.items()}
+            batch = _build_record_batch(self.schema, self.derived, filled, copy=True)
+        self.size = 0
+        if self.telemetry is not None:
+            self.telemetry.conversion_seconds += time.perf_counter() - start
+        return batch
+
+
+class PendingBatch:
+    """Rows copied out of a deferred ColumnBuffer, converted into a RecordBatch by the writer thread of a
+    pipelined extraction rather than by the thread calling the Strand7 API."""
+
+    __slots__ = ("schema", "derived", "columns", "num_rows")
+
+    def __init__(self, schema: pa.Schema, derived: dict, columns: dict):
+        self.schema = schema
+        self.derived = derived
+        self.columns = columns
+        self.num_rows = len(next(iter(columns.values()))) if columns else 0
+
+    def to_batch(self) -> pa.RecordBatch:
+        return _build_record_batch(self.schema, self.derived, self.columns, copy=False)
+
+
+def _build_record_batch(schema: pa.Schema, derived: dict, filled: dict, copy: bool) -> pa.RecordBatch:
+    arrays = []
+    for f in schema:
+        if f.name in derived:
+            arrays.append(derived[f.name](filled))
+        elif copy:
+            # The copy detaches the batch from the buffer, which is overwritten by the next fill
+            arrays.append(pa.array(np.ascontiguousarray(filled[f.name]).copy(), type=f.type))
+        else:
+            arrays.append(pa.array(filled[f.name], type=f.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class BeamForceEnvelope:
+    """Running maximum and minimum of every beam force component at every station, with the governing result
+    case, updated from the filled columns of the beam force buffers as the rows stream past.
+
+    Ties go to the lowest case number, so envelopes merged from case-range parts (see merge) are identical to
+    one accumulated over all the cases. The per-beam envelope is reduced from the stations when written."""
+
+    components = ("Fx", "Fy", "Fz", "Mx", "My", "Mz")
+
+    def __init__(self, position_values: tuple):
+        self.position_values = tuple(position_values)
+        shape = (0, len(self.position_values), len(self.components))
+        self.maxima = np.full(shape, -np.inf)
+        self.minima = np.full(shape, np.inf)
+        self.max_cases = np.zeros(shape, dtype=np.int32)
+        self.min_cases = np.zeros(shape, dtype=np.int32)
+
+    def _grow(self, number_of_beams: int):
+        extra = number_of_beams - len(self.maxima)
+        if extra <= 0:
+            return
+        shape = (extra,) + self.maxima.shape[1:]
+        self.maxima = np.concatenate([self.maxima, np.full(shape, -np.inf)])
+        self.minima = np.concatenate([self.minima, np.full(shape, np.inf)])
+        self.max_cases = np.concatenate([self.max_cases, np.zeros(shape, dtype=np.int32)])
+        self.min_cases = np.concatenate([self.min_cases, np.zeros(shape, dtype=np.int32)])
+
+    @staticmethod
+    def _combine(bound: np.ndarray, cases: np.ndarray, keys: np.ndarray, values: np.ndarray, value_cases: np.ndarray,
+                 upper: bool):
+        """Merges per-key extremes and their cases into the flattened (beam x station, component) bounds."""
+        current = bound[keys]
+        current_cases = cases[keys]
+        exceeds = values > current if upper else values < current
+        governs = exceeds | ((values == current) & (value_cases < current_cases))
+        bound[keys] = np.where(governs, values, current)
+        cases[keys] = np.where(governs, value_cases, current_cases)
+
+    def update(self, filled: dict):
+        beam_numbers = filled["BeamNumber"]
+        if not len(beam_numbers):
+            return
+        self._grow(int(beam_numbers.max()))
+
+        number_of_stations = len(self.position_values)
+        keys = (beam_numbers.astype(np.int64) - 1) * number_of_stations + filled["Station"]
+        values = np.column_stack([filled[c] for c in self.components])
+        result_cases = filled["ResultCase"].astype(np.int32)
+
+        # Group the rows by beam and station, so each bound of the batch is one reduceat per component
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        values = values[order]
+        result_cases = result_cases[order]
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        counts = np.diff(np.append(starts, len(keys)))
+
+        for bound, cases, reduce, upper in ((self.maxima, self.max_cases, np.maximum, True),
+                                            (self.minima, self.min_cases, np.minimum, False)):
+            batch = reduce.reduceat(values, starts, axis=0)
+            # The lowest case attaining each extreme of the batch
+            governing = np.where(values == np.repeat(batch, counts, axis=0), result_cases[:, None],
+                                 np.iinfo(np.int32).max)
+            batch_cases = np.minimum.reduceat(governing, starts, axis=0)
+            self._combine(bound.reshape(-1, len(self.components)), cases.reshape(-1, len(self.components)),
+                          keys[starts], batch, batch_cases, upper)
+
+    def merge(self, other: "BeamForceEnvelope"):
+        """Merges the envelope of another set of result cases (e.g. another shard) into this one."""
+        self._grow(len(other.maxima))
+        keys = np.arange(other.maxima.shape[0] * other.maxima.shape[1])
+        for bound, cases, other_bound, other_cases, upper in ((self.maxima, self.max_cases, other.maxima,
+                                                               other.max_cases, True),
+                                                              (self.minima, self.min_cases, other.minima,
+                                                               other.min_cases, False)):
+            # Unseen stations carry case 0, which must not win a tie against the infinite starting bound
+            other_cases = np.where(other_cases == 0, np.iinfo(np.int32).max, other_cases)
+            self._combine(bound.reshape(-1, len(self.components)), cases.reshape(-1, len(self.components)), keys,
+                          other_bound.reshape(-1, len(self.components)),
+                          other_cases.reshape(-1, len(self.components)), upper)
+
+    def to_table(self) -> pa.Table:
+        """Gets the envelope as one row per beam, station and component, followed by the whole-beam rows
+        (null Position) of each beam."""
+        number_of_stations = len(self.position_values)
+        number_of_components = len(self.components)
+        beams = np.flatnonzero((self.max_cases > 0).any(axis=(1, 2)))
+        positions = np.array(self.position_values)
+
+        # Station rows, then one whole-beam row, per component
+        max_station = np.argmax(self.maxima[beams], axis=1)
+        min_station = np.argmin(self.minima[beams], axis=1)
+        beam_maxima = np.take_along_axis(self.maxima[beams], max_station[:, None], axis=1)
+        beam_minima = np.take_along_axis(self.minima[beams], min_station[:, None], axis=1)
+        beam_max_cases = np.take_along_axis(self.max_cases[beams], max_station[:, None], axis=1)
+        beam_min_cases = np.take_along_axis(self.min_cases[beams], min_station[:, None], axis=1)
+
+        station_positions = np.broadcast_to(positions[None, :, None], (len(beams), number_of_stations,
+                                                                       number_of_components))
+        rows_per_beam = (number_of_stations + 1) * number_of_components
+        position_column = np.concatenate([station_positions, np.full((len(beams), 1, number_of_components), np.nan)],
+                                         axis=1)
+
+        def stack(station_values, beam_values):
+            return np.concatenate([station_values, beam_values], axis=1).reshape(-1)
+
+        return pa.Table.from_arrays([
+            pa.array(np.repeat(beams + 1, rows_per_beam), type=pa.int32()),
+            pa.array(position_column.reshape(-1), type=pa.float64(), from_pandas=True),
+            pa.array(np.tile(self.components, len(beams) * (number_of_stations + 1)), type=pa.string()),
+            pa.array(stack(self.maxima[beams], beam_maxima), type=pa.float64()),
+            pa.array(stack(self.max_cases[beams], beam_max_cases), type=pa.int32()),
+            pa.array(stack(station_positions, positions[max_station][:, None, :]), type=pa.float64()),
+            pa.array(stack(self.minima[beams], beam_minima), type=pa.float64()),
+            pa.array(stack(self.min_cases[beams], beam_min_cases), type=pa.int32()),
+            pa.array(stack(station_positions, positions[min_station][:, None, :]), type=pa.float64())],
+            schema=_BEAM_FORCE_ENVELOPE_SCHEMA)
+
+    @classmethod
+    def from_table(cls, table: pa.Table, position_values: tuple) -> "BeamForceEnvelope":
+        """Reads an envelope back from the station rows of a table written by to_table.
+
+        The positions are looked up in `position_values`, which are in station order and need not be sorted
+        (e.g. those of ExtractionFilter(positions=(1.0, 0.5, 0.0))). A position that is not one of them raises a
+        ValueError, as its rows would otherwise land on another station."""
+        envelope = cls(position_values)
+        table = table.filter(pc.is_valid(table["Position"]))
+        if not table.num_rows:
+            return envelope
+
+        beam_numbers = table["BeamNumber"].to_numpy()
+        envelope._grow(int(beam_numbers.max()))
+        station_lookup = {p: i for i, p in enumerate(envelope.position_values)}
+        positions, position_index = np.unique(table["Position"].to_numpy(), return_inverse=True)
+        unknown = [p for p in positions.tolist() if p not in station_lookup]
+        if unknown:
+            raise ValueError(f"The envelope positions {unknown} are not among its stations {envelope.position_values}.")
+        stations = np.array([station_lookup[p] for p in positions.tolist()], dtype=np.int64)[position_index]
+        components = np.searchsorted(np.array(cls.components), table["Component"].to_numpy(zero_copy_only=False),
+                                     sorter=np.argsort(cls.components))
+        components = np.argsort(cls.components)[components]
+        index = (beam_numbers - 1, stations, components)
+        envelope.maxima[index] = table["Max"].to_numpy()
+        envelope.max_cases[index] = table["MaxCase"].to_numpy()
+        envelope.minima[index] = table["Min"].to_numpy()
+        envelope.min_cases[index] = table["MinCase"].to_numpy()
+        return envelope
+
+    def write(self, file_path: pathlib.Path) -> int:
+        return _write_table(self.to_table(), file_path)
+
+
+def get_envelope_positions(rt: "ResultType", result_filter: ExtractionFilter = None) -> tuple:
+    """Gets the station positions of an envelope, rounded as in the Position column of the result file."""
+    position_values = result_filter.positions if result_filter is not None and result_filter.positions else None
+    return tuple(float(f"{p:.2f}") for p in (position_values or rt.position_values))
+
+
+def get_envelope_part_file(part_file: pathlib.Path) -> pathlib.Path:
+    """Gets the envelope of a beam force part file, kept alongside it until the parts are merged."""
+    return part_file.with_name(part_file.name.replace("part-", "envelope-", 1))
+
+
+def merge_envelope_files(envelope_files: list[pathlib.Path], file_path: pathlib.Path, position_values: tuple) -> int:
+    """Merges the envelopes of several case ranges into one envelope file. Returns the number of rows written."""
+    envelope = BeamForceEnvelope(position_values)
+    for envelope_file in envelope_files:
+        envelope.merge(BeamForceEnvelope.from_table(pq.read_table(envelope_file), position_values))
+    return envelope.write(file_path)
 
 
 class BeamLoadTypes(Enum):
@@ -100,14 +705,27 @@ class BeamLoadTypes(Enum):
     TRAPEZOIDAL = "Trapezoidal"
 
 
-_PLATE_LOCAL_STRESS_SCHEMA = pa.schema([("Sxx", pa.float64()),
+# Plate results are keyed by the surface and the point (1-based, in element node or Gauss point order)
+_PLATE_LOCAL_STRESS_SCHEMA = pa.schema([("ResultId", pa.string()),
+                                        ("PlateNumber", pa.int32()),
+                                        ("ResultCase", pa.int32()),
+                                        ("ResultCaseName", pa.string()),
+                                        ("Surface", pa.string()),
+                                        ("Point", pa.int8()),
+                                        ("Sxx", pa.float64()),
                                         ("Syy", pa.float64()),
                                         ("Szz", pa.float64()),
                                         ("Sxy", pa.float64()),
                                         ("Syz", pa.float64()),
                                         ("Sxz", pa.float64())])
 
-_PLATE_DERIVED_STRESS_SCHEMA = pa.schema([("S11", pa.float64()),
+_PLATE_DERIVED_STRESS_SCHEMA = pa.schema([("ResultId", pa.string()),
+                                          ("PlateNumber", pa.int32()),
+                                          ("ResultCase", pa.int32()),
+                                          ("ResultCaseName", pa.string()),
+                                          ("Surface", pa.string()),
+                                          ("Point", pa.int8()),
+                                          ("S11", pa.float64()),
                                           ("S22", pa.float64()),
                                           ("PrincipalAngle", pa.float64()),
                                           ("VonMises", pa.float64()),
@@ -118,9 +736,11 @@ _PLATE_DERIVED_STRESS_SCHEMA = pa.schema([("S11", pa.float64()),
                                           ("MaxAbsPrincipal", pa.float64())])
 
 _PLATE_PROPERTIES_SCHEMA = pa.schema([("PlateNumber", pa.int32()),
+                                      ("PropertyNumber", pa.int32()),
                                       ("PropertyName", pa.string()),
                                       ("PropertyType", pa.string()),
                                       ("ElementType", pa.string()),
+                                      ("GroupID", pa.int32()),
                                       ("GroupName", pa.string()),
                                       ("PlateIDNumber", pa.int32()),
                                       ("Area", pa.float64()),
@@ -169,6 +789,21 @@ _BEAM_FORCE_SCHEMA = pa.schema([
     ("Mz", pa.float64())
 ])
 
+# The force each beam end applies to its node, keyed by node so that nodal summations need no joins
+_BEAM_END_FORCE_SCHEMA = pa.schema([
+    ("NodeNumber", pa.int32()),
+    ("BeamNumber", pa.int32()),
+    ("BeamEnd", pa.int8()),
+    ("ResultCase", pa.int32()),
+    ("ResultCaseName", pa.string()),
+    ("Fx", pa.float64()),
+    ("Fy", pa.float64()),
+    ("Fz", pa.float64()),
+    ("Mx", pa.float64()),
+    ("My", pa.float64()),
+    ("Mz", pa.float64())
+])
+
 _BEAM_DISPLACEMENT_SCHEMA = pa.schema([("ResultId", pa.string()),
                                        ("BeamNumber", pa.int32()),
                                        ("ResultCase", pa.int32()),
@@ -183,7 +818,9 @@ _BEAM_PROPERTIES_SCHEMA = pa.schema([
     ("N1", pa.int32()),
     ("N2", pa.int32()),
     ("Length", pa.float64()),
+    ("PropertyNumber", pa.int32()),
     ("PropertyName", pa.string()),
+    ("GroupID", pa.int32()),
     ("GroupName", pa.string()),
     ("BeamIDNumber", pa.int32()),
     ("Dir1_X", pa.float64()),
@@ -267,6 +904,60 @@ _NODAL_DISPLACEMENTS_SCHEMA = pa.schema([
     ("Dzz", pa.float64())
 ])
 
+# Slim (v2) result layouts: integer composite keys, with names and positions held in dimension data
+_BEAM_FORCE_SCHEMA_V2 = pa.schema([
+    ("BeamNumber", pa.int32()),
+    ("ResultCase", pa.int16()),
+    ("Station", pa.int8()),
+    ("Fx", pa.float64()),
+    ("Fy", pa.float64()),
+    ("Fz", pa.float64()),
+    ("Mx", pa.float64()),
+    ("My", pa.float64()),
+    ("Mz", pa.float64())
+])
+
+_BEAM_DISPLACEMENT_SCHEMA_V2 = pa.schema([("BeamNumber", pa.int32()),
+                                          ("ResultCase", pa.int16()),
+                                          ("Station", pa.int8()),
+                                          ("Ux", pa.float64()),
+                                          ("Uy", pa.float64()),
+                                          ("Uz", pa.float64())])
+
+_NODAL_REACTIONS_SCHEMA_V2 = pa.schema([
+    ("NodeNumber", pa.int32()),
+    ("ResultCase", pa.int16()),
+    ("Rx", pa.float64()),
+    ("Ry", pa.float64()),
+    ("Rz", pa.float64()),
+    ("Rxx", pa.float64()),
+    ("Ryy", pa.float64()),
+    ("Rzz", pa.float64())
+])
+
+_NODAL_DISPLACEMENTS_SCHEMA_V2 = pa.schema([
+    ("NodeNumber", pa.int32()),
+    ("ResultCase", pa.int16()),
+    ("Dx", pa.float64()),
+    ("Dy", pa.float64()),
+    ("Dz", pa.float64()),
+    ("Dxx", pa.float64()),
+    ("Dyy", pa.float64()),
+    ("Dzz", pa.float64())
+])
+
+# Clustering keys for sorted writes. Only the columns present in the schema being written are used
+_BEAM_SORT_COLUMNS = ("BeamNumber", "ResultCase", "Station", "Position")
+_NODE_SORT_COLUMNS = ("NodeNumber", "ResultCase")
+_BEAM_END_SORT_COLUMNS = ("NodeNumber", "BeamNumber", "BeamEnd", "ResultCase")
+_PLATE_SORT_COLUMNS = ("PlateNumber", "ResultCase", "Surface", "Point")
+
+# Labels of the plate surfaces, indexed by the St7API psPlate constants
+_PLATE_SURFACE_LABELS = ("MidPlane", "MinusZ", "PlusZ")
+
+_RESULT_CASE_SCHEMA = pa.schema([("ResultCase", pa.int16()),
+                                 ("ResultCaseName", pa.string())])
+
 _NODAL_COORDINATES_SCHEMA = pa.schema([
     ("NodeNumber", pa.int32()),
     ("X", pa.float64()),
@@ -282,6 +973,74 @@ _NODAL_LOADING_SCHEMA = pa.schema([("LoadEntryID", pa.string()),
                                    ("Py", pa.float64()),
                                    ("Pz", pa.float64())])
 
+# Slim (v2) property and loading layouts keep the integer property, group and load case ids only, with the
+# names held in the properties, groups and load cases dimension tables
+_DIMENSION_NAME_COLUMNS = ("PropertyName", "GroupName", "LoadCaseName")
+
+
+def _without_dimension_names(schema: pa.Schema) -> pa.Schema:
+    return pa.schema([f for f in schema if f.name not in _DIMENSION_NAME_COLUMNS])
+
+
+_BEAM_PROPERTIES_SCHEMA_V2 = _without_dimension_names(_BEAM_PROPERTIES_SCHEMA)
+_PLATE_PROPERTIES_SCHEMA_V2 = _without_dimension_names(_PLATE_PROPERTIES_SCHEMA)
+_NODAL_LOADING_SCHEMA_V2 = _without_dimension_names(_NODAL_LOADING_SCHEMA)
+_BEAM_DISTRIBUTED_LOADING_SCHEMA_V2 = _without_dimension_names(_BEAM_DISTRIBUTED_LOADING_SCHEMA)
+_BEAM_NON_STRUCTURAL_MASS_SCHEMA_V2 = _without_dimension_names(_BEAM_NON_STRUCTURAL_MASS_SCHEMA)
+_BEAM_POINT_LOADING_SCHEMA_V2 = _without_dimension_names(_BEAM_POINT_LOADING_SCHEMA)
+_PLATE_LOADING_SCHEMA_V2 = _without_dimension_names(_PLATE_LOADING_SCHEMA)
+_PLATE_NON_STRUCTURAL_MASS_SCHEMA_V2 = _without_dimension_names(_PLATE_NON_STRUCTURAL_MASS_SCHEMA)
+
+_PROPERTIES_SCHEMA = pa.schema([("EntityType", pa.string()),
+                                ("PropertyNumber", pa.int32()),
+                                ("PropertyName", pa.string())])
+
+_GROUPS_SCHEMA = pa.schema([("GroupID", pa.int32()),
+                            ("GroupName", pa.string())])
+
+_LOAD_CASES_SCHEMA = pa.schema([("LoadCase", pa.int32()),
+                                ("LoadCaseName", pa.string())])
+
+# Restrained is null on the beam rows, and N1 and N2 on the node rows
+_MODEL_TOPOLOGY_SCHEMA = pa.schema([("EntityType", pa.string()),
+                                    ("EntityNumber", pa.int32()),
+                                    ("GroupID", pa.int32()),
+                                    ("Restrained", pa.bool_()),
+                                    ("N1", pa.int32()),
+                                    ("N2", pa.int32())])
+
+# Position is null on the rows enveloping the whole beam, which give the station of each extreme instead
+_BEAM_FORCE_ENVELOPE_SCHEMA = pa.schema([("BeamNumber", pa.int32()),
+                                         ("Position", pa.float64()),
+                                         ("Component", pa.string()),
+                                         ("Max", pa.float64()),
+                                         ("MaxCase", pa.int32()),
+                                         ("MaxPosition", pa.float64()),
+                                         ("Min", pa.float64()),
+                                         ("MinCase", pa.int32()),
+                                         ("MinPosition", pa.float64())])
+
+
+def set_st7_backend(backend):
+    """Sets the Strand7 API used by the extraction functions.
+
+    The default is the St7API module, which calls the Strand7 DLL. Any object providing the same functions
+    and constants can be used instead, e.g. fake_st7_backend.FakeSt7Backend for running without Strand7."""
+    global St7
+    St7 = backend
+
+
+def get_st7_backend():
+    return St7
+
+
+def _numpy_dtype(arrow_type: pa.DataType):
+    """Maps an Arrow type to the NumPy dtype used by the column buffers."""
+    try:
+        return np.dtype(arrow_type.to_pandas_dtype())
+    except NotImplementedError:
+        return np.dtype(object)
+
 
 def _check_St7_error_message(err_code: int, err_ctx=None, args=None):
     """Function for handling the errors received from the Strand7 API"""
@@ -308,16 +1067,271 @@ def _clear_lists(lists_to_clear: list):
         lst.clear()
 
 
-def _create_parq_table(writer: pq.ParquetWriter, lists_to_process: list, schema: pa.Schema):
+def _build_parq_table(lists_to_process: list, schema: pa.Schema, row_schema: pa.Schema = None) -> pa.Table:
     array = [pa.array(data) for data in lists_to_process]
-    table = pa.Table.from_arrays(array, schema=schema)
-    writer.write_table(table)
+    if row_schema is None or row_schema.names == schema.names:
+        return pa.Table.from_arrays(array, schema=schema)
+    # The rows are in the original (v1) layout, which the slim layouts keep a subset of
+    return pa.Table.from_arrays(array, schema=row_schema).select(schema.names).cast(schema)
+
+
+def _create_parq_table(writer: _ProfiledWriter, lists_to_process: list, schema: pa.Schema,
+                       row_schema: pa.Schema = None):
+    writer.write(_build_parq_table(lists_to_process, schema, row_schema))
     _clear_lists(lists_to_process)
 
 
+def _get_result_case_names(mctx: ModelExtractionContext) -> list[str]:
+    """Returns the names of all result cases, indexed by result case number - 1, from the topology snapshot if
+    the model is not open.
+
+    When superposing, the names of the combinations follow those of the primary result cases."""
+    case_names = []
+    number_of_cases = mctx.primary_combo_count.value
+    if mctx.combinations is None:
+        number_of_cases += mctx.secondary_combo_count.value
+    if mctx.topology is not None:
+        case_names.extend(mctx.topology.case_names[:number_of_cases])
+    for case_number in range(len(case_names) + 1, number_of_cases + 1):
+        case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
+        _check_St7_error_message(St7.St7GetResultCaseName(mctx.uID, case_number, case_name, St7.kMaxStrLen))
+        case_names.append(case_name.value.decode())
+    if mctx.combinations is not None:
+        case_names.extend(mctx.combinations.names)
+    return case_names
+
+
+def _get_result_case_range(mctx: ModelExtractionContext) -> range:
+    """Returns the result case numbers to extract, which is every case unless the context is limited to a shard.
+
+    When superposing, every case means the primary result cases followed by every combination, numbered on from
+    them, as Strand7 would number them if it solved the combinations."""
+    if mctx.result_cases is not None:
+        return mctx.result_cases
+    if mctx.combinations is not None:
+        return range(1, mctx.primary_combo_count.value + len(mctx.combinations.names) + 1)
+    return range(1, mctx.primary_combo_count.value + mctx.secondary_combo_count.value + 1)
+
+
+def _get_selected_cases(mctx: ModelExtractionContext, pfs: ParquetSettings, case_names: list[str]) -> list[int]:
+    """Returns the result cases to extract that are selected by the result type's filter."""
+    result_filter = pfs.result_filter
+    if result_filter is None:
+        return list(_get_result_case_range(mctx))
+    return [case_number for case_number in _get_result_case_range(mctx)
+            if result_filter.selects_case(case_number, case_names[case_number - 1])]
+
+
+def _get_selected_entities(mctx: ModelExtractionContext, pfs: ParquetSettings, entity_type: int,
+                           number_of_entities: int) -> list[int]:
+    """Returns the entity numbers selected by the result type's filter, in ascending order.
+
+    Filtering by group costs one API call per candidate entity, which is small next to its results, or none with
+    a topology snapshot. The group names come from the model dimensions. If the settings are restrained only
+    (the nodal reactions), only the restrained nodes are selected."""
+    result_filter = pfs.result_filter
+    if result_filter is None or result_filter.entities is None:
+        entities = range(1, number_of_entities + 1)
+    else:
+        entities = sorted(e for e in set(result_filter.entities) if 1 <= e <= number_of_entities)
+
+    if result_filter is not None and result_filter.groups is not None:
+        dimensions = _get_dimensions(mctx)
+        selected = []
+        group_id = ctypes.c_int(0)
+        for entity in entities:
+            if mctx.topology is not None:
+                group_id.value = int(mctx.topology.entity_groups[entity_type][entity])
+            else:
+                _check_St7_error_message(St7.St7GetEntityGroup(mctx.uID, entity_type, entity,
+                                                               ctypes.byref(group_id)))
+            if _get_group_name(mctx, dimensions, group_id.value) in result_filter.groups:
+                selected.append(entity)
+        entities = selected
+
+    if pfs.restrained_only and entity_type == St7.tyNODE:
+        return _get_restrained_nodes(mctx, entities)
+    return list(entities)
+
+
+def _get_restrained_nodes(mctx: ModelExtractionContext, nodes: Iterable[int]) -> list[int]:
+    """Returns the nodes restrained in any direction in any freedom case, which are the only nodes with reactions.
+
+    Nodes supported by a translational or rotational stiffness (grounded springs) in any freedom case count as
+    restrained, as Strand7 reports their spring forces as reactions. The restraints and stiffnesses are read
+    once per node and freedom case, which is far fewer calls than a result per node and result case, and are
+    cached in the model dimensions."""
+    dimensions = _get_dimensions(mctx)
+    freedom_case_count = len(dimensions.freedom_cases)
+    ucs_id = ctypes.c_int(0)
+    status = (ctypes.c_int * 6)()
+    values = (ctypes.c_double * 6)()
+    translational_stiffness = (ctypes.c_double * 3)()
+    rotational_stiffness = (ctypes.c_double * 3)()
+
+    nodes = list(nodes)
+    for node in nodes:
+        if node in dimensions.restrained_nodes:
+            continue
+        dimensions.restrained_nodes[node] = False
+        for freedom_case in range(1, freedom_case_count + 1):
+            _check_St7_error_message(St7.St7GetNodeRestraint6(mctx.uID, node, freedom_case, ctypes.byref(ucs_id),
+                                                              status, values))
+            if any(status):
+                dimensions.restrained_nodes[node] = True
+                break
+
+            _check_St7_error_message(St7.St7GetNodeKTranslation3F(mctx.uID, node, freedom_case, ctypes.byref(ucs_id),
+                                                                  translational_stiffness))
+            _check_St7_error_message(St7.St7GetNodeKRotation3F(mctx.uID, node, freedom_case, ctypes.byref(ucs_id),
+                                                               rotational_stiffness))
+            if any(translational_stiffness) or any(rotational_stiffness):
+                dimensions.restrained_nodes[node] = True
+                break
+
+    restrained = [node for node in nodes if dimensions.restrained_nodes[node]]
+    logger.info(f"{len(restrained)} of {len(nodes)} nodes are restrained or spring supported in "
+                f"{freedom_case_count} freedom cases.")
+    return restrained
+
+
+def load_combination_set(combination_fp: Union[str, pathlib.Path]) -> CombinationSet:
+    """Reads the combinations to superpose from a .lcf file (see eurocode_load_combinations).
+
+    The same set can be built in memory from CombinationFactory output with
+    CombinationSet(tuple(c.name for c in combinations), get_factor_matrix(combinations))."""
+    names, factors = read_combination_file(combination_fp)
+    return CombinationSet(tuple(names), factors)
+
+
+def _case_name_column(case_names: list[str]) -> Callable[[dict], pa.Array]:
+    """Derived column builder that looks up the ResultCaseName from the ResultCase column."""
+    names = pa.array(case_names, type=pa.string())
+
+    def build(columns: dict) -> pa.Array:
+        return names.take(pa.array(columns["ResultCase"] - 1))
+
+    return build
+
+
+def _result_id_column(entity_field: str, position_values: tuple = None) -> Callable[[dict], pa.Array]:
+    """Derived column builder for the "{entity}-{case}" (or "{entity}-{case}-{position:.2f}") result ids."""
+    positions = None if position_values is None else pa.array([f"{p:.2f}" for p in position_values])
+
+    def build(columns: dict) -> pa.Array:
+        parts = [pc.cast(pa.array(columns[entity_field]), pa.string()),
+                 pc.cast(pa.array(columns["ResultCase"]), pa.string())]
+        if positions is not None:
+            parts.append(positions.take(pa.array(columns["Station"])))
+        return pc.binary_join_element_wise(*parts, "-")
+
+    return build
+
+
+def _station_position_column(position_values: tuple) -> Callable[[dict], pa.Array]:
+    """Derived column builder that maps the station index back to its position along the beam."""
+    positions = pa.array(position_values, type=pa.float64())
+
+    def build(columns: dict) -> pa.Array:
+        return positions.take(pa.array(columns["Station"]))
+
+    return build
+
+
+def _beam_end_column() -> Callable[[dict], pa.Array]:
+    """Derived column builder numbering the beam ends 1 (N1) and 2 (N2) from the end station index."""
+
+    def build(columns: dict) -> pa.Array:
+        return pa.array(columns["Station"] + 1, type=pa.int8())
+
+    return build
+
+
+def _beam_end_node_column(end_nodes: np.ndarray) -> Callable[[dict], pa.Array]:
+    """Derived column builder that looks up the node at each beam end in the (beam number x end) node numbers."""
+
+    def build(columns: dict) -> pa.Array:
+        return pa.array(end_nodes[columns["BeamNumber"], columns["Station"]], type=pa.int32())
+
+    return build
+
+
+def _plate_surface_column() -> Callable[[dict], pa.Array]:
+    """Derived column builder that maps the St7API surface constant to its label."""
+    labels = pa.array(_PLATE_SURFACE_LABELS, type=pa.string())
+
+    def build(columns: dict) -> pa.Array:
+        return labels.take(pa.array(columns["SurfaceCode"]))
+
+    return build
+
+
+def _plate_result_id_column() -> Callable[[dict], pa.Array]:
+    """Derived column builder for the "{plate}-{case}-{surface}-{point}" plate result ids."""
+    labels = pa.array(_PLATE_SURFACE_LABELS, type=pa.string())
+
+    def build(columns: dict) -> pa.Array:
+        return pc.binary_join_element_wise(pc.cast(pa.array(columns["PlateNumber"]), pa.string()),
+                                           pc.cast(pa.array(columns["ResultCase"]), pa.string()),
+                                           labels.take(pa.array(columns["SurfaceCode"])),
+                                           pc.cast(pa.array(columns["Point"]), pa.string()), "-")
+
+    return build
+
+
+def write_result_case_table(mctx: ModelExtractionContext, file_path: pathlib.Path = None) -> int:
+    """Writes the result case dimension table used by the slim (v2) result layouts."""
+    case_names = _get_result_case_names(mctx)
+    if len(case_names) > np.iinfo(np.int16).max:
+        raise ValueError(f"{len(case_names)} result cases cannot be keyed by the int16 ResultCase of the v2 layout.")
+
+    table = pa.Table.from_arrays([pa.array(range(1, len(case_names) + 1), type=pa.int16()),
+                                  pa.array(case_names, type=pa.string())], schema=_RESULT_CASE_SCHEMA)
+    file_path = get_result_file(mctx.directory, RESULT_CASES_FILE, mctx.hive) if file_path is None else file_path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, file_path)
+    return table.num_rows
+
+
+def get_dimension_tables(mctx: ModelExtractionContext) -> dict[str, pa.Table]:
+    """Builds the properties, groups and load cases dimension tables the property and loading ids refer to,
+    keyed by their file names."""
+    dimensions = _get_dimensions(mctx)
+    entity_types = ["Beam"] * len(dimensions.beam_properties) + ["Plate"] * len(dimensions.plate_properties)
+    property_numbers = [*dimensions.beam_properties, *dimensions.plate_properties]
+    property_names = [*dimensions.beam_properties.values(), *dimensions.plate_properties.values()]
+
+    return {
+        PROPERTIES_FILE: pa.Table.from_arrays([pa.array(entity_types, type=pa.string()),
+                                               pa.array(property_numbers, type=pa.int32()),
+                                               pa.array(property_names, type=pa.string())],
+                                              schema=_PROPERTIES_SCHEMA),
+        GROUPS_FILE: pa.Table.from_arrays([pa.array(list(dimensions.groups), type=pa.int32()),
+                                           pa.array(list(dimensions.groups.values()), type=pa.string())],
+                                          schema=_GROUPS_SCHEMA),
+        LOAD_CASES_FILE: pa.Table.from_arrays([pa.array(range(1, len(dimensions.load_cases) + 1), type=pa.int32()),
+                                               pa.array(dimensions.load_cases, type=pa.string())],
+                                              schema=_LOAD_CASES_SCHEMA)}
+
+
+def _write_table(table: pa.Table, file_path: pathlib.Path) -> int:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, file_path)
+    return table.num_rows
+
+
+def write_dimension_tables(mctx: ModelExtractionContext) -> int:
+    """Writes the properties, groups and load cases dimension tables alongside the result files.
+
+    The slim (v2) property and loading layouts only store the ids, and the compatibility views join the names
+    back from these tables. Returns the number of rows written."""
+    return sum(_write_table(table, get_result_file(mctx.directory, file_name, mctx.hive))
+               for file_name, table in get_dimension_tables(mctx).items())
+
+
 # Initialize Strand7 model
-def initialize_model(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path):
-    uID = ctypes.c_int(1)  # Unique identifier for the model
+def initialize_model(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path, model_id: int = 1):
+    uID = ctypes.c_int(model_id)  # Unique identifier for the model
     _check_St7_error_message(St7.St7Init())
     p_combo_count = ctypes.c_int(0)
     s_combo_count = ctypes.c_int(0)
@@ -355,82 +1369,378 @@ def initialize_model(model_file: pathlib.Path, result_file: pathlib.Path, scratc
         raise RuntimeError("Failed to initialize Strand7 model and family_results.") from e
 
 
-# Function to extract nodal reactions
-def extract_nodal_reactions(mctx: ModelExtractionContext, pfs: ParquetSettings):
+# Initialize a Strand7 result file without its model
+def initialize_result_file(result_file: pathlib.Path, model_id: int = 1) -> ctypes.c_int:
+    """Opens the result file alone as a custom result file (St7OpenResFile), skipping the load of the model.
 
-    nNodes = ctypes.c_int(0)
-    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyNODE, ctypes.byref(nNodes)))
-    error_context = ErrorContext("extract_nodal_reactions")
+    Only the St7GetResFile* results can then be read, with the rest of the model taken from a topology
+    snapshot (see extract_result_file_data)."""
+    uID = ctypes.c_int(model_id)
+    _check_St7_error_message(St7.St7Init())
+    try:
+        _check_St7_error_message(St7.St7OpenResFile(uID, result_file.__str__().encode('utf-8')))
+        logger.info("Results accessed without the model.")
+        return uID
 
-    number_of_cases = mctx.primary_combo_count.value + mctx.secondary_combo_count.value
-    for case_number in range(1, number_of_cases + 1):
+    except Exception as e:
+        logger.error(e)
+        try:
+            St7.St7CloseResFile(uID)
+            St7.St7Release()
+        except Exception as e:
+            logger.error(e)
+            raise RuntimeError("Failed to close Strand7 result file.")
+        raise RuntimeError("Failed to open Strand7 result file.") from e
+
+
+# Read the property, group, load case and freedom case names of the opened model
+def read_model_dimensions(uID: ctypes.c_int) -> ModelDimensions:
+    """Reads the names of the model's properties, groups, load cases and freedom cases in one pass.
+
+    This is a few hundred API calls per model, in place of a name lookup per beam, plate and load in the
+    property and loading extractions."""
+
+    name = ctypes.create_string_buffer(St7.kMaxStrLen)
+
+    property_totals = (ctypes.c_int * St7.kMaxEntityTotals)()
+    last_property_numbers = (ctypes.c_int * St7.kMaxEntityTotals)()
+    _check_St7_error_message(St7.St7GetTotalProperties(uID, property_totals, last_property_numbers))
+
+    property_names = {}
+    property_number = ctypes.c_int(0)
+    for property_type, total_index in ((St7.ptBEAMPROP, St7.ipBeamPropTotal), (St7.ptPLATEPROP, St7.ipPlatePropTotal)):
+        property_names[property_type] = {}
+        for index in range(1, property_totals[total_index] + 1):
+            _check_St7_error_message(St7.St7GetPropertyNumByIndex(uID, property_type, index,
+                                                                  ctypes.byref(property_number)))
+            _check_St7_error_message(St7.St7GetPropertyName(uID, property_type, property_number, name, St7.kMaxStrLen))
+            property_names[property_type][property_number.value] = name.value.decode()
+
+    # The group names are the full names (e.g. "Model\Roof\Purlins") returned by St7GetGroupIDName
+    group_count = ctypes.c_int(0)
+    group_id = ctypes.c_int(0)
+    group_names = {}
+    _check_St7_error_message(St7.St7GetNumGroups(uID, ctypes.byref(group_count)))
+    for index in range(1, group_count.value + 1):
+        _check_St7_error_message(St7.St7GetGroupByIndex(uID, index, name, St7.kMaxStrLen, ctypes.byref(group_id)))
+        _check_St7_error_message(St7.St7GetGroupIDName(uID, group_id, name, St7.kMaxStrLen))
+        group_names[group_id.value] = name.value.decode()
 
-        case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-        _check_St7_error_message(St7.St7GetResultCaseName(mctx.uID, case_number, case_name, St7.kMaxStrLen))
+    load_case_count = ctypes.c_int(0)
+    load_case_names = []
+    _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+    for load_case in range(1, load_case_count.value + 1):
+        _check_St7_error_message(St7.St7GetLoadCaseName(uID, load_case, name, St7.kMaxStrLen))
+        load_case_names.append(name.value.decode())
+
+    freedom_case_count = ctypes.c_int(0)
+    freedom_case_names = []
+    _check_St7_error_message(St7.St7GetNumFreedomCase(uID, ctypes.byref(freedom_case_count)))
+    for freedom_case in range(1, freedom_case_count.value + 1):
+        _check_St7_error_message(St7.St7GetFreedomCaseName(uID, freedom_case, name, St7.kMaxStrLen))
+        freedom_case_names.append(name.value.decode())
+
+    logger.info(f"Model dimensions read: {len(property_names[St7.ptBEAMPROP])} beam properties, "
+                f"{len(property_names[St7.ptPLATEPROP])} plate properties, {len(group_names)} groups, "
+                f"{len(load_case_names)} load cases, {len(freedom_case_names)} freedom cases.")
+
+    return ModelDimensions(property_names[St7.ptBEAMPROP], property_names[St7.ptPLATEPROP], group_names,
+                           tuple(load_case_names), tuple(freedom_case_names))
+
+
+def _get_dimensions(mctx: ModelExtractionContext) -> ModelDimensions:
+    """Returns the cached model dimensions, reading them if the context was created without them."""
+    if mctx.dimensions is not None:
+        return mctx.dimensions
+    return read_model_dimensions(mctx.uID)
+
+
+def _get_property_name(mctx: ModelExtractionContext, dimensions: ModelDimensions, property_type: int,
+                       property_number: int) -> str:
+    """Looks up a property name in the dimensions, asking the API for numbers missing from them."""
+    property_names = dimensions.beam_properties if property_type == St7.ptBEAMPROP else dimensions.plate_properties
+    if property_number not in property_names:
+        name = ctypes.create_string_buffer(St7.kMaxStrLen)
+        _check_St7_error_message(St7.St7GetPropertyName(mctx.uID, property_type, property_number, name, St7.kMaxStrLen))
+        property_names[property_number] = name.value.decode()
+    return property_names[property_number]
+
+
+def _get_group_name(mctx: ModelExtractionContext, dimensions: ModelDimensions, group_id: int) -> str:
+    """Looks up a group name in the dimensions, asking the API for ids missing from them (e.g. the model's
+    root group, if the API does not list it)."""
+    if group_id not in dimensions.groups:
+        name = ctypes.create_string_buffer(St7.kMaxStrLen)
+        _check_St7_error_message(St7.St7GetGroupIDName(mctx.uID, group_id, name, St7.kMaxStrLen))
+        dimensions.groups[group_id] = name.value.decode()
+    return dimensions.groups[group_id]
+
+
+def check_result_file_topology(mctx: ModelExtractionContext):
+    """Checks that the opened result file holds the nodes, beams and result cases of the topology snapshot, no
+    more and no fewer, as the results of a re-solve that changed them would otherwise be keyed to the wrong
+    entities and case names. Raises a ValueError naming the totals that do not match."""
+    topology = mctx.topology
+    results = (ctypes.c_double * 6)()
+    station_count = ctypes.c_int(0)
+    missing = (St7.ERR7_ResFileDoesNotHaveEntity, St7.ERR7_ResFileInvalidCase)
+
+    def holds(err_code: int) -> bool:
+        if err_code in missing:
+            return False
+        # Any other error is raised, while a warned one (no results for the entity) still means it is held
+        _check_St7_error_message(err_code)
+        return True
+
+    def holds_node(node: int, case_number: int) -> bool:
+        return holds(St7.St7GetResFileNodeResult(mctx.uID, St7.rtNodeDisp, node, case_number, results))
+
+    def holds_beam(beam: int) -> bool:
+        return holds(St7.St7GetResFileBeamStations(mctx.uID, beam, ctypes.byref(station_count)))
+
+    nodes, beams, cases = topology.totals[St7.tyNODE], topology.totals[St7.tyBEAM], len(topology.case_names)
+    mismatches = []
+    if not holds_node(1, cases) or holds_node(1, cases + 1):
+        mismatches.append(f"{cases} result cases")
+    if not holds_node(nodes, 1) or holds_node(nodes + 1, 1):
+        mismatches.append(f"{nodes} nodes")
+    if (beams > 0 and not holds_beam(beams)) or holds_beam(beams + 1):
+        mismatches.append(f"{beams} beams")
+    if mismatches:
+        raise ValueError(f"The result file {mctx.result_file} does not match the topology snapshot of "
+                         f"{topology.model_file}, which has {', '.join(mismatches)}. Re-extract the model in full.")
+
+
+def _get_entity_total(mctx: ModelExtractionContext, entity_type: int) -> int:
+    """Returns the number of nodes, beams or plates, from the topology snapshot if the model is not open."""
+    if mctx.topology is not None:
+        return mctx.topology.totals[entity_type]
+    total = ctypes.c_int(0)
+    _check_St7_error_message(St7.St7GetTotal(mctx.uID, entity_type, ctypes.byref(total)))
+    return total.value
+
+
+# Read what the result extraction needs from the opened model
+def read_model_topology(mctx: ModelExtractionContext) -> ModelTopology:
+    """Reads the ModelTopology of the opened model.
+
+    This is a call per node and freedom case for the restraints, and a call per node and beam for the groups and
+    beam end nodes, which is small next to their results."""
+    dimensions = _get_dimensions(mctx)
+    totals = {entity_type: _get_entity_total(mctx, entity_type)
+              for entity_type in (St7.tyNODE, St7.tyBEAM, St7.tyPLATE)}
+    _get_restrained_nodes(mctx, range(1, totals[St7.tyNODE] + 1))
+
+    entity_groups = {}
+    group_id = ctypes.c_int(0)
+    for entity_type in (St7.tyNODE, St7.tyBEAM):
+        groups = np.zeros(totals[entity_type] + 1, dtype=np.int32)
+        for entity in range(1, totals[entity_type] + 1):
+            _check_St7_error_message(St7.St7GetEntityGroup(mctx.uID, entity_type, entity, ctypes.byref(group_id)))
+            groups[entity] = group_id.value
+        entity_groups[entity_type] = groups
+
+    # Every group used must be named in the snapshot, including any the API does not list
+    for group in np.unique(np.concatenate(list(entity_groups.values()))[1:]):
+        _get_group_name(mctx, dimensions, int(group))
+
+    # The snapshot describes the result file, so the case names are those of its cases, not of any combinations
+    case_names = _get_result_case_names(replace(mctx, combinations=None))
+    return ModelTopology(str(mctx.model_name), totals, tuple(case_names), mctx.primary_combo_count.value,
+                         mctx.secondary_combo_count.value, dimensions, entity_groups,
+                         _get_beam_end_nodes(mctx, range(1, totals[St7.tyBEAM] + 1)))
+
+
+def write_model_topology(mctx: ModelExtractionContext, file_path: pathlib.Path = None) -> int:
+    """Writes the topology snapshot of the opened model to model_topology.parquet alongside the result files.
+
+    The table has a row per node and beam, and the totals, case names and dimensions are in its key-value
+    metadata. Returns the number of rows written."""
+    topology = read_model_topology(mctx)
+    dimensions = topology.dimensions
+    nodes = np.arange(1, topology.totals[St7.tyNODE] + 1, dtype=np.int32)
+    beams = np.arange(1, topology.totals[St7.tyBEAM] + 1, dtype=np.int32)
+    restrained = [dimensions.restrained_nodes[node] for node in nodes.tolist()]
+
+    table = pa.Table.from_arrays([
+        pa.array(["Node"] * len(nodes) + ["Beam"] * len(beams), type=pa.string()),
+        pa.array(np.concatenate([nodes, beams]), type=pa.int32()),
+        pa.array(np.concatenate([topology.entity_groups[St7.tyNODE][1:], topology.entity_groups[St7.tyBEAM][1:]]),
+                 type=pa.int32()),
+        pa.array(restrained + [None] * len(beams), type=pa.bool_()),
+        pa.array([None] * len(nodes) + topology.beam_end_nodes[1:, 0].tolist(), type=pa.int32()),
+        pa.array([None] * len(nodes) + topology.beam_end_nodes[1:, 1].tolist(), type=pa.int32())],
+        schema=_MODEL_TOPOLOGY_SCHEMA)
+
+    model = {"ModelFile": topology.model_file,
+             "Totals": {str(entity_type): total for entity_type, total in topology.totals.items()},
+             "PrimaryCombinations": topology.primary_combo_count,
+             "SecondaryCombinations": topology.secondary_combo_count,
+             "ResultCases": list(topology.case_names),
+             "BeamProperties": dimensions.beam_properties, "PlateProperties": dimensions.plate_properties,
+             "Groups": dimensions.groups, "LoadCases": list(dimensions.load_cases),
+             "FreedomCases": list(dimensions.freedom_cases)}
+    table = table.replace_schema_metadata({MODEL_TOPOLOGY_KEY: json.dumps(model).encode()})
+
+    file_path = mctx.directory / MODEL_TOPOLOGY_FILE if file_path is None else file_path
+    logger.info(f"Model topology of {len(nodes)} nodes and {len(beams)} beams written to {file_path}.")
+    return _write_table(table, file_path)
+
+
+def load_model_topology(file_path: Union[str, pathlib.Path]) -> ModelTopology:
+    """Loads a topology snapshot written by write_model_topology."""
+    table = pq.read_table(file_path)
+    model = json.loads(table.schema.metadata[MODEL_TOPOLOGY_KEY])
+    totals = {int(entity_type): total for entity_type, total in model["Totals"].items()}
+
+    def numbered(names: dict) -> dict:
+        return {int(number): name for number, name in names.items()}
+
+    entity_types = table["EntityType"].to_numpy(zero_copy_only=False)
+    nodes = entity_types == "Node"
+    beams = entity_types == "Beam"
+    entity_numbers = table["EntityNumber"].to_numpy()
+    group_ids = table["GroupID"].to_numpy()
+
+    entity_groups = {}
+    for entity_type, rows in ((St7.tyNODE, nodes), (St7.tyBEAM, beams)):
+        entity_groups[entity_type] = np.zeros(totals[entity_type] + 1, dtype=np.int32)
+        entity_groups[entity_type][entity_numbers[rows]] = group_ids[rows]
+
+    beam_end_nodes = np.zeros((totals[St7.tyBEAM] + 1, 2), dtype=np.int32)
+    beam_end_nodes[entity_numbers[beams], 0] = table["N1"].filter(pa.array(beams)).to_numpy()
+    beam_end_nodes[entity_numbers[beams], 1] = table["N2"].filter(pa.array(beams)).to_numpy()
+
+    restrained = table["Restrained"].filter(pa.array(nodes)).to_pylist()
+    dimensions = ModelDimensions(numbered(model["BeamProperties"]), numbered(model["PlateProperties"]),
+                                 numbered(model["Groups"]), tuple(model["LoadCases"]), tuple(model["FreedomCases"]),
+                                 restrained_nodes=dict(zip(entity_numbers[nodes].tolist(), restrained)))
+
+    return ModelTopology(model["ModelFile"], totals, tuple(model["ResultCases"]), model["PrimaryCombinations"],
+                         model["SecondaryCombinations"], dimensions, entity_groups, beam_end_nodes)
 
-        case_name_string = case_name.value.decode()
-        logger.info(f"Extracting node reactions for result case {case_name_string}...")
 
-        reaction_array = ctypes.c_double * 6
-        reactions = reaction_array()
+@dataclass(slots=True)
+class _ResultStream:
+    """Class to encapsulate one result type read in a traversal of the result cases (see _traverse_results).
 
-        for node in range(1, nNodes.value + 1):
+    `read(entity, case_number, case_name)` reads an entity's results for a case from Strand7 into the buffer,
+    returning the full buffer's batch if it had to be flushed first, else None."""
+    description: str
+    buffer: ColumnBuffer
+    entities: list
+    cases: list
+    read: Callable
+    error_context: ErrorContext
 
-            # Need a method for returning a zeroed array if the called function returns zero reaction
-            _check_St7_error_message(St7.St7GetNodeResult(mctx.uID, St7.rtNodeReact, node, case_number, reactions),
-                                     error_context,
-                                     args=("NodeReaction", node, case_name.value.decode()))
-            result_id = f"{node}-{case_number}"
-            fx = float(reactions[0])
-            fy = float(reactions[1])
-            fz = float(reactions[2])
-            mx = float(reactions[3])
-            my = float(reactions[4])
-            mz = float(reactions[5])
 
-            result = (result_id, node, case_number, case_name_string, fx, fy, fz, mx, my, mz)
+def _traverse_results(streams: list[_ResultStream], case_names: list[str]):
+    """Visits every result case selected by any of the streams once, and every entity selected by any of them
+    once per case, reading each stream that selects the entity and case in that visit.
 
-            yield result
+    Yields (stream index, batch) as the buffers fill, then the rest of every buffer at the end. With a single
+    stream this is the plain loop over its cases and entities."""
 
-    logger.info("Nodal reactions written to DB.")
-    error_context.log_errors(logger)
+    if len(streams) == 1:
+        entities = streams[0].entities
+    else:
+        entities = sorted(set().union(*(s.entities for s in streams)))
+    cases = sorted(set().union(*(s.cases for s in streams)))
 
+    # Only the streams selecting fewer entities than the union need a membership test
+    entity_sets = [None if len(s.entities) == len(entities) else set(s.entities) for s in streams]
+    case_sets = [set(s.cases) for s in streams]
+    description = " and ".join(s.description for s in streams)
 
-# Function to extract nodal displacements
-def extract_nodal_displacements(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    for case_number in cases:
+        case_name_string = case_names[case_number - 1]
+        active = [(i, s.read, entity_sets[i]) for i, s in enumerate(streams) if case_number in case_sets[i]]
 
-    nNodes = ctypes.c_int(0)
-    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyNODE, ctypes.byref(nNodes)))
-    error_context = ErrorContext("extract_nodal_displacements")
+        logger.info(f"Extracting {description} for result case {case_name_string}...")
 
-    number_of_cases = mctx.primary_combo_count.value + mctx.secondary_combo_count.value
-    for case_number in range(1, number_of_cases + 1):
+        for entity in entities:
+            for i, read, entity_set in active:
+                if entity_set is None or entity in entity_set:
+                    batch = read(entity, case_number, case_name_string)
+                    if batch is not None:
+                        yield i, batch
 
-        case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-        _check_St7_error_message(St7.St7GetResultCaseName(mctx.uID, case_number, case_name, St7.kMaxStrLen))
-        logger.info(f"Extracting node displacements for result case {case_name.value.decode()}...")
+    for i, stream in enumerate(streams):
+        if stream.buffer.size:
+            yield i, stream.buffer.flush()
 
-        displacement_array = ctypes.c_double * 6
-        displacements = displacement_array()
+        logger.info(f"{stream.description.capitalize()} written to DB.")
+        stream.error_context.log_errors(logger)
 
-        for node in range(1, nNodes.value + 1):
 
-            _check_St7_error_message(St7.St7GetNodeResult(mctx.uID, St7.rtNodeDisp, node, case_number, displacements),
-                                     error_context,
-                                     args=("NodeDisplacement", node, case_name.value.decode()))
-            result_id = f"{node}-{case_number}"
-            dx = displacements[0]
-            dy = displacements[1]
-            dz = displacements[2]
-            dxx = displacements[3]
-            dyy = displacements[4]
-            dzz = displacements[5]
+def _extract_result_stream(mctx: ModelExtractionContext, pfs: ParquetSettings, stream_builder: Callable):
+    """Extracts a single result type through _traverse_results, yielding its batches."""
+    case_names = _get_result_case_names(mctx)
+    for _, batch in _traverse_results([stream_builder(mctx, pfs, case_names)], case_names):
+        yield batch
 
-            result = (result_id, node, case_number, case_name.value.decode(), dx, dy, dz, dxx, dyy, dzz)
-            yield result
 
-    logger.info("Nodal displacements written to DB.")
-    error_context.log_errors(logger)
+def _node_result_stream(mctx: ModelExtractionContext, pfs: ParquetSettings, case_names: list[str], result_type: int,
+                        block_fields: dict, description: str, calling_function: str, label: str) -> _ResultStream:
+    """Builds the stream of a node result type (e.g. rtNodeReact), with a row per node and case."""
+
+    error_context = ErrorContext(calling_function)
+
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size, telemetry=pfs.telemetry, deferred=pfs.pipelined,
+                          blocks={"results": block_fields},
+                          derived={"ResultId": _result_id_column("NodeNumber"),
+                                   "ResultCaseName": _case_name_column(case_names)})
+    result_block = buffer.blocks["results"]
+    node_numbers = buffer.columns["NodeNumber"]
+    result_cases = buffer.columns["ResultCase"]
+
+    result_array = ctypes.c_double * 6
+    results = result_array()
+    result_values = np.ctypeslib.as_array(results)[:len(block_fields)]
+
+    # A custom result file has the same node result columns (ipNodeResFileDX...) as St7GetNodeResult
+    get_node_result = St7.St7GetNodeResult if mctx.topology is None else St7.St7GetResFileNodeResult
+
+    def read(node: int, case_number: int, case_name_string: str):
+        # Need a method for returning a zeroed array if the called function returns zero reaction
+        _check_St7_error_message(get_node_result(mctx.uID, result_type, node, case_number, results),
+                                 error_context,
+                                 args=(label, node, case_name_string))
+
+        batch = buffer.flush() if not buffer.has_room(1) else None
+
+        row = buffer.reserve(1).start
+        node_numbers[row] = node
+        result_cases[row] = case_number
+        result_block[row] = result_values
+        return batch
+
+    selected_nodes = _get_selected_entities(mctx, pfs, St7.tyNODE, _get_entity_total(mctx, St7.tyNODE))
+    selected_cases = _get_selected_cases(mctx, pfs, case_names)
+    return _ResultStream(description, buffer, selected_nodes, selected_cases, read, error_context)
+
+
+def _nodal_reaction_stream(mctx: ModelExtractionContext, pfs: ParquetSettings, case_names: list[str]) -> _ResultStream:
+    return _node_result_stream(mctx, pfs, case_names, St7.rtNodeReact,
+                               {"Rx": 0, "Ry": 1, "Rz": 2, "Rxx": 3, "Ryy": 4, "Rzz": 5},
+                               "nodal reactions", "extract_nodal_reactions", "NodeReaction")
+
+
+def _nodal_displacement_stream(mctx: ModelExtractionContext, pfs: ParquetSettings,
+                               case_names: list[str]) -> _ResultStream:
+    return _node_result_stream(mctx, pfs, case_names, St7.rtNodeDisp,
+                               {"Dx": 0, "Dy": 1, "Dz": 2, "Dxx": 3, "Dyy": 4, "Dzz": 5},
+                               "nodal displacements", "extract_nodal_displacements", "NodeDisplacement")
+
+
+# Function to extract nodal reactions
+def extract_nodal_reactions(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _extract_result_stream(mctx, pfs, _nodal_reaction_stream)
+
+
+# Function to extract nodal displacements
+def extract_nodal_displacements(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _extract_result_stream(mctx, pfs, _nodal_displacement_stream)
 
 
 # Function to extract nodal coordinates
@@ -464,6 +1774,8 @@ def extract_nodal_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
 
     logger.info("Extracting nodal loading...")
 
+    load_case_names = _get_dimensions(mctx).load_cases
+
     node_force_array = ctypes.c_double * 3
     node_forces = node_force_array()
 
@@ -480,9 +1792,8 @@ def extract_nodal_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
         for i in range(node_force_count.value):
 
             load_case = node_force_entities[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
+            load_case_name = load_case_names[load_case - 1]
 
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
             _check_St7_error_message(St7.St7GetNodeForce3(mctx.uID, node, load_case, node_forces))
 
             px = node_forces[0]
@@ -490,7 +1801,7 @@ def extract_nodal_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
             pz = node_forces[2]
             sid = f"{node}-{load_case}"
 
-            result = (sid, node, load_case, load_case_name.value.decode(), px, py, pz)
+            result = (sid, node, load_case, load_case_name, px, py, pz)
 
             yield result
 
@@ -503,6 +1814,8 @@ def extract_beam_properties(mctx: ModelExtractionContext, pfs: ParquetSettings):
 
     logger.info("Extracting beam attributes and properties...")
 
+    dimensions = _get_dimensions(mctx)
+
     for beam in range(1, nBeams.value + 1):
         # Create an array to store the connection information
         connection_array = ctypes.c_int * St7.kMaxElementNode
@@ -515,19 +1828,18 @@ def extract_beam_properties(mctx: ModelExtractionContext, pfs: ParquetSettings):
         id_number = ctypes.c_int(0)
         _check_St7_error_message(St7.St7GetBeamID(mctx.uID, beam, id_number))
 
-        # Access the property associated with the beam
+        # Access the property associated with the beam, with its name from the model dimensions
         property_number = ctypes.c_int(0)
-        property_name = ctypes.create_string_buffer(St7.kMaxStrLen)
         _check_St7_error_message(St7.St7GetElementProperty(mctx.uID, St7.ptBEAMPROP, beam, ctypes.byref(property_number)))
-        _check_St7_error_message(St7.St7GetPropertyName(mctx.uID, St7.ptBEAMPROP, property_number, property_name, St7.kMaxStrLen))
+        property_name = _get_property_name(mctx, dimensions, St7.ptBEAMPROP, property_number.value)
 
         # Access the group associated with the beam
         group_id = ctypes.c_int(0)
-        group_name = ctypes.create_string_buffer(St7.kMaxStrLen)
         _check_St7_error_message(St7.St7GetEntityGroup(mctx.uID, St7.tyBEAM, beam, ctypes.byref(group_id)))
-        _check_St7_error_message(St7.St7GetGroupIDName(mctx.uID, group_id, group_name, St7.kMaxStrLen))
+        group_name = _get_group_name(mctx, dimensions, group_id.value)
 
-        # Access the beam axes data
+        # Access the principal axis system of the beam: the global components of axes 1, 2 and 3 (along the
+        # beam), which parquet_views.principal_to_global uses to give the beam forces in the global axes
         axis_data = ctypes.c_double * 9
         axis_array = axis_data()
 
@@ -552,8 +1864,8 @@ def extract_beam_properties(mctx: ModelExtractionContext, pfs: ParquetSettings):
         dir3_y = axis_array[7]
         dir3_z = axis_array[8]
 
-        result = (beam, node1, node2, length, property_name.value.decode(),
-                  group_name.value.decode(), id_number.value, dir1_x, dir1_y, dir1_z,
+        result = (beam, node1, node2, length, property_number.value, property_name,
+                  group_id.value, group_name, id_number.value, dir1_x, dir1_y, dir1_z,
                   dir2_x, dir2_y, dir2_z, dir3_x, dir3_y, dir3_z)
         yield result
 
@@ -566,6 +1878,8 @@ def extract_beam_distributed_loading(mctx: ModelExtractionContext, pfs: ParquetS
 
     logger.info(f"Extracting beam distributed loads...")
 
+    load_case_names = _get_dimensions(mctx).load_cases
+
     for beam in range(1, nBeams.value + 1):
 
         # We need to access the number of different loads of a given type applied to a beam
@@ -584,10 +1898,7 @@ def extract_beam_distributed_loading(mctx: ModelExtractionContext, pfs: ParquetS
         for i in range(dist_principal_load_count.value):
             axis = load_entity_values[(4 * i) + St7.ipAttrAxis]
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
-
+            load_case_name = load_case_names[load_case - 1]
             id_number = load_entity_values[(4 * i) + St7.ipAttrID]
             sid = f"{beam}-DLL-{load_case}-{id_number}"
             dl_type = ctypes.c_int(0)
@@ -621,7 +1932,7 @@ def extract_beam_distributed_loading(mctx: ModelExtractionContext, pfs: ParquetS
             a = dl_values[4]
             b = dl_values[5]
 
-            result = (sid, "DistPrincipal", beam, load_case, load_case_name.value.decode(), axis, id_number, dl_type.value,
+            result = (sid, "DistPrincipal", beam, load_case, load_case_name, axis, id_number, dl_type.value,
                       projected, pa, pb, p1, p2, a, b)
             yield result
 
@@ -638,8 +1949,7 @@ def extract_beam_distributed_loading(mctx: ModelExtractionContext, pfs: ParquetS
         for i in range(dist_global_load_count.value):
             axis = load_entity_values[(4 * i) + St7.ipAttrAxis]
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
             id_number = load_entity_values[(4 * i) + St7.ipAttrID]
             sid = f"{beam}-DLG-{load_case}-{id_number}"
             dl_type = ctypes.c_int(0)
@@ -675,7 +1985,7 @@ def extract_beam_distributed_loading(mctx: ModelExtractionContext, pfs: ParquetS
             a = dl_values[4]
             b = dl_values[5]
 
-            result = (sid, "DistGlobal", beam, load_case, load_case_name.value.decode(), axis, id_number, dl_type.value,
+            result = (sid, "DistGlobal", beam, load_case, load_case_name, axis, id_number, dl_type.value,
                       projected, pa, pb, p1, p2, a, b)
             yield result
 
@@ -688,6 +1998,8 @@ def extract_beam_ns_mass_loading(mctx: ModelExtractionContext, pfs: ParquetSetti
 
     logger.info(f"Extracting beam non-structural masses...")
 
+    load_case_names = _get_dimensions(mctx).load_cases
+
     for beam in range(1, nBeams.value + 1):
 
         # We need to access the number of different loads of a given type applied to a beam
@@ -704,8 +2016,7 @@ def extract_beam_ns_mass_loading(mctx: ModelExtractionContext, pfs: ParquetSetti
 
         for i in range(ns_mass_load_count.value):
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
             id_number = load_entity_values[(4 * i) + St7.ipAttrID]
             ns_mass_type = ctypes.c_int(0)
             ns_mass_array = ctypes.c_double * 10
@@ -741,7 +2052,7 @@ def extract_beam_ns_mass_loading(mctx: ModelExtractionContext, pfs: ParquetSetti
 
             sid = f"{beam}-NSM-{load_case}-{id_number}"
 
-            result = (sid, beam, load_case, load_case_name.value.decode(), id_number, ns_mass_type.value,
+            result = (sid, beam, load_case, load_case_name, id_number, ns_mass_type.value,
                       pa, pb, p1, p2, a, b, dynamic_factor, offset_vec_x, offset_vec_y, offset_vec_z)
 
             yield result
@@ -754,6 +2065,8 @@ def extract_beam_point_loading(mctx: ModelExtractionContext, pfs: ParquetSetting
     _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyBEAM, ctypes.byref(nBeams)))
     logger.info(f"Extracting beam point loads...")
 
+    load_case_names = _get_dimensions(mctx).load_cases
+
     for beam in range(1, nBeams.value + 1):
 
         # Principal axis point load extraction
@@ -772,8 +2085,7 @@ def extract_beam_point_loading(mctx: ModelExtractionContext, pfs: ParquetSetting
 
         for i in range(point_principal_load_count.value):
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
             id_number = load_entity_values[(4 * i) + St7.ipAttrID]
             _check_St7_error_message(St7.St7GetBeamPointForcePrincipal4ID(mctx.uID, beam, load_case, id_number, point_load_forces))
             position = point_load_forces[3]
@@ -782,7 +2094,7 @@ def extract_beam_point_loading(mctx: ModelExtractionContext, pfs: ParquetSetting
             point_load_z = point_load_forces[2]
             sid = f"{beam}-CFL-{load_case}-{id_number}"
 
-            result = (sid, "Principal", beam, load_case, load_case_name.value.decode(), id_number,
+            result = (sid, "Principal", beam, load_case, load_case_name, id_number,
                       position, point_load_x, point_load_y, point_load_z)
 
             yield result
@@ -803,8 +2115,7 @@ def extract_beam_point_loading(mctx: ModelExtractionContext, pfs: ParquetSetting
 
         for i in range(point_global_load_count.value):
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
             id_number = load_entity_values[(4 * i) + St7.ipAttrID]
             _check_St7_error_message(St7.St7GetBeamPointForceGlobal4ID(mctx.uID, beam, load_case, id_number, point_load_forces))
             position = point_load_forces[3]
@@ -813,112 +2124,233 @@ def extract_beam_point_loading(mctx: ModelExtractionContext, pfs: ParquetSetting
             point_load_z = point_load_forces[2]
             sid = f"{beam}-CFG-{load_case}-{id_number}"
 
-            result = (sid, "Global", beam, load_case, load_case_name.value.decode(), id_number,
+            result = (sid, "Global", beam, load_case, load_case_name, id_number,
                       position, point_load_x, point_load_y, point_load_z)
 
             yield result
 
 
-# Function to extract the beam force family_results
-def extract_beam_forces(mctx: ModelExtractionContext, pfs: ParquetSettings):
+def _beam_result_stream(mctx: ModelExtractionContext, pfs: ParquetSettings, case_names: list[str],
+                        result_type: int, result_sub_type: int, block_fields: dict, station_positions: tuple,
+                        description: str, calling_function: str, label: str,
+                        accumulator: "BeamForceEnvelope" = None, derived: dict = None,
+                        signs: np.ndarray = None) -> _ResultStream:
+    """Builds the stream of a beam result type (e.g. rtBeamForce), with a row per beam, case and station.
 
-    nBeams = ctypes.c_int(0)
-    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyBEAM, ctypes.byref(nBeams)))
-    error_context = ErrorContext("extract_beam_forces")
+    The block fields map the columns to their index in the Strand7 result array, which is copied straight into
+    the buffer. The station positions are those written to the Position column. Derived columns replace the
+    default ResultId, ResultCaseName and Position, and the results at each station are multiplied by its sign."""
+
+    error_context = ErrorContext(calling_function)
 
     # The following ensures that the result positions are output as a ratio of the overall member length (0.0...1.0)
-    _check_St7_error_message(St7.St7SetBeamResultPosMode(mctx.uID, St7.bpParam))
+    if mctx.topology is None:
+        _check_St7_error_message(St7.St7SetBeamResultPosMode(mctx.uID, St7.bpParam))
+
+    number_of_positions = len(pfs.position_values)
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size, telemetry=pfs.telemetry, deferred=pfs.pipelined,
+                          accumulator=accumulator,
+                          blocks={"results": block_fields},
+                          derived=derived or {"ResultId": _result_id_column("BeamNumber", pfs.position_values),
+                                              "ResultCaseName": _case_name_column(case_names),
+                                              "Position": _station_position_column(station_positions)},
+                          working={"Station": np.int8})
+    result_block = buffer.blocks["results"]
+    beam_numbers = buffer.columns["BeamNumber"]
+    result_cases = buffer.columns["ResultCase"]
+    stations = buffer.columns["Station"]
+    station_indices = np.arange(number_of_positions, dtype=np.int8)
+
+    result_array = ctypes.c_double * (number_of_positions * St7.kMaxBeamResult)
+    results = result_array()
+    all_values = np.ctypeslib.as_array(results)[:number_of_positions * 6].reshape(number_of_positions, 6)
+    result_values = all_values[:, :max(block_fields.values()) + 1]
+
+    # Station positions along the element for querying loads
+    pos_array = ctypes.c_double * number_of_positions
+    positions = pos_array(*pfs.position_values)
+
+    # Number of result columns (i.e. fields)
+    number_columns = ctypes.c_int(0)
+
+    def read_results(beam: int, case_number: int, case_name_string: str):
+        # Get the beam family_results using the Strand API
+        _check_St7_error_message(St7.St7GetBeamResultArrayPos(mctx.uID, result_type, result_sub_type, beam,
+                                                              case_number, number_of_positions, positions,
+                                                              ctypes.byref(number_columns), results),
+                                 error_context,
+                                 args=(label, beam, case_name_string))
+
+    if mctx.topology is not None:
+        read_results = _get_result_file_beam_reader(mctx, result_type, result_sub_type, pfs.position_values,
+                                                    all_values, error_context, label,
+                                                    pfs.station_interpolation is not None)
+
+    def read(beam: int, case_number: int, case_name_string: str):
+        read_results(beam, case_number, case_name_string)
+
+        batch = buffer.flush() if not buffer.has_room(number_of_positions) else None
+
+        # Copy the results at every station position for the beam into the buffer in one go
+        rows = buffer.reserve(number_of_positions)
+        beam_numbers[rows] = beam
+        result_cases[rows] = case_number
+        stations[rows] = station_indices
+        result_block[rows] = result_values if signs is None else result_values * signs
+        return batch
+
+    selected_beams = _get_selected_entities(mctx, pfs, St7.tyBEAM, _get_entity_total(mctx, St7.tyBEAM))
+    selected_cases = _get_selected_cases(mctx, pfs, case_names)
+    return _ResultStream(description, buffer, selected_beams, selected_cases, read, error_context)
+
+
+# The principal beam force columns of St7GetBeamResultArrayPos, as numbered in a custom result file
+_RESULT_FILE_BEAM_FORCE_COLUMNS = {St7.ipBeamSF1: St7.ipBeamResFileSF1, St7.ipBeamBM1: St7.ipBeamResFileBM1,
+                                   St7.ipBeamSF2: St7.ipBeamResFileSF2, St7.ipBeamBM2: St7.ipBeamResFileBM2,
+                                   St7.ipBeamAxialF: St7.ipBeamResFileAxial, St7.ipBeamTorque: St7.ipBeamResFileTorque}
+
+
+def _get_station_interpolation(number_of_stations: int, position_values: tuple,
+                               interpolate: bool = False) -> np.ndarray:
+    """Gets the (position x station) matrix selecting the results at the evenly spaced stations of a custom
+    result file at the position values.
+
+    A position between two stations is refused unless interpolate is set, as the linear interpolation is not
+    exact for the moments of a beam under distributed load. Interpolated files are marked as such in their
+    metadata (see STATION_INTERPOLATION_KEY)."""
+    stations = np.linspace(0.0, 1.0, number_of_stations)
+    if not interpolate:
+        offsets = np.abs(np.subtract.outer(np.asarray(position_values, dtype=np.float64), stations))
+        missing = [p for p, offset in zip(position_values, offsets.min(axis=1, initial=np.inf)) if offset > 1e-9]
+        if missing:
+            raise ValueError(f"The positions {missing} are not at the {number_of_stations} stations of the result "
+                             f"file's beams. Select the stations with a positions filter, or interpolate them "
+                             f"with interpolate_stations=True.")
+        return (offsets <= 1e-9).astype(np.float64)
+    return np.column_stack([np.interp(position_values, stations, unit) for unit in np.eye(number_of_stations)])
+
+
+def _get_result_file_beam_reader(mctx: ModelExtractionContext, result_type: int, result_sub_type: int,
+                                 position_values: tuple, values: np.ndarray, error_context: ErrorContext,
+                                 label: str, interpolate: bool = False) -> Callable:
+    """Gets the function reading a beam's results from the result file alone into the (position x column) values,
+    in the columns of St7GetBeamResultArrayPos.
+
+    The file only holds the principal beam forces at each beam's stations, which must be at the position values
+    (e.g. the default quarter points with 5 stations) unless they are interpolated (see _get_station_interpolation).
+    A beam or case the file has no results for (a warned error) is read as zeros, rather than as the results of
+    the beam read before it."""
+    if result_type != St7.rtBeamForce or result_sub_type != St7.stBeamPrincipal:
+        raise ValueError("Only the principal beam forces can be read from the result file alone.")
+
+    columns = [_RESULT_FILE_BEAM_FORCE_COLUMNS[i] for i in range(len(_RESULT_FILE_BEAM_FORCE_COLUMNS))]
+    station_results = (ctypes.c_double * St7.kMaxBeamResult)()
+    station_values = np.ctypeslib.as_array(station_results)
+    station_count = ctypes.c_int(0)
+    beam_stations = {}
+    interpolations = {}
+
+    def read_results(beam: int, case_number: int, case_name_string: str):
+        if beam not in beam_stations:
+            station_count.value = 0
+            err_code = St7.St7GetResFileBeamStations(mctx.uID, beam, ctypes.byref(station_count))
+            _check_St7_error_message(err_code, error_context, args=(label, beam, case_name_string))
+            beam_stations[beam] = 0 if err_code else station_count.value
+        number_of_stations = beam_stations[beam]
+        if number_of_stations == 0:
+            values.fill(0.0)
+            return
+        if number_of_stations not in interpolations:
+            interpolations[number_of_stations] = _get_station_interpolation(number_of_stations, position_values,
+                                                                            interpolate)
+
+        err_code = St7.St7GetResFileBeamResult(mctx.uID, result_type, beam, case_number, station_results)
+        _check_St7_error_message(err_code, error_context, args=(label, beam, case_name_string))
+        if err_code:
+            values.fill(0.0)
+            return
+        stations = station_values[:number_of_stations * St7.kBeamResFileForceSize]
+        np.matmul(interpolations[number_of_stations],
+                  stations.reshape(number_of_stations, St7.kBeamResFileForceSize)[:, columns], out=values)
+
+    return read_results
+
+
+def _beam_force_stream(mctx: ModelExtractionContext, pfs: ParquetSettings, case_names: list[str]) -> _ResultStream:
+    rounded_positions = tuple(float(f"{p:.2f}") for p in pfs.position_values)
+    return _beam_result_stream(mctx, pfs, case_names, St7.rtBeamForce, St7.stBeamPrincipal,
+                               {"Fx": St7.ipBeamAxialF, "Fy": St7.ipBeamSF1, "Fz": St7.ipBeamSF2,
+                                "Mx": St7.ipBeamTorque, "My": St7.ipBeamBM2, "Mz": St7.ipBeamBM1},
+                               rounded_positions, "beam forces", "extract_beam_forces", "BeamForce",
+                               accumulator=pfs.envelope)
+
+
+def _beam_displacement_stream(mctx: ModelExtractionContext, pfs: ParquetSettings,
+                              case_names: list[str]) -> _ResultStream:
+    # Only the translational displacements (first three columns) are stored
+    return _beam_result_stream(mctx, pfs, case_names, St7.rtBeamDisp, St7.stBeamGlobal,
+                               {"Ux": 0, "Uy": 1, "Uz": 2},
+                               pfs.position_values, "beam displacements", "extract_beam_displacements",
+                               "BeamDisplacement")
+
+
+# The force at each beam end, in one sign for both ends: the N1 end (station 0.0) is negated and the N2 end (1.0)
+# kept. Strand7 reports the stBeamGlobal forces at a station as the internal actions on the cut face whose outward
+# normal points towards N2, in the global axes, so a beam in uniform axial tension has the same force (along N1 to
+# N2) at every station. The N2 end face is that face, but the N1 end face points the other way and carries the
+# negated action. With the ends flipped alike, the end forces of a beam in tension are equal and opposite, and
+# those of all the beams meeting at an unloaded free node sum to zero. This is the Sign column the
+# column_head_connection scripts apply to the beam_forces rows at Position 0.0 and 1.0.
+_BEAM_END_POSITIONS = (0.0, 1.0)
+_BEAM_END_SIGNS = np.array([[-1.0], [1.0]])
+_BEAM_END_FORCE_FIELDS = {"Fx": St7.ipBeamFX, "Fy": St7.ipBeamFY, "Fz": St7.ipBeamFZ,
+                          "Mx": St7.ipBeamMX, "My": St7.ipBeamMY, "Mz": St7.ipBeamMZ}
+
+
+def _get_beam_end_nodes(mctx: ModelExtractionContext, beams: Iterable[int]) -> np.ndarray:
+    """Gets the N1 and N2 node numbers of the beams as a (beam number x end) array, zero for other beams."""
+    if mctx.topology is not None:
+        return mctx.topology.beam_end_nodes
+    beams = list(beams)
+    end_nodes = np.zeros((max(beams, default=0) + 1, 2), dtype=np.int32)
+    connections = (ctypes.c_int * St7.kMaxElementNode)()
+    for beam in beams:
+        _check_St7_error_message(St7.St7GetElementConnection(mctx.uID, St7.tyBEAM, beam, connections))
+        end_nodes[beam] = connections[1], connections[2]
+    return end_nodes
 
-    number_of_cases = mctx.primary_combo_count.value + mctx.secondary_combo_count.value
-    for case_number in range(1, number_of_cases + 1):
 
-        case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-        _check_St7_error_message(St7.St7GetResultCaseName(mctx.uID, case_number, case_name, St7.kMaxStrLen))
-        logger.info(f"Extracting beam forces for result case {case_name.value.decode()}...")
-
-        force_array = ctypes.c_double * (len(pfs.position_values) * St7.kMaxBeamResult)
-        forces = force_array()
-
-        # Station positions along the element for querying loads
-        position_values_c = [ctypes.c_double(p) for p in pfs.position_values]
-        pos_array = ctypes.c_double * len(position_values_c)
-        positions = pos_array(*position_values_c)
-
-        for beam in range(1, nBeams.value + 1):
-
-            # Number of result columns (i.e. fields)
-            number_columns = ctypes.c_int(0)
-
-            # Get the beam family_results using the Strand API
-            _check_St7_error_message(St7.St7GetBeamResultArrayPos(mctx.uID, St7.rtBeamForce, St7.stBeamPrincipal, beam, case_number,
-                                         len(pfs.position_values), positions, ctypes.byref(number_columns), forces),
-                                     error_context,
-                                     args=("BeamForce", beam, case_name.value.decode()))
-
-            # Access the forces from each beam at each station position, and add these to the result list
-            for i in range(len(pfs.position_values)):
-                position = f"{pfs.position_values[i]:.2f}"
-                fx = forces[(i * 6) + St7.ipBeamAxialF]
-                fy = forces[(i * 6) + St7.ipBeamSF1]
-                fz = forces[(i * 6) + St7.ipBeamSF2]
-                mx = forces[(i * 6) + St7.ipBeamTorque]
-                my = forces[(i * 6) + St7.ipBeamBM2]
-                mz = forces[(i * 6) + St7.ipBeamBM1]
-                sid = f"{beam}-{case_number}-{position}"
-                result = (sid, beam, case_number, case_name.value.decode(), float(position), fx, fy, fz, mx, my, mz)
-                yield result
-
-    logger.info("Beam forces written to DB.")
-    error_context.log_errors(logger)
+def _get_beam_end_derived_columns(mctx: ModelExtractionContext, pfs: ParquetSettings, case_names: list[str]) -> dict:
+    end_nodes = _get_beam_end_nodes(mctx, _get_selected_entities(mctx, pfs, St7.tyBEAM,
+                                                                 _get_entity_total(mctx, St7.tyBEAM)))
+    return {"NodeNumber": _beam_end_node_column(end_nodes),
+            "BeamEnd": _beam_end_column(),
+            "ResultCaseName": _case_name_column(case_names)}
+
+
+def _beam_end_force_stream(mctx: ModelExtractionContext, pfs: ParquetSettings,
+                           case_names: list[str]) -> _ResultStream:
+    # The end forces are in the global axes, which all the beams at a node share, so they can be summed there
+    return _beam_result_stream(mctx, replace(pfs, position_values=_BEAM_END_POSITIONS), case_names,
+                               St7.rtBeamForce, St7.stBeamGlobal, _BEAM_END_FORCE_FIELDS, _BEAM_END_POSITIONS,
+                               "beam end forces", "extract_beam_end_forces", "BeamEndForce",
+                               derived=_get_beam_end_derived_columns(mctx, pfs, case_names),
+                               signs=_BEAM_END_SIGNS)
+
+
+# Function to extract the beam force family_results
+def extract_beam_forces(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _extract_result_stream(mctx, pfs, _beam_force_stream)
 
 
 # Function to extract the beam displacement family_results
 def extract_beam_displacements(mctx: ModelExtractionContext, pfs: ParquetSettings):
-    nBeams = ctypes.c_int(0)
-    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyBEAM, ctypes.byref(nBeams)))
-    error_context = ErrorContext("extract_beam_displacements")
+    yield from _extract_result_stream(mctx, pfs, _beam_displacement_stream)
 
-    # The following ensures that the result positions are output as a ratio of the overall member length (0.0...1.0)
-    _check_St7_error_message(St7.St7SetBeamResultPosMode(mctx.uID, St7.bpParam))
 
-    number_of_cases = mctx.primary_combo_count.value + mctx.secondary_combo_count.value
-    for case_number in range(1, number_of_cases + 1):
-
-        case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-        _check_St7_error_message(St7.St7GetResultCaseName(mctx.uID, case_number, case_name, St7.kMaxStrLen))
-        logger.info(f"Extracting beam displacements for result case {case_name.value.decode()}...")
-
-        disp_array = ctypes.c_double * (len(pfs.position_values) * St7.kMaxBeamResult)
-        displacements = disp_array()
-
-        # Station positions along the element for querying loads
-        position_values_c = [ctypes.c_double(p) for p in pfs.position_values]
-        pos_array = ctypes.c_double * len(position_values_c)
-        positions = pos_array(*position_values_c)
-
-        for beam in range(1, nBeams.value + 1):
-
-            # Number of result columns (i.e. fields)
-            number_columns = ctypes.c_int(0)
-
-            # Get the beam family_results using the Strand API
-            _check_St7_error_message(St7.St7GetBeamResultArrayPos(mctx.uID, St7.rtBeamDisp, St7.stBeamGlobal, beam, case_number,
-                                         len(pfs.position_values), positions, ctypes.byref(number_columns), displacements),
-                                     error_context,
-                                     args=("BeamDisplacement", beam, case_name.value.decode()))
-
-            # Access the forces from each beam at each station position, and add these to the result list
-            for i in range(len(pfs.position_values)):
-                position = pfs.position_values[i]
-                ux = displacements[(i * 6) + 0]
-                uy = displacements[(i * 6) + 1]
-                uz = displacements[(i * 6) + 2]
-                sid = f"{beam}-{case_number}-{position:.2f}"
-                result = (sid, beam, case_number, case_name.value.decode(), position, ux, uy, uz)
-                yield result
-
-    logger.info("Beam displacements written to DB.")
-    error_context.log_errors(logger)
+# Function to extract the force each beam end applies to its node
+def extract_beam_end_forces(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _extract_result_stream(mctx, pfs, _beam_end_force_stream)
 
 
 # Function to extract the plate attributes and properties
@@ -929,6 +2361,8 @@ def extract_plate_properties(mctx: ModelExtractionContext, pfs: ParquetSettings)
 
     logger.info("Extracting plate attributes and properties...")
 
+    dimensions = _get_dimensions(mctx)
+
     for plate in range(1, nPlates.value + 1):
 
         # Create an array to store the connection information
@@ -944,11 +2378,10 @@ def extract_plate_properties(mctx: ModelExtractionContext, pfs: ParquetSettings)
 
         # Access the property associated with the plate
         property_number = ctypes.c_int(0)
-        property_name = ctypes.create_string_buffer(St7.kMaxStrLen)
         property_type = ctypes.c_int(0)
         material_type = ctypes.c_int(0)
         _check_St7_error_message(St7.St7GetElementProperty(mctx.uID, St7.ptPLATEPROP, plate, ctypes.byref(property_number)))
-        _check_St7_error_message(St7.St7GetPropertyName(mctx.uID, St7.ptPLATEPROP, property_number, property_name, St7.kMaxStrLen))
+        property_name = _get_property_name(mctx, dimensions, St7.ptPLATEPROP, property_number.value)
         _check_St7_error_message(St7.St7GetPlatePropertyType(mctx.uID, property_number, ctypes.byref(property_type), ctypes.byref(material_type)))
 
         # Need to convert the plate property type to a string that is human interpretable
@@ -973,9 +2406,8 @@ def extract_plate_properties(mctx: ModelExtractionContext, pfs: ParquetSettings)
 
         # Access the group associated with the plate
         group_id = ctypes.c_int(0)
-        group_name = ctypes.create_string_buffer(St7.kMaxStrLen)
         _check_St7_error_message(St7.St7GetEntityGroup(mctx.uID, St7.tyPLATE, plate, ctypes.byref(group_id)))
-        _check_St7_error_message(St7.St7GetGroupIDName(mctx.uID, group_id, group_name, St7.kMaxStrLen))
+        group_name = _get_group_name(mctx, dimensions, group_id.value)
 
         # Access the plate geometric data
         element_data = ctypes.c_double * 1
@@ -997,8 +2429,8 @@ def extract_plate_properties(mctx: ModelExtractionContext, pfs: ParquetSettings)
 
         area = element_data_array[0]
 
-        result = (plate, property_name.value.decode(), property_type, element_type, group_name.value.decode(),
-                  id_number.value, area, n1, n2, n3, n4)
+        result = (plate, property_number.value, property_name, property_type, element_type, group_id.value,
+                  group_name, id_number.value, area, n1, n2, n3, n4)
 
         yield result
 
@@ -1011,6 +2443,8 @@ def extract_plate_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
 
     logger.info(f"Extracting plate loads...")
 
+    load_case_names = _get_dimensions(mctx).load_cases
+
     for plate in range(1, nPlates.value + 1):
 
         plate_normal_load_count = ctypes.c_int(0)
@@ -1027,8 +2461,7 @@ def extract_plate_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
         for i in range(plate_normal_load_count.value):
 
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
 
             # Get the plate normal loading
             norm_pressure_array = ctypes.c_double * 2
@@ -1037,7 +2470,7 @@ def extract_plate_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
             norm_neg_pressure = norm_pressures[0]
             norm_pos_pressure = norm_pressures[1]
 
-            result = (plate, load_case, load_case_name.value.decode(),
+            result = (plate, load_case, load_case_name,
                       norm_neg_pressure, norm_pos_pressure,
                       0.0, 0.0, 0.0, "None",
                       0.0, 0.0, 0.0, "None",
@@ -1062,8 +2495,7 @@ def extract_plate_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
         for i in range(plate_global_load_count.value):
 
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
 
             # Get the plate global loading
             glob_pressure_array = ctypes.c_double * 3
@@ -1094,7 +2526,7 @@ def extract_plate_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
             else:
                 glob_pos_proj = "None"
 
-            result = (plate, load_case, load_case_name.value.decode(),
+            result = (plate, load_case, load_case_name,
                       0.0, 0.0,
                       glob_neg_x_pressure, glob_neg_y_pressure, glob_neg_z_pressure, glob_neg_proj,
                       glob_pos_x_pressure, glob_pos_y_pressure, glob_pos_z_pressure, glob_pos_proj,
@@ -1120,15 +2552,14 @@ def extract_plate_loading(mctx: ModelExtractionContext, pfs: ParquetSettings):
 
         for i in range(plate_shear_load_count.value):
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
+            load_case_name = load_case_names[load_case - 1]
 
             # Get the plate shear loading
             _check_St7_error_message(St7.St7GetPlateShear2(mctx.uID, plate, load_case, shear_stresses))
             shear_stress_x = shear_stresses[0]
             shear_stress_y = shear_stresses[1]
 
-            result = (plate, load_case, load_case_name.value.decode(),
+            result = (plate, load_case, load_case_name,
                       0.0, 0.0,
                       0.0, 0.0, 0.0, "None",
                       0.0, 0.0, 0.0, "None",
@@ -1144,6 +2575,8 @@ def extract_plate_non_structural_mass(mctx: ModelExtractionContext, pfs: Parquet
 
     logger.info("Extracting plate non-structural masses...")
 
+    load_case_names = _get_dimensions(mctx).load_cases
+
     for plate in range(1, nPlates.value + 1):
 
         plate_mass_load_count = ctypes.c_int(0)
@@ -1162,9 +2595,8 @@ def extract_plate_non_structural_mass(mctx: ModelExtractionContext, pfs: Parquet
         for i in range(plate_mass_load_count.value):
 
             load_case = load_entity_values[(4 * i) + St7.ipAttrCase]
-            load_case_name = ctypes.create_string_buffer(St7.kMaxStrLen)
+            load_case_name = load_case_names[load_case - 1]
             id_number = load_entity_values[(4 * i) + St7.ipAttrID]
-            _check_St7_error_message(St7.St7GetLoadCaseName(mctx.uID, load_case, load_case_name, kMaxStrLen))
 
             _check_St7_error_message(St7.St7GetPlateNSMass5ID(mctx.uID, plate, load_case, id_number, plate_ns_masses))
 
@@ -1176,54 +2608,674 @@ def extract_plate_non_structural_mass(mctx: ModelExtractionContext, pfs: Parquet
 
             sid = f"{id_number}-{plate}-NSM-{load_case}"
 
-            result = (sid, plate, load_case, load_case_name.value.decode(), ns_mass, dynamic_factor, offset_vec_x, offset_vec_y, offset_vec_z)
+            result = (sid, plate, load_case, load_case_name, ns_mass, dynamic_factor, offset_vec_x, offset_vec_y, offset_vec_z)
 
             yield result
 
 
+def _extract_plate_stresses(mctx: ModelExtractionContext, pfs: ParquetSettings, result_sub_type: int,
+                            block_fields: dict, description: str):
+    """Generic generator for the plate stress results at the sample location and surfaces of the settings.
+
+    Each St7GetPlateResultArray call returns every point of a plate (its centroid, nodes or Gauss points), which
+    are copied from the reused result array into the column buffer in one assignment."""
+
+    nPlates = ctypes.c_int(0)
+    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyPLATE, ctypes.byref(nPlates)))
+    error_context = ErrorContext(f"extract_plate_{description.replace(' ', '_')}")
+
+    case_names = _get_result_case_names(mctx)
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size, telemetry=pfs.telemetry, deferred=pfs.pipelined,
+                          blocks={"stresses": block_fields},
+                          derived={"ResultId": _plate_result_id_column(),
+                                   "ResultCaseName": _case_name_column(case_names),
+                                   "Surface": _plate_surface_column()},
+                          working={"SurfaceCode": np.int8})
+    stress_block = buffer.blocks["stresses"]
+    block_columns = stress_block.shape[1]
+    plate_numbers = buffer.columns["PlateNumber"]
+    result_cases = buffer.columns["ResultCase"]
+    surface_codes = buffer.columns["SurfaceCode"]
+    points = buffer.columns["Point"]
+    point_indices = np.arange(1, St7.kMaxPlateResult + 1, dtype=np.int8)
+
+    stress_array = ctypes.c_double * St7.kMaxPlateResult
+    stresses = stress_array()
+    stress_values = np.ctypeslib.as_array(stresses)
+    number_points = ctypes.c_int(0)
+    number_columns = ctypes.c_int(0)
+
+    # Bound once, as this loop makes one call per plate, surface and case
+    get_plate_result_array = St7.St7GetPlateResultArray
+    plate_stress = St7.rtPlateStress
+    number_points_ref = ctypes.byref(number_points)
+    number_columns_ref = ctypes.byref(number_columns)
+
+    selected_plates = _get_selected_entities(mctx, pfs, St7.tyPLATE, nPlates.value)
+    for case_number in _get_selected_cases(mctx, pfs, case_names):
+        case_name_string = case_names[case_number - 1]
+
+        logger.info(f"Extracting plate {description} for result case {case_name_string}...")
+
+        for plate in selected_plates:
+            for surface in pfs.surfaces:
+
+                # Reset, so that a plate without results adds no rows rather than repeating the previous plate
+                number_points.value = 0
+                _check_St7_error_message(get_plate_result_array(mctx.uID, plate_stress, result_sub_type, plate,
+                                                                case_number, pfs.sample_location, surface, 0,
+                                                                number_points_ref, number_columns_ref, stresses),
+                                         error_context,
+                                         args=(f"Plate{description.title().replace(' ', '')}", plate,
+                                               case_name_string))
+
+                number_of_points = number_points.value
+                if not number_of_points:
+                    continue
+                if not buffer.has_room(number_of_points):
+                    yield buffer.flush()
+
+                # The results are packed point by point, so copy every point of the plate in one go
+                rows = buffer.reserve(number_of_points)
+                plate_numbers[rows] = plate
+                result_cases[rows] = case_number
+                surface_codes[rows] = surface
+                points[rows] = point_indices[:number_of_points]
+                stress_block[rows] = stress_values[:number_of_points * number_columns.value] \
+                    .reshape(number_of_points, number_columns.value)[:, :block_columns]
+
+    if buffer.size:
+        yield buffer.flush()
+
+    logger.info(f"Plate {description} written to DB.")
+    error_context.log_errors(logger)
+
+
 # Function to extract the plate local stress family_results
 def extract_plate_local_stresses(mctx: ModelExtractionContext, pfs: ParquetSettings):
-    pass
+    yield from _extract_plate_stresses(mctx, pfs, St7.stPlateLocal,
+                                       {"Sxx": St7.ipPlateLocalxx, "Syy": St7.ipPlateLocalyy,
+                                        "Szz": St7.ipPlateLocalzz, "Sxy": St7.ipPlateLocalxy,
+                                        "Syz": St7.ipPlateLocalyz, "Sxz": St7.ipPlateLocalxz}, "local stresses")
 
 
 # Function to extract the plate combined stress family_results
 def extract_plate_combined_stresses(mctx: ModelExtractionContext, pfs: ParquetSettings):
-    pass
+    yield from _extract_plate_stresses(mctx, pfs, St7.stPlateCombined,
+                                       {"S11": St7.ipPlateCombPrincipal11, "S22": St7.ipPlateCombPrincipal22,
+                                        "PrincipalAngle": St7.ipPlateCombPrincipalAngle,
+                                        "VonMises": St7.ipPlateCombVonMises, "Tresca": St7.ipPlateCombTresca,
+                                        "MohrCoulomb": St7.ipPlateCombMohrCoulomb,
+                                        "DruckerPrager": St7.ipPlateCombDruckerPrager,
+                                        "YieldIndex": St7.ipPlateCombYieldIndex,
+                                        "MaxAbsPrincipal": St7.ipPlateCombMagnitude}, "combined stresses")
+
+
+# Primary results held per block of entities while superposing, small enough to stay in the CPU cache
+_SUPERPOSITION_BLOCK_BYTES = 4_000_000
+
+
+def _superpose_results(mctx: ModelExtractionContext, buffer: ColumnBuffer, block_name: str, entity_field: str,
+                       entities: Iterable[int], result_cases: Iterable[int],
+                       read_primary: Callable[[int, int], np.ndarray], rows_per_entity: int = 1,
+                       description: str = "results"):
+    """Generic generator superposing the primary result cases of blocks of entities into the load combinations.
+
+    The result cases are the case numbers to write (see _get_result_case_range), primary cases and combinations.
+    read_primary(entity, case_number) returns the (rows_per_entity x block columns) results of an entity for a
+    primary result case. A block of entities is read for every primary case, then its combinations are computed
+    as one matrix product per batch of result cases, written straight into the buffer's value block. The primary
+    cases are copied through as read, so the file holds the same rows as one extracted from a result file with
+    the combinations solved. They are in the same order too while the entities fit in one block, or if clustered."""
+
+    number_of_primary_cases = mctx.primary_combo_count.value
+    combination_factors = mctx.combinations.factors
+    if combination_factors.shape[1] > number_of_primary_cases:
+        raise ValueError(f"The combinations factor {combination_factors.shape[1]} primary result cases, but the "
+                         f"result file only has {number_of_primary_cases}.")
+
+    # A primary case is its own unit row of factors, which is overwritten with the values read to keep them exact
+    output_cases = np.asarray(result_cases, dtype=np.int64)
+    all_factors = np.zeros((number_of_primary_cases + len(combination_factors), number_of_primary_cases))
+    all_factors[:number_of_primary_cases] = np.eye(number_of_primary_cases)
+    all_factors[number_of_primary_cases:, :combination_factors.shape[1]] = combination_factors
+    factors = np.ascontiguousarray(all_factors[output_cases - 1])
+
+    value_block = buffer.blocks[block_name]
+    number_of_columns = value_block.shape[1]
+    entity_numbers = buffer.columns[entity_field]
+    case_numbers = buffer.columns["ResultCase"]
+    stations = buffer.columns.get("Station")
+
+    entities = np.asarray(entities, dtype=np.int64)
+    entity_bytes = number_of_primary_cases * rows_per_entity * number_of_columns * 8
+    entities_per_block = max(1, min(buffer.capacity // rows_per_entity, _SUPERPOSITION_BLOCK_BYTES // entity_bytes))
+    primary = np.empty((number_of_primary_cases, entities_per_block, rows_per_entity, number_of_columns))
+
+    for first_index in range(0, len(entities), entities_per_block):
+        block_entities = entities[first_index:first_index + entities_per_block]
+        logger.info(f"Superposing {description} for {entity_field} {block_entities[0]} to {block_entities[-1]}...")
+
+        for case_index in range(number_of_primary_cases):
+            for entity_index, entity in enumerate(block_entities):
+                primary[case_index, entity_index] = read_primary(int(entity), case_index + 1)
+        primary_values = primary[:, :len(block_entities)].reshape(number_of_primary_cases, -1)
+
+        rows_per_case = len(block_entities) * rows_per_entity
+        cases_per_batch = max(1, buffer.capacity // rows_per_case)
+        entity_column = np.repeat(block_entities, rows_per_entity)
+        station_column = np.tile(np.arange(rows_per_entity), len(block_entities))
+
+        for start in range(0, len(output_cases), cases_per_batch):
+            batch_cases = output_cases[start:start + cases_per_batch]
+            if not buffer.has_room(len(batch_cases) * rows_per_case):
+                yield buffer.flush()
+
+            # Each row of the product is one combination, laid out as the buffer rows of the block's entities
+            rows = buffer.reserve(len(batch_cases) * rows_per_case)
+            batch_values = value_block[rows].reshape(len(batch_cases), -1)
+            np.matmul(factors[start:start + len(batch_cases)], primary_values, out=batch_values)
+            read_through = batch_cases <= number_of_primary_cases
+            if read_through.any():
+                batch_values[read_through] = primary_values[batch_cases[read_through] - 1]
+            entity_numbers[rows] = np.tile(entity_column, len(batch_cases))
+            case_numbers[rows] = np.repeat(batch_cases, rows_per_case)
+            if stations is not None:
+                stations[rows] = np.tile(station_column, len(batch_cases))
+
+    if buffer.size:
+        yield buffer.flush()
+
+
+def _superpose_node_results(mctx: ModelExtractionContext, pfs: ParquetSettings, result_type: int, block_fields: dict,
+                            description: str):
+    """Superposes a nodal result (reactions or displacements) from the primary result cases."""
+
+    nNodes = ctypes.c_int(0)
+    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyNODE, ctypes.byref(nNodes)))
+    error_context = ErrorContext(f"superpose_{description.replace(' ', '_')}")
+
+    case_names = _get_result_case_names(mctx)
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size, telemetry=pfs.telemetry, deferred=pfs.pipelined,
+                          blocks={"results": block_fields},
+                          derived={"ResultId": _result_id_column("NodeNumber"),
+                                   "ResultCaseName": _case_name_column(case_names)})
+
+    results = (ctypes.c_double * 6)()
+    result_values = np.ctypeslib.as_array(results)
+
+    def read_primary(node: int, case_number: int) -> np.ndarray:
+        # Zeroed first, as a missing result would otherwise carry the previous node into every combination
+        result_values.fill(0.0)
+        _check_St7_error_message(St7.St7GetNodeResult(mctx.uID, result_type, node, case_number, results),
+                                 error_context, args=(description, node, case_names[case_number - 1]))
+        return result_values
+
+    selected_nodes = _get_selected_entities(mctx, pfs, St7.tyNODE, nNodes.value)
+    yield from _superpose_results(mctx, buffer, "results", "NodeNumber", selected_nodes,
+                                  _get_selected_cases(mctx, pfs, case_names), read_primary,
+                                  description=description)
+
+    logger.info(f"Superposed {description} written to DB.")
+    error_context.log_errors(logger)
+
+
+def _superpose_beam_results(mctx: ModelExtractionContext, pfs: ParquetSettings, result_type: int, result_sub_type: int,
+                            block_fields: dict, description: str, position_values: tuple = None,
+                            accumulator: BeamForceEnvelope = None):
+    """Superposes a beam station result (forces or displacements) from the primary result cases."""
+
+    nBeams = ctypes.c_int(0)
+    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyBEAM, ctypes.byref(nBeams)))
+    error_context = ErrorContext(f"superpose_{description.replace(' ', '_')}")
+    _check_St7_error_message(St7.St7SetBeamResultPosMode(mctx.uID, St7.bpParam))
+
+    number_of_positions = len(pfs.position_values)
+    case_names = _get_result_case_names(mctx)
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size, telemetry=pfs.telemetry, deferred=pfs.pipelined,
+                          accumulator=accumulator, blocks={"results": block_fields},
+                          derived={"ResultId": _result_id_column("BeamNumber", pfs.position_values),
+                                   "ResultCaseName": _case_name_column(case_names),
+                                   "Position": _station_position_column(position_values or pfs.position_values)},
+                          working={"Station": np.int8})
+
+    results = (ctypes.c_double * (number_of_positions * St7.kMaxBeamResult))()
+    result_values = np.ctypeslib.as_array(results)[:number_of_positions * 6].reshape(number_of_positions, 6)
+    block_columns = max(block_fields.values()) + 1
+    positions = (ctypes.c_double * number_of_positions)(*pfs.position_values)
+    number_columns = ctypes.c_int(0)
+
+    def read_primary(beam: int, case_number: int) -> np.ndarray:
+        result_values.fill(0.0)
+        _check_St7_error_message(St7.St7GetBeamResultArrayPos(mctx.uID, result_type, result_sub_type, beam,
+                                                              case_number, number_of_positions, positions,
+                                                              ctypes.byref(number_columns), results),
+                                 error_context, args=(description, beam, case_names[case_number - 1]))
+        return result_values[:, :block_columns]
+
+    selected_beams = _get_selected_entities(mctx, pfs, St7.tyBEAM, nBeams.value)
+    yield from _superpose_results(mctx, buffer, "results", "BeamNumber", selected_beams,
+                                  _get_selected_cases(mctx, pfs, case_names), read_primary,
+                                  rows_per_entity=number_of_positions, description=description)
+
+    logger.info(f"Superposed {description} written to DB.")
+    error_context.log_errors(logger)
+
+
+# Function to superpose nodal reactions from the primary load case results
+def superpose_nodal_reactions(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _superpose_node_results(mctx, pfs, St7.rtNodeReact,
+                                       {"Rx": 0, "Ry": 1, "Rz": 2, "Rxx": 3, "Ryy": 4, "Rzz": 5}, "nodal reactions")
+
+
+# Function to superpose nodal displacements from the primary load case results
+def superpose_nodal_displacements(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _superpose_node_results(mctx, pfs, St7.rtNodeDisp,
+                                       {"Dx": 0, "Dy": 1, "Dz": 2, "Dxx": 3, "Dyy": 4, "Dzz": 5}, "nodal displacements")
+
+
+# Function to superpose beam forces from the primary load case results
+def superpose_beam_forces(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _superpose_beam_results(mctx, pfs, St7.rtBeamForce, St7.stBeamPrincipal,
+                                       {"Fx": St7.ipBeamAxialF, "Fy": St7.ipBeamSF1, "Fz": St7.ipBeamSF2,
+                                        "Mx": St7.ipBeamTorque, "My": St7.ipBeamBM2, "Mz": St7.ipBeamBM1},
+                                       "beam forces", tuple(float(f"{p:.2f}") for p in pfs.position_values),
+                                       accumulator=pfs.envelope)
+
+
+# Function to superpose the beam end forces from the primary load case results
+def superpose_beam_end_forces(mctx: ModelExtractionContext, pfs: ParquetSettings):
+
+    nBeams = ctypes.c_int(0)
+    _check_St7_error_message(St7.St7GetTotal(mctx.uID, St7.tyBEAM, ctypes.byref(nBeams)))
+    error_context = ErrorContext("superpose_beam_end_forces")
+    _check_St7_error_message(St7.St7SetBeamResultPosMode(mctx.uID, St7.bpParam))
+
+    case_names = _get_result_case_names(mctx)
+    buffer = ColumnBuffer(pfs.schema, pfs.batch_size, telemetry=pfs.telemetry, deferred=pfs.pipelined,
+                          blocks={"results": _BEAM_END_FORCE_FIELDS},
+                          derived=_get_beam_end_derived_columns(mctx, pfs, case_names),
+                          working={"Station": np.int8})
+
+    number_of_positions = len(_BEAM_END_POSITIONS)
+    results = (ctypes.c_double * (number_of_positions * St7.kMaxBeamResult))()
+    result_values = np.ctypeslib.as_array(results)[:number_of_positions * 6].reshape(number_of_positions, 6)
+    positions = (ctypes.c_double * number_of_positions)(*_BEAM_END_POSITIONS)
+    number_columns = ctypes.c_int(0)
+
+    # The signs are applied to the primary cases, as the combinations are linear in them
+    def read_primary(beam: int, case_number: int) -> np.ndarray:
+        result_values.fill(0.0)
+        _check_St7_error_message(St7.St7GetBeamResultArrayPos(mctx.uID, St7.rtBeamForce, St7.stBeamGlobal, beam,
+                                                              case_number, number_of_positions, positions,
+                                                              ctypes.byref(number_columns), results),
+                                 error_context, args=("beam end forces", beam, case_names[case_number - 1]))
+        return result_values * _BEAM_END_SIGNS
+
+    selected_beams = _get_selected_entities(mctx, pfs, St7.tyBEAM, nBeams.value)
+    yield from _superpose_results(mctx, buffer, "results", "BeamNumber", selected_beams,
+                                  _get_selected_cases(mctx, pfs, case_names), read_primary,
+                                  rows_per_entity=number_of_positions, description="beam end forces")
+
+    logger.info("Superposed beam end forces written to DB.")
+    error_context.log_errors(logger)
+
+
+# Function to superpose beam displacements from the primary load case results
+def superpose_beam_displacements(mctx: ModelExtractionContext, pfs: ParquetSettings):
+    yield from _superpose_beam_results(mctx, pfs, St7.rtBeamDisp, St7.stBeamGlobal, {"Ux": 0, "Uy": 1, "Uz": 2},
+                                       "beam displacements")
 
 
 # Main function for extracting family_results
 def extract_model_data(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path,
-                       directory: pathlib.Path, output_options=None):
+                       directory: pathlib.Path, output_options=None, schema_version: int = 1,
+                       partition: dict = None, clustered: bool = False, combinations: CombinationSet = None,
+                       result_filters: dict = None, pipelined: bool = False, envelopes: bool = False,
+                       storage_profiles: dict = None, all_reaction_nodes: bool = False,
+                       fused: Iterable["ResultType"] = None, write_topology: bool = False):
+    """Extracts the model data into a Parquet file per result type in `directory`.
+
+    Result filters (a dict of ResultType to ExtractionFilter) limit the beams, nodes, groups, result cases and
+    stations extracted for those result types, before any results are read from Strand7.
+
+    If clustered, the result files are sorted by beam or node number (see cluster_parquet_file).
+
+    If combinations are given (see load_combination_set), only the primary result cases are read from Strand7
+    and the combination results are superposed from them, so the result file need not hold the combinations.
+    The primary cases are written too, so the files hold the same rows as those extracted with the combinations
+    solved by Strand7.
+    Result types that cannot be superposed (the plate stresses) must then be left out of the output options.
+
+    If a partition is given (e.g. {"version": "V1_4_5", "model": "LB_Gmax"}), `directory` is instead the root of
+    a hive-partitioned dataset and the files are written to version=V1_4_5/model=LB_Gmax/result=<name>/.
+
+    If pipelined, the Parquet writing overlaps the Strand7 API calls (see parquet_insert). If envelopes, the
+    per-beam and per-station beam force envelopes are accumulated during the extraction and written to
+    beam_force_envelope.parquet (see BeamForceEnvelope).
+
+    Storage profiles (a dict of ResultType to a STORAGE_PROFILES name, e.g. {ResultType.BEAM_FORCES: "compact"})
+    choose the encoding of those result files, trading size against write and scan speed.
+
+    The nodal reactions are only extracted for the restrained and spring-supported nodes, unless
+    all_reaction_nodes, which writes the (zero) reactions of every other node as well, e.g. to validate the
+    restraints.
+
+    The fused result types (e.g. [ResultType.BEAM_FORCES, ResultType.BEAM_DISPLACEMENTS]) that share an entity
+    type are read in one traversal of the result cases instead of one each (see parquet_insert_fused).
+
+    If write_topology, a snapshot of the model topology is written to model_topology.parquet, from which the
+    results can later be re-extracted without loading the model (see extract_result_file_data).
+
+    The rows, timings and sizes of every result type are written to extraction_report.json alongside."""
+
+    started = datetime.now()
 
     # Initialize the Strand7 model
     init = initialize_model(model_file, result_file, scratch_path)
     uID, primary_combo_count, secondary_combo_count = init
 
-    # Get the number of load cases
-    load_case_count = ctypes.c_int(0)
-    _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
-
-    model_context = ModelExtractionContext(model_file, result_file, uID, load_case_count, primary_combo_count,
-                                           secondary_combo_count, directory)
+    # The model is closed on failure too, as the batch runner reuses its worker processes (and their uIDs)
+    try:
+        # Get the number of load cases
+        load_case_count = ctypes.c_int(0)
+        _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+
+        if partition is not None:
+            directory = get_partition_directory(directory, partition)
+
+        model_context = ModelExtractionContext(model_file, result_file, uID, load_case_count, primary_combo_count,
+                                               secondary_combo_count, directory, hive=partition is not None,
+                                               combinations=combinations, dimensions=read_model_dimensions(uID),
+                                               scratch_path=scratch_path)
+
+        # Logic for creating the parquet files
+        directory.mkdir(parents=True, exist_ok=True)
+        write_dimension_tables(model_context)
+
+        # The slim layouts only store the case number, so the names go in a dimension table alongside
+        if schema_version >= 2:
+            write_result_case_table(model_context)
+
+        if write_topology:
+            write_model_topology(model_context)
+
+        result_types = [rt for rt in ResultType if output_options is None or output_options[rt.label] == "TRUE"]
+        rows_written, telemetry = _insert_result_types(model_context, result_types, schema_version, clustered,
+                                                       result_filters, pipelined, envelopes, storage_profiles,
+                                                       all_reaction_nodes, fused)
+
+    finally:
+        close_model(uID)
+
+    write_run_report(directory / RUN_REPORT_FILE, model_file, result_file, schema_version, started, telemetry)
+
+    return rows_written
+
+
+def _insert_result_types(mctx: ModelExtractionContext, result_types: list["ResultType"], schema_version: int,
+                         clustered: bool, result_filters: dict, pipelined: bool, envelopes: bool,
+                         storage_profiles: dict, all_reaction_nodes: bool,
+                         fused: Iterable["ResultType"]) -> tuple[dict[str, int], list[dict]]:
+    """Writes each result type to its file in the context's directory, reading the fused ones together (see
+    extract_model_data). Returns the rows written per file and the telemetry of each result type."""
+    result_filters = result_filters or {}
+    storage_profiles = storage_profiles or {}
+    rows_written = {}
+    telemetry = []
+    fused_groups = {group[0]: group for group in _get_fused_groups(result_types, fused)}
+    fused_types = {rt for group in fused_groups.values() for rt in group}
+    for rt in result_types:
+        envelope_path = None
+        if envelopes and ResultType.BEAM_FORCES in fused_groups.get(rt, [rt]):
+            envelope_path = get_result_file(mctx.directory, BEAM_FORCE_ENVELOPE_FILE, mctx.hive)
+
+        if rt in fused_groups:
+            group_telemetry = {group_rt: ExtractionTelemetry(group_rt.label, group_rt.file_name)
+                               for group_rt in fused_groups[rt]}
+            group_rows = parquet_insert_fused(mctx, fused_groups[rt], schema_version=schema_version,
+                                              clustered=clustered, result_filters=result_filters,
+                                              telemetry=group_telemetry, pipelined=pipelined,
+                                              envelope_path=envelope_path, storage_profiles=storage_profiles,
+                                              all_nodes=all_reaction_nodes)
+            for group_rt, rows in group_rows.items():
+                rows_written[group_rt.file_name] = rows
+                telemetry.append(group_telemetry[group_rt].as_dict())
+
+        elif rt not in fused_types:
+            result_telemetry = ExtractionTelemetry(rt.label, rt.file_name)
+            rows_written[rt.file_name] = parquet_insert(mctx, rt, schema_version=schema_version,
+                                                        clustered=clustered, result_filter=result_filters.get(rt),
+                                                        telemetry=result_telemetry, pipelined=pipelined,
+                                                        envelope_path=envelope_path,
+                                                        storage_profile=storage_profiles.get(rt),
+                                                        all_nodes=all_reaction_nodes)
+            telemetry.append(result_telemetry.as_dict())
+
+    return rows_written, telemetry
+
+
+# Main function for re-extracting the results from the result file alone
+def extract_result_file_data(result_file: pathlib.Path, directory: pathlib.Path,
+                             topology_file: pathlib.Path = None, output_options=None, schema_version: int = 1,
+                             partition: dict = None, clustered: bool = False, result_filters: dict = None,
+                             pipelined: bool = False, envelopes: bool = False, storage_profiles: dict = None,
+                             all_reaction_nodes: bool = False, fused: Iterable["ResultType"] = None,
+                             interpolate_stations: bool = False) -> dict[str, int]:
+    """Re-extracts the results into `directory` from the result file alone, without loading the model, e.g.
+    after a re-solve of a model that has already been extracted in full.
+
+    The model is replaced by the topology snapshot the full extraction wrote with write_topology (by default
+    model_topology.parquet in `directory`), so the re-solve must keep the model's nodes, beams, groups, restraints
+    and result cases. Only the result types that are result_file_readable (the nodal reactions and displacements
+    and the beam forces) are extracted, and the property, loading and dimension files of the full extraction
+    are left as they are. The result file is checked against the snapshot's node, beam and result case totals
+    before anything is written (see check_result_file_topology).
+
+    The beam forces are only held at each beam's stations, which must be at the station positions unless
+    interpolate_stations is set, in which case the positions between them are linearly interpolated and the
+    file is marked as such (see _get_station_interpolation). The other options are as for extract_model_data."""
+
+    started = datetime.now()
+
+    if partition is not None:
+        directory = get_partition_directory(directory, partition)
+    topology_file = directory / MODEL_TOPOLOGY_FILE if topology_file is None else topology_file
+    topology = load_model_topology(topology_file)
+    logger.info(f"Model topology of {topology.model_file} read from {topology_file}.")
+
+    uID = initialize_result_file(result_file)
+    model_context = ModelExtractionContext(pathlib.Path(topology.model_file), result_file, uID,
+                                           ctypes.c_int(len(topology.dimensions.load_cases)),
+                                           ctypes.c_int(topology.primary_combo_count),
+                                           ctypes.c_int(topology.secondary_combo_count), directory,
+                                           hive=partition is not None, dimensions=topology.dimensions,
+                                           topology=topology, interpolate_stations=interpolate_stations)
+
+    result_types = []
+    for rt in ResultType:
+        if output_options is not None and output_options[rt.label] != "TRUE":
+            continue
+        if rt.result_file_readable:
+            result_types.append(rt)
+        elif rt.case_sharded:
+            logger.info(f"{rt.label} cannot be read from the result file alone and are not extracted.")
+
+    try:
+        check_result_file_topology(model_context)
+        rows_written, telemetry = _insert_result_types(model_context, result_types, schema_version, clustered,
+                                                       result_filters, pipelined, envelopes, storage_profiles,
+                                                       all_reaction_nodes, fused)
+    finally:
+        close_result_file(uID)
+
+    write_run_report(directory / RUN_REPORT_FILE, model_context.model_name, result_file, schema_version, started,
+                     telemetry)
+
+    return rows_written
+
+
+def combine_telemetry(entries: list[dict]) -> list[dict]:
+    """Combines the telemetry of the part files or shards of each result type into one entry per file.
+
+    The rows, timings and bytes are summed, while the elapsed seconds are those of the slowest entry, as the
+    shards of a parallel extraction run at the same time."""
+    combined = {}
+    for entry in entries:
+        total = combined.get(entry["FileName"])
+        if total is None:
+            combined[entry["FileName"]] = dict(entry)
+            continue
+        for key in ("Rows", "Batches", "ApiSeconds", "EncodeSeconds", "QueueWaitSeconds", "BytesWritten"):
+            total[key] += entry[key]
+        if entry["ExpectedRows"] is not None and total["ExpectedRows"] is not None:
+            total["ExpectedRows"] += entry["ExpectedRows"]
+        total["Seconds"] = max(total["Seconds"], entry["Seconds"])
+
+    for total in combined.values():
+        total["RowsPerSecond"] = round(total["Rows"] / max(total["Seconds"], 1e-9), 1)
+    return list(combined.values())
+
+
+def write_run_report(file_path: pathlib.Path, model_file: pathlib.Path, result_file: pathlib.Path,
+                     schema_version: int, started: datetime, telemetry: list[dict], workers: int = 1) -> dict:
+    """Writes the JSON report of an extraction run, to compare the rows, timings and sizes of each result type
+    across versions and machines. Returns the report."""
+    report = {"Version": __version__, "ModelFile": str(model_file), "ResultFile": str(result_file),
+              "SchemaVersion": schema_version, "Workers": workers, "Host": platform.node(),
+              "Platform": platform.platform(), "Processors": os.cpu_count(), "Python": platform.python_version(),
+              "PyArrow": pa.__version__, "Started": started.isoformat(timespec="seconds"),
+              "Seconds": round((datetime.now() - started).total_seconds(), 3),
+              "Rows": sum(entry["Rows"] for entry in telemetry),
+              "BytesWritten": sum(entry["BytesWritten"] for entry in telemetry),
+              "ResultTypes": telemetry}
+
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Run report written to {file_path}.")
+    return report
+
+
+# Function to predict the output of an extraction without reading any results
+def estimate_model_data(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path,
+                        output_options=None, schema_version: int = 1, combinations: CombinationSet = None,
+                        result_filters: dict = None, previous_report: pathlib.Path = None) -> dict[str, dict]:
+    """Dry run of extract_model_data, predicting the rows and file size of each result type.
+
+    The rows come from the model totals, result case count and filters (see estimate_rows), and no result APIs
+    are called. The sizes use the bytes per row measured in a previous run report of a similar model where
+    given, or nominal sizes from the schema otherwise. Returns {file name: {"Label", "ExpectedRows",
+    "EstimatedBytes"}}."""
+
+    measured_row_bytes = {}
+    if previous_report is not None:
+        with open(previous_report) as f:
+            for entry in json.load(f)["ResultTypes"]:
+                if entry["Rows"]:
+                    measured_row_bytes[entry["FileName"]] = entry["BytesWritten"] / entry["Rows"]
+
+    uID, primary_combo_count, secondary_combo_count = initialize_model(model_file, result_file, scratch_path)
+    estimates = {}
+    try:
+        load_case_count = ctypes.c_int(0)
+        _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+        # Nothing is written, so the scratch folder stands in for the directory. The dimensions are read once,
+        # as the entity calls of the estimates would otherwise re-read the names and restraints on every call.
+        model_context = ModelExtractionContext(model_file, result_file, uID, load_case_count, primary_combo_count,
+                                               secondary_combo_count, scratch_path, combinations=combinations,
+                                               dimensions=read_model_dimensions(uID), scratch_path=scratch_path)
+
+        result_filters = result_filters or {}
+        for rt in ResultType:
+            if output_options is not None and output_options[rt.label] != "TRUE":
+                continue
+            pfs = get_parquet_settings(rt, schema_version)
+            result_filter = result_filters.get(rt)
+            if result_filter is not None:
+                pfs = replace(pfs, result_filter=result_filter,
+                              position_values=result_filter.positions or pfs.position_values)
+
+            rows = estimate_rows(model_context, pfs)
+            row_bytes = measured_row_bytes.get(rt.file_name, _estimate_row_bytes(pfs.schema))
+            estimates[rt.file_name] = {"Label": rt.label, "ExpectedRows": rows, "EstimatedBytes": round(rows * row_bytes)}
+            logger.info(f"{rt.label}: {rows:,.0f} rows, about {rows * row_bytes / 1e6:,.1f} MB.")
+
+    finally:
+        close_model(uID)
+
+    return estimates
+
+
+# Function to check superposed combinations against the combinations solved by Strand7
+def verify_superposition(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path,
+                         combinations: CombinationSet, result_types: list = None, sample_size: int = 10,
+                         tolerance: float = 1e-6) -> dict[str, float]:
+    """Compares a sample of superposed combinations with the same combinations solved by Strand7.
+
+    The result file must hold the combinations as its secondary result cases. An evenly spaced sample of them is
+    both superposed and extracted, and the largest difference relative to the largest result is returned per
+    result file name. Differences above the tolerance are logged as errors."""
+
+    uID, primary_combo_count, secondary_combo_count = initialize_model(model_file, result_file, scratch_path)
+    differences = {}
+    try:
+        number_of_combinations = len(combinations.names)
+        if secondary_combo_count.value < number_of_combinations:
+            raise ValueError(f"The result file holds {secondary_combo_count.value} combinations, so "
+                             f"{number_of_combinations} superposed combinations cannot be verified against it.")
+
+        sample = np.unique(np.linspace(0, number_of_combinations - 1, min(sample_size, number_of_combinations))
+                           .round().astype(int)) + primary_combo_count.value + 1
+        load_case_count = ctypes.c_int(0)
+        _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+        model_context = ModelExtractionContext(model_file, result_file, uID, load_case_count, primary_combo_count,
+                                               secondary_combo_count, scratch_path, result_cases=tuple(sample.tolist()),
+                                               combinations=combinations, dimensions=read_model_dimensions(uID))
+
+        if result_types is None:
+            result_types = [rt for rt in ResultType if rt.superposition_extractor is not None]
+
+        for rt in result_types:
+            keys = [(name, "ascending") for name in rt.sort_columns if name in rt.schema.names]
+            superposed = pa.Table.from_batches(list(rt.superposition_extractor(model_context, rt.value)),
+                                               schema=rt.schema).sort_by(keys)
+            solved = pa.Table.from_batches(list(rt.extractor(replace(model_context, combinations=None), rt.value)),
+                                           schema=rt.schema).sort_by(keys)
+            if superposed.select([k for k, _ in keys]) != solved.select([k for k, _ in keys]):
+                raise RuntimeError(f"The superposed and solved {rt.label.lower()} are not for the same entities.")
+
+            value_columns = [f.name for f in rt.schema if f.type == pa.float64() and f.name != "Position"]
+            superposed_values = np.column_stack([superposed[name].to_numpy() for name in value_columns])
+            solved_values = np.column_stack([solved[name].to_numpy() for name in value_columns])
+            scale = max(float(np.abs(solved_values).max(initial=0.0)), 1e-12)
+            differences[rt.file_name] = float(np.abs(superposed_values - solved_values).max(initial=0.0)) / scale
+
+            if differences[rt.file_name] > tolerance:
+                logger.error(f"Superposed {rt.label.lower()} differ from Strand7 by {differences[rt.file_name]:.3e} "
+                             f"of the largest result.")
+            else:
+                logger.info(f"Superposed {rt.label.lower()} match Strand7 to {differences[rt.file_name]:.3e} "
+                            f"of the largest result over {len(sample)} combinations.")
 
-    # Logic for creating the parquet files
-    directory.mkdir(parents=True, exist_ok=True)
+    finally:
+        close_model(uID)
 
-    if output_options is None:
-        for rt in ResultType:
-            parquet_insert(model_context, rt)
+    return differences
 
-    else:
-        for rt in ResultType:
-            if output_options[rt.label] == "TRUE":
-                parquet_insert(model_context, rt)
 
-    # Close the Strand7 model
+# Close the Strand7 model
+def close_model(uID: ctypes.c_int):
     _check_St7_error_message(St7.St7CloseResultFile(uID))
     _check_St7_error_message(St7.St7CloseFile(uID))
     _check_St7_error_message(St7.St7Release())
 
 
+def close_result_file(uID: ctypes.c_int):
+    _check_St7_error_message(St7.St7CloseResFile(uID))
+    _check_St7_error_message(St7.St7Release())
+
+
 class ResultType(Enum):
 
     NODAL_COORDINATES = ParquetSettings("Nodal Coordinates",
@@ -1234,62 +3286,129 @@ class ResultType(Enum):
     NODAL_LOADING = ParquetSettings("Nodal Loading",
                                     "nodal_loading.parquet",
                                     schema=_NODAL_LOADING_SCHEMA,
-                                    extractor=extract_nodal_loading)
+                                    slim_schema=_NODAL_LOADING_SCHEMA_V2,
+                                    extractor=extract_nodal_loading,
+                                    load_attributes=(St7.aoForce,))
 
     NODAL_REACTIONS = ParquetSettings("Nodal Reactions",
                                       "nodal_reactions.parquet",
                                       schema=_NODAL_REACTIONS_SCHEMA,
-                                      extractor=extract_nodal_reactions)
+                                      extractor=extract_nodal_reactions,
+                                      result_stream=_nodal_reaction_stream,
+                                      slim_schema=_NODAL_REACTIONS_SCHEMA_V2,
+                                      case_sharded=True,
+                                      sort_columns=_NODE_SORT_COLUMNS,
+                                      superposition_extractor=superpose_nodal_reactions,
+                                      restrained_only=True,
+                                      result_file_readable=True)
 
     NODAL_DISPLACEMENTS = ParquetSettings("Nodal Displacements",
                                           "nodal_displacements.parquet",
                                           schema=_NODAL_DISPLACEMENTS_SCHEMA,
-                                          extractor=extract_nodal_displacements)
+                                          extractor=extract_nodal_displacements,
+                                          result_stream=_nodal_displacement_stream,
+                                          slim_schema=_NODAL_DISPLACEMENTS_SCHEMA_V2,
+                                          case_sharded=True,
+                                          sort_columns=_NODE_SORT_COLUMNS,
+                                          superposition_extractor=superpose_nodal_displacements,
+                                          result_file_readable=True)
 
     BEAM_PROPERTIES = ParquetSettings("Beam Properties",
                                       "beam_properties.parquet",
                                       schema=_BEAM_PROPERTIES_SCHEMA,
+                                      slim_schema=_BEAM_PROPERTIES_SCHEMA_V2,
                                       extractor=extract_beam_properties)
 
     BEAM_DISTRIBUTED_LOADING = ParquetSettings("Beam Distributed Loading",
                                                "beam_distributed_loading.parquet",
                                                schema=_BEAM_DISTRIBUTED_LOADING_SCHEMA,
-                                               extractor=extract_beam_distributed_loading)
+                                               slim_schema=_BEAM_DISTRIBUTED_LOADING_SCHEMA_V2,
+                                               extractor=extract_beam_distributed_loading,
+                                               load_attributes=(St7.aoBeamDLL, St7.aoBeamDLG))
 
     BEAM_NS_MASS_LOADING = ParquetSettings("Beam NS Mass Loading",
                                            "beam_ns_mass_loading.parquet",
                                            schema=_BEAM_NON_STRUCTURAL_MASS_SCHEMA,
-                                           extractor=extract_beam_ns_mass_loading)
+                                           slim_schema=_BEAM_NON_STRUCTURAL_MASS_SCHEMA_V2,
+                                           extractor=extract_beam_ns_mass_loading,
+                                           load_attributes=(St7.aoBeamNSMass,))
 
     BEAM_POINT_LOADING = ParquetSettings("Beam Point Loading",
                                          "beam_point_loading.parquet",
                                          schema=_BEAM_POINT_LOADING_SCHEMA,
-                                         extractor=extract_beam_point_loading)
+                                         slim_schema=_BEAM_POINT_LOADING_SCHEMA_V2,
+                                         extractor=extract_beam_point_loading,
+                                         load_attributes=(St7.aoBeamCFL, St7.aoBeamCFG))
 
     BEAM_FORCES = ParquetSettings("Beam Forces",
                                   "beam_forces.parquet",
                                   schema=_BEAM_FORCE_SCHEMA,
-                                  extractor=extract_beam_forces)
+                                  extractor=extract_beam_forces,
+                                  result_stream=_beam_force_stream,
+                                  slim_schema=_BEAM_FORCE_SCHEMA_V2,
+                                  case_sharded=True,
+                                  sort_columns=_BEAM_SORT_COLUMNS,
+                                  superposition_extractor=superpose_beam_forces,
+                                  result_file_readable=True)
+
+    BEAM_END_FORCES = ParquetSettings("Beam End Forces",
+                                      "beam_end_forces.parquet",
+                                      schema=_BEAM_END_FORCE_SCHEMA,
+                                      extractor=extract_beam_end_forces,
+                                      result_stream=_beam_end_force_stream,
+                                      position_values=_BEAM_END_POSITIONS,
+                                      case_sharded=True,
+                                      sort_columns=_BEAM_END_SORT_COLUMNS,
+                                      superposition_extractor=superpose_beam_end_forces)
 
     BEAM_DISPLACEMENTS = ParquetSettings("Beam Displacements",
                                          "beam_displacements.parquet",
                                          schema=_BEAM_DISPLACEMENT_SCHEMA,
-                                         extractor=extract_beam_displacements)
+                                         extractor=extract_beam_displacements,
+                                         result_stream=_beam_displacement_stream,
+                                         slim_schema=_BEAM_DISPLACEMENT_SCHEMA_V2,
+                                         case_sharded=True,
+                                         sort_columns=_BEAM_SORT_COLUMNS,
+                                         superposition_extractor=superpose_beam_displacements)
 
     PLATE_PROPERTIES = ParquetSettings("Plate Properties",
                                        "plate_properties.parquet",
                                        schema=_PLATE_PROPERTIES_SCHEMA,
+                                       slim_schema=_PLATE_PROPERTIES_SCHEMA_V2,
                                        extractor=extract_plate_properties)
 
     PLATE_LOADING = ParquetSettings("Plate Loading",
                                     "plate_loading.parquet",
                                     schema=_PLATE_LOADING_SCHEMA,
-                                    extractor=extract_plate_loading)
+                                    slim_schema=_PLATE_LOADING_SCHEMA_V2,
+                                    extractor=extract_plate_loading,
+                                    load_attributes=(St7.aoPlateFacePressure, St7.aoPlateGlobalPressure,
+                                                     St7.aoPlateFaceShear))
 
     PLATE_NS_MASS_LOADING = ParquetSettings("Plate NS Mass Loading",
                                             "plate_ns_mass_loading.parquet",
                                             schema=_PLATE_NON_STRUCTURAL_MASS_SCHEMA,
-                                            extractor=extract_plate_non_structural_mass)
+                                            slim_schema=_PLATE_NON_STRUCTURAL_MASS_SCHEMA_V2,
+                                            extractor=extract_plate_non_structural_mass,
+                                            load_attributes=(St7.aoPlateNSMass,))
+
+    PLATE_LOCAL_STRESSES = ParquetSettings("Plate Local Stresses",
+                                           "plate_local_stresses.parquet",
+                                           schema=_PLATE_LOCAL_STRESS_SCHEMA,
+                                           extractor=extract_plate_local_stresses,
+                                           case_sharded=True,
+                                           sort_columns=_PLATE_SORT_COLUMNS,
+                                           sample_location=St7.spNodesAverageNever,
+                                           surfaces=(St7.psPlateMinusZ, St7.psPlatePlusZ))
+
+    PLATE_COMBINED_STRESSES = ParquetSettings("Plate Combined Stresses",
+                                              "plate_combined_stresses.parquet",
+                                              schema=_PLATE_DERIVED_STRESS_SCHEMA,
+                                              extractor=extract_plate_combined_stresses,
+                                              case_sharded=True,
+                                              sort_columns=_PLATE_SORT_COLUMNS,
+                                              sample_location=St7.spNodesAverageNever,
+                                              surfaces=(St7.psPlateMinusZ, St7.psPlatePlusZ))
 
 
     @property
@@ -1308,36 +3427,1085 @@ class ResultType(Enum):
     def extractor(self):
         return self.value.extractor
 
+    @property
+    def slim_schema(self):
+        return self.value.slim_schema
+
+    @property
+    def case_sharded(self):
+        return self.value.case_sharded
+
+    @property
+    def sort_columns(self):
+        return self.value.sort_columns
+
+    @property
+    def superposition_extractor(self):
+        return self.value.superposition_extractor
+
     @property
     def position_values(self):
         return self.value.position_values
 
+    @property
+    def sample_location(self):
+        return self.value.sample_location
+
+    @property
+    def surfaces(self):
+        return self.value.surfaces
+
+    @property
+    def load_attributes(self):
+        return self.value.load_attributes
+
+    @property
+    def storage_profile(self):
+        return self.value.storage_profile
+
+    @property
+    def restrained_only(self):
+        return self.value.restrained_only
+
+    @property
+    def result_stream(self):
+        return self.value.result_stream
+
+    @property
+    def result_file_readable(self):
+        return self.value.result_file_readable
+
+
+def get_parquet_settings(rt: ResultType, schema_version: int = 1) -> ParquetSettings:
+    """Gets the settings for a result type, swapping in its slim (v2) schema where one is defined."""
+    if schema_version >= 2 and rt.slim_schema is not None:
+        return replace(rt.value, schema=rt.slim_schema)
+    return rt.value
+
+
+def _get_writer_schema(pfs: ParquetSettings, schema_version: int) -> pa.Schema:
+    """Adds the key-value metadata the compatibility views need to the schema of slim (v2) files, and the
+    fingerprint of the inputs (see get_input_fingerprint) and any interpolation of the result file's stations
+    (see _get_station_interpolation) to the schema of every file."""
+    metadata = {}
+    if pfs.fingerprint is not None:
+        metadata[FINGERPRINT_KEY] = pfs.fingerprint.encode()
+    if pfs.station_interpolation is not None:
+        metadata[STATION_INTERPOLATION_KEY] = pfs.station_interpolation.encode()
+    if pfs.slim_schema is not None and schema_version >= 2:
+        metadata[SCHEMA_VERSION_KEY] = str(schema_version).encode()
+        if "Station" in pfs.schema.names:
+            metadata[STATION_POSITIONS_KEY] = json.dumps(list(pfs.position_values)).encode()
+    return pfs.schema.with_metadata(metadata) if metadata else pfs.schema
+
+
+# Bytes hashed at each of the evenly spaced offsets of a file fingerprint
+_FINGERPRINT_SAMPLE_BYTES = 65_536
+_FINGERPRINT_SAMPLES = 16
+
+
+def fingerprint_file(file_path: Union[str, pathlib.Path]) -> Union[dict, None]:
+    """Fingerprints a file by its size, modification time and a hash of _FINGERPRINT_SAMPLES evenly spaced blocks
+    (including the first and last), which reads about a megabyte of even the largest result file.
+    Returns None if the file does not exist."""
+    file_path = pathlib.Path(file_path)
+    if not file_path.exists():
+        return None
+
+    stat = file_path.stat()
+    return {"Size": stat.st_size, "MTime": stat.st_mtime_ns,
+            "SampledHash": _get_sampled_hash(str(file_path), stat.st_size, stat.st_mtime_ns)}
+
+
+# The files are fingerprinted for every result type, so the hash is kept while their size and mtime are the same
+@lru_cache(maxsize=256)
+def _get_sampled_hash(file_path: str, size: int, mtime_ns: int) -> str:
+    last_offset = max(size - _FINGERPRINT_SAMPLE_BYTES, 0)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for offset in sorted({last_offset * i // (_FINGERPRINT_SAMPLES - 1) for i in range(_FINGERPRINT_SAMPLES)}):
+            f.seek(offset)
+            digest.update(f.read(_FINGERPRINT_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def get_input_fingerprint(model_file: pathlib.Path, result_file: pathlib.Path, rt: ResultType,
+                          schema_version: int = 1, result_filter: ExtractionFilter = None,
+                          storage_profile: str = None, all_nodes: bool = False, envelopes: bool = False,
+                          combinations: CombinationSet = None, result_file_only: bool = False,
+                          interpolate_stations: bool = False) -> str:
+    """Gets the fingerprint of everything a result type's file is produced from, as canonical JSON.
+
+    This is the extraction version, the schema version, the model file's fingerprint (see fingerprint_file),
+    that of the result file for the result types with results, and the options that change the file's
+    rows or encoding, including whether it was read from the result file alone (see extract_result_file_data).
+    Options that only change how the file is written (pipelining, fusing, workers) or the order of its rows
+    (clustering) are left out, so a file whose fingerprint matches would be written with the same rows again
+    (see is_up_to_date). The result type is keyed by its file name, which every result type's settings have."""
+    options = {"ResultFilter": None if result_filter is None else asdict(result_filter),
+               "StorageProfile": storage_profile or rt.storage_profile,
+               "AllNodes": all_nodes and rt.restrained_only,
+               "Envelopes": envelopes and rt is ResultType.BEAM_FORCES,
+               "ResultFileOnly": result_file_only and rt.result_file_readable,
+               "InterpolatedStations": result_file_only and interpolate_stations and rt is ResultType.BEAM_FORCES,
+               "Combinations": None}
+    if combinations is not None and rt.case_sharded:
+        factors = np.ascontiguousarray(combinations.factors, dtype=np.float64)
+        options["Combinations"] = {"Names": list(combinations.names),
+                                   "FactorHash": hashlib.blake2b(factors.tobytes(), digest_size=16).hexdigest()}
+
+    fingerprint = {"Version": __version__, "ResultType": rt.file_name,
+                   "SchemaVersion": schema_version if rt.slim_schema is not None else 1,
+                   "ModelFile": fingerprint_file(model_file),
+                   "ResultFile": fingerprint_file(result_file) if rt.case_sharded else None,
+                   "Options": options}
+    return json.dumps(fingerprint, sort_keys=True)
+
+
+def read_input_fingerprint(file_path: pathlib.Path) -> Union[str, None]:
+    """Reads the input fingerprint of a file written by parquet_insert, or None if it has none or is missing."""
+    if not pathlib.Path(file_path).exists():
+        return None
+    metadata = pq.read_schema(file_path).metadata or {}
+    fingerprint = metadata.get(FINGERPRINT_KEY)
+    return None if fingerprint is None else fingerprint.decode()
+
+
+def is_up_to_date(file_path: pathlib.Path, fingerprint: str) -> bool:
+    """Returns whether the file was written from the inputs with the given fingerprint."""
+    return read_input_fingerprint(file_path) == fingerprint
+
+
+# Seconds between the progress messages of a long extraction
+_PROGRESS_INTERVAL = 60.0
+
+# Nominal sizes for the dry-run estimate, used unless a previous run report of the same result type is given
+_ESTIMATED_STRING_BYTES = 16
+_ESTIMATED_COMPRESSION_RATIO = 0.6
+
+
+def _get_entity_type(schema: pa.Schema) -> int:
+    if "BeamNumber" in schema.names:
+        return St7.tyBEAM
+    if "PlateNumber" in schema.names:
+        return St7.tyPLATE
+    return St7.tyNODE
+
+
+def estimate_rows(mctx: ModelExtractionContext, pfs: ParquetSettings, entity_calls: bool = True) -> int:
+    """Predicts the rows a result type writes from the model totals, without calling the result APIs.
+
+    Results are the selected entities x the selected result cases x the rows per entity and case (the beam
+    stations, or the plate surfaces x the points of each plate). Loading rows are counted from the attribute
+    sequences. Everything else is a row per entity.
+
+    Counting the loads or plate points, or filtering by group without a topology snapshot, takes a call per
+    entity, so None is returned for them unless entity_calls (the dry run). The extraction's progress only
+    uses the estimates that come from the totals (see _get_insert_settings)."""
+
+    entity_type = _get_entity_type(pfs.schema)
+    total = ctypes.c_int(_get_entity_total(mctx, entity_type))
+
+    if pfs.load_attributes:
+        if not entity_calls:
+            return None
+        rows = 0
+        load_count = ctypes.c_int(0)
+        for entity in range(1, total.value + 1):
+            for attribute in pfs.load_attributes:
+                _check_St7_error_message(St7.St7GetEntityAttributeSequenceCount(mctx.uID, entity_type, entity,
+                                                                                attribute, ctypes.byref(load_count)))
+                rows += load_count.value
+        return rows
+
+    if not pfs.case_sharded:
+        return total.value
+
+    grouped = pfs.result_filter is not None and pfs.result_filter.groups is not None and mctx.topology is None
+    plate_points = entity_type == St7.tyPLATE and pfs.sample_location != St7.spCentroid
+    if not entity_calls and (grouped or plate_points):
+        return None
+
+    entities = _get_selected_entities(mctx, pfs, entity_type, total.value)
+    cases = len(_get_selected_cases(mctx, pfs, _get_result_case_names(mctx)))
+
+    if entity_type == St7.tyBEAM:
+        return len(entities) * cases * len(pfs.position_values)
+
+    if entity_type == St7.tyPLATE:
+        if pfs.sample_location == St7.spCentroid:
+            points = len(entities)
+        else:
+            connections = (ctypes.c_int * St7.kMaxElementNode)()
+            points = 0
+            for plate in entities:
+                _check_St7_error_message(St7.St7GetElementConnection(mctx.uID, St7.tyPLATE, plate, connections))
+                points += connections[0]
+        return points * cases * len(pfs.surfaces)
+
+    return len(entities) * cases
+
+
+def _estimate_row_bytes(schema: pa.Schema) -> float:
+    """Nominal compressed bytes per row of a schema, for when no previous run report is available."""
+    row_bytes = sum(_ESTIMATED_STRING_BYTES if pa.types.is_string(f.type) else f.type.bit_width / 8 for f in schema)
+    return row_bytes * _ESTIMATED_COMPRESSION_RATIO
+
+
+class _PipelinedWriter:
+    """Writer thread draining a bounded queue of batches, for the pipelined parquet_insert.
+
+    An error in the writer is raised in the extracting thread at its next put, or when the pipeline is closed.
+    After an error the writer keeps draining the queue, so the extracting thread never blocks on it."""
+
+    def __init__(self, write: Callable, queue_size: int):
+        self.write = write
+        self.batches = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="parquet-writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while (item := self.batches.get()) is not None:
+            if self.error is None:
+                try:
+                    self.write(item)
+                except BaseException as e:
+                    self.error = e
+
+    def put(self, item):
+        if self.error is not None:
+            raise RuntimeError("The Parquet writer thread failed.") from self.error
+        self.batches.put(item)
+
+    def abort(self):
+        self.batches.put(None)
+        self.thread.join()
+
+    def close(self):
+        self.abort()
+        if self.error is not None:
+            raise RuntimeError("The Parquet writer thread failed.") from self.error
+
+
+def _get_insert_settings(mctx: ModelExtractionContext, rt: ResultType, schema_version: int,
+                         result_filter: ExtractionFilter, telemetry: ExtractionTelemetry, pipelined: bool,
+                         envelope_path: pathlib.Path, storage_profile: str, all_nodes: bool) -> ParquetSettings:
+    """Gets the settings a result type is inserted with (see parquet_insert), with the telemetry's expected rows
+    and the fingerprint of the inputs."""
+    pfs = get_parquet_settings(rt, schema_version)
+    pfs = replace(pfs, fingerprint=get_input_fingerprint(mctx.model_name, mctx.result_file, rt, schema_version,
+                                                         result_filter, storage_profile, all_nodes,
+                                                         envelope_path is not None, mctx.combinations,
+                                                         mctx.topology is not None, mctx.interpolate_stations))
+    if result_filter is not None:
+        pfs = replace(pfs, result_filter=result_filter,
+                      position_values=result_filter.positions or pfs.position_values)
+    if all_nodes:
+        pfs = replace(pfs, restrained_only=False)
+    if mctx.topology is not None and mctx.interpolate_stations and rt is ResultType.BEAM_FORCES:
+        pfs = replace(pfs, station_interpolation="linear")
+
+    telemetry = ExtractionTelemetry(rt.label, rt.file_name) if telemetry is None else telemetry
+    # Only estimated from the totals, as the per-entity calls of a full estimate are left to the dry run
+    telemetry.expected_rows = estimate_rows(mctx, pfs, entity_calls=False)
+    pfs = replace(pfs, telemetry=telemetry, pipelined=pipelined)
+    if storage_profile is not None:
+        pfs = replace(pfs, storage_profile=storage_profile)
+
+    if envelope_path is not None:
+        if rt is not ResultType.BEAM_FORCES:
+            raise ValueError(f"Envelopes can only be accumulated for beam forces, not {rt.label}.")
+        pfs = replace(pfs, envelope=BeamForceEnvelope(get_envelope_positions(rt, result_filter)))
+    return pfs
+
+
+def _get_insert_write(writer: _ProfiledWriter, rt: ResultType, pfs: ParquetSettings) -> Callable:
+    """Gets the function converting and writing a RecordBatch, PendingBatch or lists of tuple rows."""
+    def write(item):
+        write_start = time.perf_counter()
+        if isinstance(item, list):
+            _create_parq_table(writer, item, pfs.schema, rt.schema)
+        else:
+            writer.write(item.to_batch() if isinstance(item, PendingBatch) else item)
+        pfs.telemetry.write_seconds += time.perf_counter() - write_start
+    return write
+
+
+def _finish_insert(mctx: ModelExtractionContext, rt: ResultType, pfs: ParquetSettings, file_path: pathlib.Path,
+                   clustered: bool, envelope_path: pathlib.Path):
+    """Clusters the written file, writes the envelope and records the file size in the telemetry."""
+    if clustered and rt.sort_columns:
+        cluster_parquet_file(file_path, rt.sort_columns, scratch_path=mctx.scratch_path)
+
+    if pfs.envelope is not None:
+        pfs.envelope.write(envelope_path)
+
+    pfs.telemetry.bytes_written = file_path.stat().st_size
+    pfs.telemetry.end = time.perf_counter()
+    pfs.telemetry.log_progress(logger)
+
 
 # Generic function for inserting the family_results of the extraction into parquet files
-def parquet_insert(mctx: ModelExtractionContext, rt: ResultType, batch_size: int=50_000):
-    """Generic function to write the family_results from the extraction processes to the parquet files"""
+def parquet_insert(mctx: ModelExtractionContext, rt: ResultType, batch_size: int=50_000, schema_version: int = 1,
+                   file_path: pathlib.Path = None, clustered: bool = False,
+                   result_filter: ExtractionFilter = None, telemetry: ExtractionTelemetry = None,
+                   pipelined: bool = False, queue_size: int = 4, envelope_path: pathlib.Path = None,
+                   storage_profile: str = None, all_nodes: bool = False) -> int:
+    """Generic function to write the family_results from the extraction processes to the parquet files.
+
+    Extractors either yield one tuple per row, which are collected into lists and written every `batch_size`
+    rows, or yield whole RecordBatches filled from typed column buffers, which are written as they arrive.
+    Tuple rows are always in the original (v1) layout, and the slim (v2) layout keeps only its columns.
+    If clustered, result types with sort columns are then rewritten sorted by entity (see cluster_parquet_file).
+    If the context has combinations, result types with a superposition extractor use it instead.
+    A result filter limits the entities, cases and stations extracted (see ExtractionFilter).
+    The progress, timings and bytes written are recorded in the telemetry (see ExtractionTelemetry), and the
+    progress is logged every _PROGRESS_INTERVAL seconds with an ETA for the result types with results.
+
+    If pipelined, the Arrow conversion, encoding and compression run on a writer thread fed through a queue of
+    at most `queue_size` batches, so they overlap the Strand7 API calls, which stay on the calling thread. The
+    extractor blocks while the queue is full, which bounds the memory held in batches waiting to be written.
+
+    If an envelope path is given (beam forces only), the per-beam and per-station envelope of the rows written
+    is accumulated as they stream past and written there (see BeamForceEnvelope).
+
+    The storage profile (see STORAGE_PROFILES) overrides the result type's encoding of the file. The nodal
+    reactions are only read for the restrained nodes, unless all_nodes (e.g. to validate the restraints).
+    Returns the number of rows written."""
 
     counter = 0
-
-    with pq.ParquetWriter(mctx.directory / rt.file_name, schema=rt.schema) as writer:
+    extractor = rt.extractor
+    if mctx.combinations is not None and rt.superposition_extractor is not None:
+        extractor = rt.superposition_extractor
+    elif mctx.combinations is not None and rt.case_sharded:
+        raise ValueError(f"{rt.label} cannot be superposed from the primary result cases.")
+
+    pfs = _get_insert_settings(mctx, rt, schema_version, result_filter, telemetry, pipelined, envelope_path,
+                               storage_profile, all_nodes)
+    telemetry = pfs.telemetry
+    file_path = get_result_file(mctx.directory, rt.file_name, mctx.hive) if file_path is None else file_path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+
+    profile = get_storage_profile(pfs.storage_profile)
+    writer_schema = profile.apply(_get_writer_schema(pfs, schema_version))
+    with _ProfiledWriter(file_path, writer_schema, profile) as writer:
+        write = _get_insert_write(writer, rt, pfs)
+        pipeline = _PipelinedWriter(write, queue_size) if pipelined else None
+        submit = write if pipeline is None else pipeline.put
+        submit_seconds = 0.0
         result_lists = None
-        for r in rt.extractor(mctx, rt.value):
-            if result_lists is None:
-                result_lists = [[] for _ in range(len(r))]
-            for i, v in enumerate(r):
-                result_lists[i].append(v)
-            counter += 1
+        loop_start = time.perf_counter()
+        try:
+            for r in extractor(mctx, pfs):
+                if isinstance(r, (pa.RecordBatch, PendingBatch)):
+                    submit_start = time.perf_counter()
+                    submit(r)
+                    submit_seconds += time.perf_counter() - submit_start
+                    counter += r.num_rows
+                    telemetry.rows = counter
+                    telemetry.batches += 1
+                    if submit_start - telemetry.last_progress > _PROGRESS_INTERVAL:
+                        telemetry.log_progress(logger)
+                    continue
+
+                if result_lists is None:
+                    result_lists = [[] for _ in range(len(r))]
+                for i, v in enumerate(r):
+                    result_lists[i].append(v)
+                counter += 1
+
+                if counter % batch_size == 0:
+                    submit_start = time.perf_counter()
+                    submit(result_lists)
+                    submit_seconds += time.perf_counter() - submit_start
+                    # The submitted lists may still be waiting in the queue, so the rows carry on in new ones
+                    result_lists = [[] for _ in range(len(r))]
+                    telemetry.rows = counter
+                    telemetry.batches += 1
+                    if submit_start - telemetry.last_progress > _PROGRESS_INTERVAL:
+                        telemetry.log_progress(logger)
+
+            if result_lists and result_lists[0]:
+                submit_start = time.perf_counter()
+                submit(result_lists)
+                submit_seconds += time.perf_counter() - submit_start
+                telemetry.batches += 1
+
+        except BaseException:
+            if pipeline is not None:
+                pipeline.abort()
+            raise
+
+        if pipeline is not None:
+            pipeline.close()
+            telemetry.queue_wait_seconds += submit_seconds
+
+        telemetry.rows = counter
+        telemetry.extractor_seconds += time.perf_counter() - loop_start - submit_seconds
+
+    _finish_insert(mctx, rt, pfs, file_path, clustered, envelope_path)
+
+    return counter
+
+
+def parquet_insert_fused(mctx: ModelExtractionContext, result_types: list[ResultType], schema_version: int = 1,
+                         file_paths: dict = None, clustered: bool = False, result_filters: dict = None,
+                         telemetry: dict = None, pipelined: bool = False, queue_size: int = 4,
+                         envelope_path: pathlib.Path = None, storage_profiles: dict = None,
+                         all_nodes: bool = False) -> dict[ResultType, int]:
+    """Writes several result types of one entity type (e.g. the nodal reactions and displacements) from a single
+    traversal of the result cases. Each case is visited once and each node or beam once per case, reading every
+    result type in that visit, and the batches of each are routed to its own file (see _traverse_results).
+
+    The files are those parquet_insert writes for each result type, with the options given per result type
+    where they differ (file_paths, result_filters, telemetry and storage_profiles are dicts keyed by ResultType).
+    The envelope path is used for the beam forces. As the Strand7 calls of the result types are interleaved,
+    the API time is shared between their telemetry in proportion to their rows.
+
+    Only result types with a result stream can be fused, and not when superposing, which reads the primary
+    cases per entity instead (see _superpose_results). Returns the rows written per result type."""
+
+    if mctx.combinations is not None:
+        raise ValueError("Superposed result types cannot be fused.")
+    unfusable = [rt.label for rt in result_types if rt.result_stream is None]
+    if unfusable:
+        raise ValueError(f"{', '.join(unfusable)} cannot be fused.")
+    if len({_get_entity_type(rt.schema) for rt in result_types}) > 1:
+        raise ValueError("Only result types of the same entity type can be fused.")
+
+    file_paths = file_paths or {}
+    result_filters = result_filters or {}
+    telemetry = telemetry or {}
+    storage_profiles = storage_profiles or {}
+    settings = [_get_insert_settings(mctx, rt, schema_version, result_filters.get(rt), telemetry.get(rt), pipelined,
+                                     envelope_path if rt is ResultType.BEAM_FORCES else None,
+                                     storage_profiles.get(rt), all_nodes)
+                for rt in result_types]
+    paths = [get_result_file(mctx.directory, rt.file_name, mctx.hive) if file_paths.get(rt) is None
+             else file_paths[rt] for rt in result_types]
+
+    counters = [0] * len(result_types)
+    with ExitStack() as stack:
+        writes = []
+        for rt, pfs, file_path in zip(result_types, settings, paths):
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            profile = get_storage_profile(pfs.storage_profile)
+            writer_schema = profile.apply(_get_writer_schema(pfs, schema_version))
+            writer = stack.enter_context(_ProfiledWriter(file_path, writer_schema, profile))
+            writes.append(_get_insert_write(writer, rt, pfs))
+
+        case_names = _get_result_case_names(mctx)
+        streams = [rt.result_stream(mctx, pfs, case_names) for rt, pfs in zip(result_types, settings)]
+
+        pipelines = [_PipelinedWriter(write, queue_size) for write in writes] if pipelined else []
+        submits = [pipeline.put for pipeline in pipelines] or writes
+        submit_seconds = 0.0
+        loop_start = time.perf_counter()
+        try:
+            for i, batch in _traverse_results(streams, case_names):
+                submit_start = time.perf_counter()
+                submits[i](batch)
+                submit_seconds += time.perf_counter() - submit_start
+                counters[i] += batch.num_rows
+                result_telemetry = settings[i].telemetry
+                result_telemetry.rows = counters[i]
+                result_telemetry.batches += 1
+                if submit_start - result_telemetry.last_progress > _PROGRESS_INTERVAL:
+                    result_telemetry.log_progress(logger)
+
+        finally:
+            for pipeline in pipelines:
+                pipeline.abort()
+
+        for pipeline in pipelines:
+            if pipeline.error is not None:
+                raise RuntimeError("The Parquet writer thread failed.") from pipeline.error
+
+        # Each buffer's conversion time is its own, and only the rest of the loop is shared out by rows
+        conversion_seconds = sum(pfs.telemetry.conversion_seconds for pfs in settings)
+        shared_seconds = time.perf_counter() - loop_start - submit_seconds - conversion_seconds
+        total_rows = sum(counters) or 1
+        for pfs, rows in zip(settings, counters):
+            pfs.telemetry.rows = rows
+            pfs.telemetry.extractor_seconds += pfs.telemetry.conversion_seconds + shared_seconds * rows / total_rows
+            if pipelined:
+                pfs.telemetry.queue_wait_seconds += submit_seconds * rows / total_rows
+
+    for rt, pfs, file_path in zip(result_types, settings, paths):
+        _finish_insert(mctx, rt, pfs, file_path, clustered, envelope_path)
+
+    return dict(zip(result_types, counters))
+
+
+def _get_fused_groups(result_types: list[ResultType], fused: Iterable[ResultType]) -> list[list[ResultType]]:
+    """Groups the result types to fuse by entity type, in the order of `result_types` and keeping only those in
+    it. A result type left on its own in a group is not fused."""
+    fused = set(fused or ())
+    unfusable = [rt.label for rt in fused if rt.result_stream is None]
+    if unfusable:
+        raise ValueError(f"{', '.join(unfusable)} cannot be fused.")
+
+    groups = {}
+    for rt in result_types:
+        if rt in fused:
+            groups.setdefault(_get_entity_type(rt.schema), []).append(rt)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _key_boundary(keys: np.ndarray, target: int) -> int:
+    """Gets the row count of the next row group: the last change of key at or before `target` rows, so that
+    an entity's rows are never split across row groups (unless a single entity has more than `target` rows)."""
+    if target >= len(keys):
+        return len(keys)
+    boundary = int(np.searchsorted(keys, keys[target], side="left"))
+    if boundary == 0:
+        boundary = int(np.searchsorted(keys, keys[0], side="right"))
+    return boundary
+
+
+def cluster_parquet_file(file_path: pathlib.Path, sort_columns: tuple, row_group_size: int = 100_000,
+                         bloom_filter: bool = True, scratch_path: pathlib.Path = None) -> int:
+    """Rewrites a result file sorted by entity (BeamNumber or NodeNumber), then case and station.
+
+    The sort runs in DuckDB, which spills to a temporary folder in `scratch_path` (the system temporary folder
+    if None), so files larger than memory can be clustered. Row groups of about `row_group_size` rows end on
+    entity boundaries and carry min/max statistics, the sorting columns and optionally a bloom filter on the
+    entity column, so a lookup of one or a few beams only reads the row groups holding them. If the rewrite
+    fails, the unsorted file is put back. Returns the number of rows written."""
+
+    schema = pq.read_schema(file_path)
+    columns = [name for name in sort_columns if name in schema.names]
+    key = columns[0]
+
+    unsorted_path = file_path.with_name(file_path.name + ".unsorted")
+    os.replace(file_path, unsorted_path)
+
+    spill_directory = tempfile.mkdtemp(prefix="duckdb_cluster_", dir=scratch_path)
+    conn = duckdb.connect()
+    clustered = False
+    try:
+        conn.execute(f"SET temp_directory = '{spill_directory}'")
+
+        # Entities per row group, for sizing the bloom filter
+        row_count, key_count = conn.execute(f"SELECT count(*), count(DISTINCT {key}) FROM "
+                                            f"read_parquet('{unsorted_path}', hive_partitioning = false)").fetchone()
+        key_rows = max(row_count // max(key_count, 1), 1)
+        bloom_filter_options = {key: {"ndv": max(row_group_size // key_rows, 1), "fpp": 0.01}} if bloom_filter else None
+
+        reader = conn.execute(f"SELECT * FROM read_parquet('{unsorted_path}', hive_partitioning = false) "
+                              f"ORDER BY {', '.join(columns)}").fetch_record_batch(row_group_size)
+
+        counter = 0
+        pending = None
+        with pq.ParquetWriter(file_path, schema=schema, write_statistics=True, write_page_index=True,
+                              sorting_columns=[pq.SortingColumn(schema.get_field_index(name)) for name in columns],
+                              bloom_filter_options=bloom_filter_options,
+                              **_get_file_storage_profile(schema).writer_options(schema)) as writer:
+            for batch in reader:
+                table = pa.Table.from_batches([batch]).cast(schema)
+                pending = table if pending is None else pa.concat_tables([pending, table])
+
+                while pending.num_rows > row_group_size:
+                    rows = _key_boundary(pending[key].to_numpy(), row_group_size)
+                    writer.write_table(pending.slice(0, rows).combine_chunks(), row_group_size=rows)
+                    pending = pending.slice(rows)
+                    counter += rows
+
+            if pending is not None and pending.num_rows:
+                writer.write_table(pending.combine_chunks(), row_group_size=pending.num_rows)
+                counter += pending.num_rows
+        clustered = True
+
+    finally:
+        conn.close()
+        shutil.rmtree(spill_directory, ignore_errors=True)
+        if clustered:
+            unsorted_path.unlink()
+        else:
+            os.replace(unsorted_path, file_path)
+
+    return counter
+
+
+def _split_result_cases(number_of_cases: int, shard_count: int) -> list[range]:
+    """Splits result cases 1..number_of_cases into contiguous, near-equal ranges (one per shard, possibly empty)."""
+    size, remainder = divmod(number_of_cases, shard_count)
+    ranges = []
+    start = 1
+    for shard in range(shard_count):
+        stop = start + size + (1 if shard < remainder else 0)
+        ranges.append(range(start, stop))
+        start = stop
+    return ranges
+
+
+def get_part_directory(directory: pathlib.Path, rt: ResultType, hive: bool = False) -> pathlib.Path:
+    """Gets the folder holding the case-range part files of a sharded result type (e.g. beam_forces_parts, or
+    result=beam_forces/_parts in a hive-partitioned dataset, where the underscore hides it from dataset readers)."""
+    if hive:
+        return get_result_file(directory, rt.file_name, hive).parent / "_parts"
+    return directory / f"{pathlib.Path(rt.file_name).stem}_parts"
+
+
+def get_part_file(directory: pathlib.Path, rt: ResultType, result_cases: range, hive: bool = False) -> pathlib.Path:
+    """Gets the part file for a range of result cases. The zero padding keeps the files sorted in case order."""
+    return get_part_directory(directory, rt, hive) / f"part-{result_cases.start:05d}-{result_cases[-1]:05d}.parquet"
+
 
-            if counter % batch_size == 0:
-                if result_lists:
-                    _create_parq_table(writer, result_lists, rt.schema)
+def merge_part_files(part_directory: pathlib.Path, file_path: pathlib.Path, remove_parts: bool = True,
+                     row_group_size: int = 50_000) -> int:
+    """Streams the part files of a sharded result type, in case order, into a single Parquet file.
 
-        if result_lists:
-            _create_parq_table(writer, result_lists, rt.schema)
+    The rows are regrouped into row groups of `row_group_size` (the extraction batch size). The merged file
+    holds the same rows in the same order as one written by a single parquet_insert, but its row groups (and so
+    its bytes) only match when the batch size is a multiple of the rows read per entity and case, e.g. the 5
+    stations of a beam, as a column buffer is flushed early rather than split an entity's rows. Plates with a
+    mix of 3 and 4 points never line up. Only one row group is held in memory at a time.
+    Returns the number of rows written."""
+
+    part_files = sorted(part_directory.glob("part-*.parquet"))
+    if not part_files:
+        return 0
+
+    # A decimal column that fell back to float64 in any part (see _ProfiledWriter) is float64 in the merged file
+    schema = pq.read_schema(part_files[0])
+    widened = {f.name for part_file in part_files[1:] for f in pq.read_schema(part_file)
+               if pa.types.is_float64(f.type) and pa.types.is_decimal(schema.field(f.name).type)}
+    schema = StorageProfile.widen(schema, widened)
+
+    counter = 0
+    pending = []
+    pending_rows = 0
+    with pq.ParquetWriter(file_path, schema=schema, **_get_file_storage_profile(schema).writer_options(schema)) as writer:
+        for part_file in part_files:
+            for batch in pq.ParquetFile(part_file).iter_batches(batch_size=row_group_size):
+                pending.append(batch.cast(schema) if batch.schema != schema else batch)
+                pending_rows += batch.num_rows
+
+                while pending_rows >= row_group_size:
+                    table = pa.Table.from_batches(pending)
+                    writer.write_table(table.slice(0, row_group_size).combine_chunks(), row_group_size=row_group_size)
+                    remainder = table.slice(row_group_size)
+                    pending = remainder.to_batches()
+                    pending_rows = remainder.num_rows
+                    counter += row_group_size
+
+        if pending_rows:
+            writer.write_table(pa.Table.from_batches(pending).combine_chunks(), row_group_size=row_group_size)
+            counter += pending_rows
+
+    if remove_parts:
+        for part_file in part_files:
+            part_file.unlink()
+        part_directory.rmdir()
+
+    return counter
+
+
+def extract_model_shard(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path,
+                        directory: pathlib.Path, shard_index: int, shard_count: int, result_type_names: list[str],
+                        schema_version: int = 1, log_fp: pathlib.Path = None, hive: bool = False,
+                        clustered: bool = False, result_filters: dict = None, pipelined: bool = False,
+                        envelopes: bool = False, storage_profiles: dict = None,
+                        all_reaction_nodes: bool = False, fused_result_type_names: list[str] = None,
+                        write_topology: bool = False) -> tuple[dict[str, int], list[dict]]:
+    """Worker process for extract_model_data_parallel.
+
+    Opens the model under its own uID and scratch folder, then extracts its range of result cases for every
+    case-sharded ResultType into part files, plus its round-robin share of the remaining ResultTypes in full.
+    With envelopes, each beam force part file gets the envelope of its cases alongside (see get_envelope_part_file).
+    The fused result types are read in one traversal of the shard's cases (see parquet_insert_fused), and
+    the first shard writes the dimension tables and, if write_topology, the topology snapshot.
+    Returns the rows written per result file (to its part file, for the case-sharded result types) and the
+    telemetry of each result type."""
+
+    if log_fp is not None:
+        setup_logging(log_fp.with_name(f"{log_fp.stem} Worker {shard_index}{log_fp.suffix}"))
+
+    # Strand7 cannot share a scratch folder between concurrently open models
+    worker_scratch_path = scratch_path / f"worker_{shard_index}"
+    worker_scratch_path.mkdir(parents=True, exist_ok=True)
+
+    uID, primary_combo_count, secondary_combo_count = initialize_model(model_file, result_file, worker_scratch_path,
+                                                                       model_id=shard_index + 1)
+    rows_written = {}
+    telemetry = []
+    try:
+        load_case_count = ctypes.c_int(0)
+        _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+
+        number_of_cases = primary_combo_count.value + secondary_combo_count.value
+        result_cases = _split_result_cases(number_of_cases, shard_count)[shard_index]
+        model_context = ModelExtractionContext(model_file, result_file, uID, load_case_count, primary_combo_count,
+                                               secondary_combo_count, directory, result_cases=result_cases, hive=hive,
+                                               dimensions=read_model_dimensions(uID), scratch_path=worker_scratch_path)
+
+        if shard_index == 0:
+            write_dimension_tables(model_context)
+            if schema_version >= 2:
+                write_result_case_table(model_context)
+            if write_topology:
+                write_model_topology(model_context)
+
+        result_filters = result_filters or {}
+        storage_profiles = storage_profiles or {}
+        result_types = [ResultType[name] for name in result_type_names]
+        fused = [ResultType[name] for name in fused_result_type_names or ()]
+        fused_groups = {group[0]: group for group in _get_fused_groups(result_types, fused)}
+        fused_types = {rt for group in fused_groups.values() for rt in group}
+        for rt in result_types:
+            if rt in fused_groups and result_cases:
+                part_files = {group_rt: get_part_file(directory, group_rt, result_cases, hive)
+                              for group_rt in fused_groups[rt]}
+                envelope_path = None
+                if envelopes and ResultType.BEAM_FORCES in part_files:
+                    envelope_path = get_envelope_part_file(part_files[ResultType.BEAM_FORCES])
+                group_telemetry = {group_rt: ExtractionTelemetry(group_rt.label, group_rt.file_name)
+                                   for group_rt in fused_groups[rt]}
+                group_rows = parquet_insert_fused(model_context, fused_groups[rt], schema_version=schema_version,
+                                                  file_paths=part_files, result_filters=result_filters,
+                                                  telemetry=group_telemetry, pipelined=pipelined,
+                                                  envelope_path=envelope_path, storage_profiles=storage_profiles,
+                                                  all_nodes=all_reaction_nodes)
+                for group_rt, rows in group_rows.items():
+                    rows_written[group_rt.file_name] = rows
+                    telemetry.append(group_telemetry[group_rt].as_dict())
+
+            elif rt.case_sharded and result_cases and rt not in fused_types:
+                part_file = get_part_file(directory, rt, result_cases, hive)
+                part_file.parent.mkdir(parents=True, exist_ok=True)
+                envelope_path = None
+                if envelopes and rt is ResultType.BEAM_FORCES:
+                    envelope_path = get_envelope_part_file(part_file)
+                result_telemetry = ExtractionTelemetry(rt.label, rt.file_name)
+                rows_written[rt.file_name] = parquet_insert(model_context, rt, schema_version=schema_version,
+                                                            file_path=part_file, result_filter=result_filters.get(rt),
+                                                            telemetry=result_telemetry, pipelined=pipelined,
+                                                            envelope_path=envelope_path,
+                                                            storage_profile=storage_profiles.get(rt),
+                                                            all_nodes=all_reaction_nodes)
+                telemetry.append(result_telemetry.as_dict())
+
+        for rt in [rt for rt in result_types if not rt.case_sharded][shard_index::shard_count]:
+            result_telemetry = ExtractionTelemetry(rt.label, rt.file_name)
+            rows_written[rt.file_name] = parquet_insert(model_context, rt, schema_version=schema_version,
+                                                        clustered=clustered, result_filter=result_filters.get(rt),
+                                                        telemetry=result_telemetry, pipelined=pipelined,
+                                                        storage_profile=storage_profiles.get(rt),
+                                                        all_nodes=all_reaction_nodes)
+            telemetry.append(result_telemetry.as_dict())
+
+    finally:
+        close_model(uID)
+
+    return rows_written, telemetry
+
+
+# Main function for extracting family_results across several worker processes
+def extract_model_data_parallel(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path,
+                                directory: pathlib.Path, workers: int = None, output_options=None,
+                                schema_version: int = 1, merge: bool = True, log_fp: pathlib.Path = None,
+                                partition: dict = None, clustered: bool = False,
+                                result_filters: dict = None, pipelined: bool = False,
+                                envelopes: bool = False, storage_profiles: dict = None,
+                                all_reaction_nodes: bool = False, fused: Iterable["ResultType"] = None,
+                                write_topology: bool = False) -> dict[str, int]:
+    """Extracts the model data with one Strand7 instance per worker process.
+
+    The result cases are split into one contiguous range per worker. The case-sharded result types (beam forces,
+    nodal reactions etc.) are written as part files under e.g. beam_forces_parts/, which are then merged into
+    the usual single files in case order. With merge=False the part folders are left as the dataset
+    (see parquet_views.result_source), which is refused for a partition, as dataset readers skip its _parts.
+    The partition, clustering, filters, pipelining, envelopes, storage profiles, reaction nodes, fused result
+    types and topology snapshot are as for extract_model_data, and the envelopes of the shards are merged into
+    one file.
+    The telemetry of the shards is combined into one run report. Returns the rows written per result file, as
+    for extract_model_data, with the rows of every shard's part file summed into its result file."""
+
+    started = datetime.now()
+    workers = os.cpu_count() if workers is None else workers
+    hive = partition is not None
+    if hive and not merge:
+        raise ValueError("A partitioned extraction must be merged, as dataset readers ignore the _parts folders.")
+    if hive:
+        directory = get_partition_directory(directory, partition)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    result_types = [rt for rt in ResultType if output_options is None or output_options[rt.label] == "TRUE"]
+    result_type_names = [rt.name for rt in result_types]
+
+    # Part files (and part envelopes) left by an earlier run, e.g. with merge=False, a different worker count or
+    # a failed shard, would otherwise be merged with this run's overlapping case ranges
+    for rt in result_types:
+        if rt.case_sharded:
+            _remove_part_directory(get_part_directory(directory, rt, hive))
+
+    rows_written = {}
+    telemetry = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(extract_model_shard, model_file, result_file, scratch_path, directory,
+                                   shard_index, workers, result_type_names, schema_version, log_fp, hive, clustered,
+                                   result_filters, pipelined, envelopes, storage_profiles, all_reaction_nodes,
+                                   [rt.name for rt in fused or ()], write_topology)
+                   for shard_index in range(workers)]
+        for future in futures:
+            shard_rows, shard_telemetry = future.result()
+            for file_name, rows in shard_rows.items():
+                rows_written[file_name] = rows_written.get(file_name, 0) + rows
+            telemetry.extend(shard_telemetry)
+
+    telemetry = combine_telemetry(telemetry)
+
+    # The envelope is always merged, as it is small, and the part envelopes go before the part folder is removed
+    if envelopes and ResultType.BEAM_FORCES in result_types:
+        envelope_files = sorted(get_part_directory(directory, ResultType.BEAM_FORCES, hive).glob("envelope-*.parquet"))
+        merge_envelope_files(envelope_files, get_result_file(directory, BEAM_FORCE_ENVELOPE_FILE, hive),
+                             get_envelope_positions(ResultType.BEAM_FORCES,
+                                                    (result_filters or {}).get(ResultType.BEAM_FORCES)))
+        if merge:
+            for envelope_file in envelope_files:
+                envelope_file.unlink()
+
+    if merge:
+        for rt in result_types:
+            if rt.case_sharded:
+                part_directory = get_part_directory(directory, rt, hive)
+                if part_directory.exists():
+                    file_path = get_result_file(directory, rt.file_name, hive)
+                    rows = merge_part_files(part_directory, file_path, row_group_size=rt.value.batch_size)
+                    if clustered:
+                        cluster_parquet_file(file_path, rt.sort_columns, scratch_path=scratch_path)
+                    logger.info(f"{rt.label}: {rows} rows merged into {rt.file_name}.")
+                    for entry in telemetry:
+                        if entry["FileName"] == rt.file_name:
+                            entry["BytesWritten"] = file_path.stat().st_size
+
+    write_run_report(directory / RUN_REPORT_FILE, model_file, result_file, schema_version, started, telemetry,
+                     workers=workers)
+
+    return rows_written
+
+
+
+def _split_into_parts(number_of_cases: int, cases_per_part: int) -> list[range]:
+    """Splits result cases 1..number_of_cases into consecutive ranges of at most cases_per_part cases."""
+    return [range(start, min(start + cases_per_part, number_of_cases + 1))
+            for start in range(1, number_of_cases + 1, cases_per_part)]
+
+
+class CheckpointJournal:
+    """Append-only journal of the files committed by a resumable extraction.
+
+    A file is only journalled once it has been completely written and atomically renamed into place, so an
+    entry acts as the commit marker for that file. The first line identifies the job, and a journal left by a
+    different job (other model, result file or settings) is discarded along with its part files."""
+
+    def __init__(self, directory: pathlib.Path, job: dict):
+        self.path = directory / CHECKPOINT_JOURNAL_FILE
+        # Compared with the job read back from the journal, so tuples etc. must already be in their JSON form
+        job = json.loads(json.dumps(job))
+        self.job = job
+        self.committed = {}
+
+        entries = []
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # A line torn by a crash mid-write was never committed
+                        break
+
+        if entries and entries[0].get("job") == job:
+            self.committed = {e["file"]: e["rows"] for e in entries[1:]}
+        else:
+            if entries:
+                logger.warning("Checkpoint journal belongs to a different extraction. Starting from scratch.")
+            self._clear_parts(directory)
+            self._write_lines([{"job": job}], mode="w")
+
+    @staticmethod
+    def _clear_parts(directory: pathlib.Path):
+        for rt in ResultType:
+            for hive in (False, True):
+                _remove_part_directory(get_part_directory(directory, rt, hive))
+
+    def _write_lines(self, entries: list[dict], mode: str = "a"):
+        with open(self.path, mode) as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _key(self, file_path: pathlib.Path) -> str:
+        return file_path.relative_to(self.path.parent).as_posix()
+
+    def committed_rows(self, file_path: pathlib.Path) -> Union[int, None]:
+        """Returns the rows in a committed file, or None if the file still needs to be written."""
+        if file_path.exists():
+            return self.committed.get(self._key(file_path))
+        return None
+
+    def commit(self, file_path: pathlib.Path, rows: int):
+        self.committed[self._key(file_path)] = rows
+        self._write_lines([{"file": self._key(file_path), "rows": rows}])
+
+
+def _remove_part_directory(part_directory: pathlib.Path):
+    if part_directory.exists():
+        for part_file in part_directory.iterdir():
+            part_file.unlink()
+        part_directory.rmdir()
+
+
+def _write_checkpointed(journal: CheckpointJournal, file_path: pathlib.Path, write: Callable[[pathlib.Path], int]) -> int:
+    """Writes a file through a temporary file that is renamed into place and then committed to the journal.
+    Files already committed by an earlier run are skipped. Returns the rows in the file."""
+
+    rows = journal.committed_rows(file_path)
+    if rows is not None:
+        return rows
+
+    temp_path = file_path.with_name(file_path.name + ".tmp")
+    rows = write(temp_path)
+    os.replace(temp_path, file_path)
+    journal.commit(file_path, rows)
+    return rows
+
+
+# Main function for extracting family_results with checkpoints, so that a failed extraction can be resumed
+def extract_model_data_resumable(model_file: pathlib.Path, result_file: pathlib.Path, scratch_path: pathlib.Path,
+                                 directory: pathlib.Path, output_options=None, schema_version: int = 1,
+                                 cases_per_part: int = 10, partition: dict = None,
+                                 clustered: bool = False, result_filters: dict = None,
+                                 pipelined: bool = False, envelopes: bool = False,
+                                 storage_profiles: dict = None, all_reaction_nodes: bool = False) -> dict[str, int]:
+    """Extracts the model data in per-case-range part files, journalling each one as it is committed.
+
+    Re-running the same extraction after a failure or reboot skips every committed file and continues from
+    the first incomplete case range. Once all the parts of a result type are committed they are merged into
+    the usual single file, which holds the same rows as the one written by extract_model_data (byte-identical
+    when the batch size is a multiple of the rows per entity, see merge_part_files). The partition,
+    clustering, filters, pipelining, envelopes, storage profiles and reaction nodes are as for
+    extract_model_data. The beam force envelope is committed from the envelopes of the parts just before the
+    beam force parts are merged. The run report covers the files written by this run.
+    Returns the rows written per output file."""
+
+    started = datetime.now()
+    hive = partition is not None
+    if hive:
+        directory = get_partition_directory(directory, partition)
+    directory.mkdir(parents=True, exist_ok=True)
+    result_filters = result_filters or {}
+    storage_profiles = storage_profiles or {}
+    result_file_stat = result_file.stat()
+    journal = CheckpointJournal(directory, {"model_file": str(model_file), "result_file": str(result_file),
+                                            "result_file_size": result_file_stat.st_size,
+                                            "result_file_mtime": result_file_stat.st_mtime,
+                                            "schema_version": schema_version, "cases_per_part": cases_per_part,
+                                            "clustered": clustered, "envelopes": envelopes,
+                                            "all_reaction_nodes": all_reaction_nodes,
+                                            "result_filters": {rt.name: asdict(f) for rt, f in result_filters.items()},
+                                            "storage_profiles": {rt.name: p for rt, p in storage_profiles.items()}})
+
+    result_types = [rt for rt in ResultType if output_options is None or output_options[rt.label] == "TRUE"]
+    rows_written = {rt.file_name: journal.committed_rows(get_result_file(directory, rt.file_name, hive))
+                    for rt in result_types}
+    pending = [rt for rt in result_types if rows_written[rt.file_name] is None]
+
+    # Part files are left behind if the previous run stopped between merging and removing them
+    for rt in result_types:
+        if rt not in pending:
+            _remove_part_directory(get_part_directory(directory, rt, hive))
+
+    if not pending:
+        logger.info("All result types are already committed in the checkpoint journal.")
+        return rows_written
+
+    uID, primary_combo_count, secondary_combo_count = initialize_model(model_file, result_file, scratch_path)
+    telemetry = []
+    try:
+        load_case_count = ctypes.c_int(0)
+        _check_St7_error_message(St7.St7GetNumLoadCase(uID, ctypes.byref(load_case_count)))
+        model_context = ModelExtractionContext(model_file, result_file, uID, load_case_count, primary_combo_count,
+                                               secondary_combo_count, directory, hive=hive,
+                                               dimensions=read_model_dimensions(uID), scratch_path=scratch_path)
+
+        for file_name, table in get_dimension_tables(model_context).items():
+            _write_checkpointed(journal, get_result_file(directory, file_name, hive),
+                                lambda fp, table=table: _write_table(table, fp))
+
+        if schema_version >= 2:
+            _write_checkpointed(journal, get_result_file(directory, RESULT_CASES_FILE, hive),
+                                lambda fp: write_result_case_table(model_context, file_path=fp))
+
+        number_of_cases = primary_combo_count.value + secondary_combo_count.value
+        for rt in pending:
+            if not rt.case_sharded:
+                result_telemetry = ExtractionTelemetry(rt.label, rt.file_name)
+                rows_written[rt.file_name] = _write_checkpointed(
+                    journal, get_result_file(directory, rt.file_name, hive),
+                    lambda fp: parquet_insert(model_context, rt, schema_version=schema_version, file_path=fp,
+                                              clustered=clustered, result_filter=result_filters.get(rt),
+                                              telemetry=result_telemetry, pipelined=pipelined,
+                                              storage_profile=storage_profiles.get(rt),
+                                              all_nodes=all_reaction_nodes))
+                telemetry.append(result_telemetry.as_dict())
+                continue
+
+            part_directory = get_part_directory(directory, rt, hive)
+            part_directory.mkdir(parents=True, exist_ok=True)
+            part_telemetry = []
+            for result_cases in _split_into_parts(number_of_cases, cases_per_part):
+                part_context = replace(model_context, result_cases=result_cases)
+                part_file = get_part_file(directory, rt, result_cases, hive)
+                envelope_path = None
+                if envelopes and rt is ResultType.BEAM_FORCES:
+                    envelope_path = get_envelope_part_file(part_file)
+                result_telemetry = ExtractionTelemetry(rt.label, rt.file_name)
+                _write_checkpointed(
+                    journal, part_file,
+                    lambda fp: parquet_insert(part_context, rt, schema_version=schema_version, file_path=fp,
+                                              result_filter=result_filters.get(rt), telemetry=result_telemetry,
+                                              pipelined=pipelined, envelope_path=envelope_path,
+                                              storage_profile=storage_profiles.get(rt),
+                                              all_nodes=all_reaction_nodes))
+                if result_telemetry.end is not None:
+                    part_telemetry.append(result_telemetry.as_dict())
+
+            def merge(fp: pathlib.Path) -> int:
+                rows = merge_part_files(part_directory, fp, remove_parts=False, row_group_size=rt.value.batch_size)
+                if clustered:
+                    cluster_parquet_file(fp, rt.sort_columns, scratch_path=scratch_path)
+                return rows
+
+            if envelopes and rt is ResultType.BEAM_FORCES:
+                _write_checkpointed(journal, get_result_file(directory, BEAM_FORCE_ENVELOPE_FILE, hive),
+                                    lambda fp: merge_envelope_files(sorted(part_directory.glob("envelope-*.parquet")),
+                                                                    fp, get_envelope_positions(rt, result_filters.get(rt))))
+
+            rows_written[rt.file_name] = _write_checkpointed(journal, get_result_file(directory, rt.file_name, hive),
+                                                             merge)
+            _remove_part_directory(part_directory)
+            for entry in combine_telemetry(part_telemetry):
+                entry["BytesWritten"] = get_result_file(directory, rt.file_name, hive).stat().st_size
+                telemetry.append(entry)
+
+    finally:
+        close_model(uID)
+
+    write_run_report(directory / RUN_REPORT_FILE, model_file, result_file, schema_version, started, telemetry)
+
+    return rows_written
 
 
 if __name__ == '__main__':
 
+    import tkinter as tk
+    from tkinter import filedialog
+
     # Create scratch path if it doesn't exist
     scratch_folder = pathlib.Path(f"C:\\Users\\{getuser()}\\Documents\\Changi T5_Database_Scratch")
     scratch_folder.mkdir(parents=True, exist_ok=True)
@@ -1,6 +1,7 @@
 
 """Script to wrangle and organize the data from multiple sources into the end reaction schedule."""
 import duckdb
+from parquet_views import result_source
 import time
 from inputs import (perm_forces_parq_dict, splice_data,
                     als_models, als_force_parq_dict, als_prop_parq_dict, als_summary_parq_folder_dict,
@@ -32,7 +33,7 @@ def get_perm_beam_end_force_query(perm_forces_parq_files: dict):
                                ResultCase, ResultCaseName,
                                BF.Position, Fx, Fy, Fz, Mx, My, Mz
                                FROM BEAM_PROPERTIES AS BP
-                               JOIN '{perm_parq}' AS BF ON BP.BeamNumber = BF.BeamNumber
+                               JOIN {result_source(perm_parq)} AS BF ON BP.BeamNumber = BF.BeamNumber
                                JOIN SPLICE_TABLE AS SPL ON SPL.BeamNumber = BP.BeamNumber AND SPL.Position = BF.Position
                                """ for model, perm_parq in perm_forces_parq_files.items())
 
@@ -44,7 +45,7 @@ def get_initial_als_end_forces(als_force_parq: str, als_prop_parq: str, beam_num
 
     query = f"""SELECT BF.BeamNumber, ALS_PROP.BeamIDNumber, ResultCase, ResultCaseName, 
     Position, Fx, Fy, Fz, Mx, My, Mz
-    FROM '{als_force_parq}' AS BF
+    FROM {result_source(als_force_parq)} AS BF
     JOIN '{als_prop_parq}' AS ALS_PROP
     ON ALS_PROP.BeamNumber = BF.BeamNumber
     WHERE ALS_PROP.BeamIDNumber IN {beam_numbers}"""
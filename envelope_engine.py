@@ -0,0 +1,105 @@
+"""
+envelope_engine.py
+
+Module to envelope the extracted results of any number of models (e.g. the permanent and ALS removal models)
+in a single DuckDB aggregation over their Parquet files, by any grouping key and over any components.
+
+Each model is an extraction directory (holding beam_forces.parquet, beam_properties.parquet etc.) of either
+layout, read through parquet_views.result_source. The results of every model are scanned once: the maximum
+and minimum of each component are taken in the same pass and then written as a Max and a Min row per key.
+
+Example:
+    models = {"LB_Gmax": r"...\\V1_4_5_LB_Gmax_Parquet", "UB_Gmax": r"...\\V1_4_5_UB_Gmax_Parquet"}
+    write_envelope(models, "Group_Property_Envelope_Results.csv", group_by=("GroupName", "PropertyName"))
+"""
+
+import pathlib
+from typing import Union
+
+import duckdb
+
+from parquet_views import BEAM_FORCES_FILE, BEAM_PROPERTIES_FILE, get_result_path, result_source
+
+
+BEAM_FORCE_COMPONENTS = ("Fx", "Fy", "Fz", "Mx", "My", "Mz")
+
+
+def _sql_string(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _get_model_source(directory: Union[str, pathlib.Path], file_name: str, columns: list[str]) -> str:
+    """Gets the relation of one model's results, joined to its beam properties (for the group and property
+    names) when the results are keyed by beam and a column is only found in the properties."""
+
+    directory = pathlib.Path(directory)
+    source = result_source(get_result_path(directory, file_name))
+    result_columns = set(duckdb.sql(f"SELECT * FROM {source} LIMIT 0").columns)
+    if set(columns) <= result_columns or "BeamNumber" not in result_columns:
+        return f"(SELECT {', '.join(columns)} FROM {source})"
+
+    selected = [f"R.{c}" if c in result_columns else f"P.{c}" for c in columns]
+    return f"""(SELECT {', '.join(selected)}
+    FROM {source} AS R
+    JOIN {result_source(get_result_path(directory, BEAM_PROPERTIES_FILE))} AS P ON P.BeamNumber = R.BeamNumber)"""
+
+
+def get_envelope_query(models: dict, group_by: tuple = ("BeamNumber",), components: tuple = BEAM_FORCE_COMPONENTS,
+                       file_name: str = BEAM_FORCES_FILE, where: str = None, filter_columns: tuple = (),
+                       decimals: int = 2, governing: bool = False) -> str:
+    """Builds the query enveloping `components` of a result file (beam forces by default) over every model in
+    `models` (model name: extraction directory), grouped by the `group_by` columns.
+
+    The group and property names of beam results are joined from each model's beam properties, so the keys
+    can be e.g. ("GroupName", "PropertyName"). `where` filters the results before they are enveloped, e.g.
+    "GroupName LIKE '%RoofLight%'", with any columns it uses other than the keys listed in `filter_columns`.
+    The values are rounded to `decimals` places. With governing, each component also gets a column naming the
+    model its maximum or minimum came from (e.g. FxModel).
+
+    The rounding is DuckDB's round, which rounds halves away from zero on the scaled value, whereas the
+    process_result function of the SQLite scripts this replaced used Python's round, which rounds the exact
+    binary value (halves to even). The two differ in the last place for a value like 2.675, which is 2.68 here
+    and was 2.67 in the old CSVs, so the envelopes are equal to the old ones to within that place."""
+
+    if not models:
+        raise ValueError("At least one model is needed for an envelope.")
+
+    keys = list(group_by)
+    columns = list(dict.fromkeys([*keys, *filter_columns, *components]))
+    sources = "\n    UNION ALL ".join(f"SELECT {_sql_string(model)} AS Model, * FROM "
+                                    f"{_get_model_source(directory, file_name, columns)}"
+                                    for model, directory in models.items())
+
+    extremes = []
+    for c in components:
+        extremes.extend([f"max({c}) AS {c}_Max", f"min({c}) AS {c}_Min"])
+        if governing:
+            extremes.extend([f"arg_max(Model, {c}) AS {c}Model_Max", f"arg_min(Model, {c}) AS {c}Model_Min"])
+
+    def envelope_rows(bound: str) -> str:
+        values = [f"round({c}_{bound}, {decimals}) AS {c}" for c in components]
+        if governing:
+            values.extend(f"{c}Model_{bound} AS {c}Model" for c in components)
+        return f"SELECT {', '.join(keys)}, '{bound}' AS Envelope, {', '.join(values)} FROM ENVELOPE"
+
+    return f"""WITH ENVELOPE AS MATERIALIZED (
+    SELECT {', '.join(keys)}, {', '.join(extremes)}
+    FROM ({sources}) AS RESULTS
+    {f'WHERE {where}' if where else ''}
+    GROUP BY {', '.join(keys)}
+    )
+    {envelope_rows('Max')}
+    UNION ALL
+    {envelope_rows('Min')}
+    ORDER BY {', '.join(keys)}, Envelope"""
+
+
+def write_envelope(models: dict, output_fp: Union[str, pathlib.Path], conn=None, **options) -> int:
+    """Writes the envelope of get_envelope_query(models, **options) to a CSV file and returns its row count."""
+    query = get_envelope_query(models, **options)
+    connection = duckdb.connect() if conn is None else conn
+    try:
+        return connection.execute(f"COPY ({query}) TO {_sql_string(output_fp)} (FORMAT CSV, HEADER)").fetchone()[0]
+    finally:
+        if conn is None:
+            connection.close()
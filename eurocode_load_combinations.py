@@ -5,10 +5,14 @@ eurocode_load_combinations.py
 Module designed to generate the load combinations as required by EN 1990
 """
 
+import pathlib
 from itertools import product
 from enum import Enum
 from dataclasses import dataclass
 from collections import OrderedDict
+from typing import Union
+
+import numpy as np
 
 
 LOAD_CASE_DICT = {1: "1: SW_Self weight",
@@ -181,9 +185,8 @@ class CombinationCase:
         for case_name, case in zip(accompanying_case_names, accompanying_cases):
             self.accompanying_case_dict[case_name] = case
 
-    def get_combination_string(self):
-        """Creates the text load combination input string for the Strand7 analysis model."""
-        spacer = "      "
+    def get_factors(self) -> list[float]:
+        """Gets the factor applied to each load case of LOAD_CASE_DICT, in load case order."""
         factors = []
         for lc_number, lc_name in LOAD_CASE_DICT.items():
             # Handle permanent cases
@@ -205,6 +208,12 @@ class CombinationCase:
             else:
                 factors.append(0.0)
 
+        return factors
+
+    def get_combination_string(self):
+        """Creates the text load combination input string for the Strand7 analysis model."""
+        spacer = "      "
+        factors = self.get_factors()
         factor_string = spacer.join([f"{factor:.14E}" for factor in factors])
         combination_string = f"{self.name}:    {factor_string}\n"
         return combination_string
@@ -261,6 +270,26 @@ class CombinationFactory:
         return combinations
 
 
+def get_factor_matrix(combinations: list[CombinationCase]) -> np.ndarray:
+    """Gets the (combination x load case) factor matrix of the combinations, with the load cases in the
+    order of LOAD_CASE_DICT, i.e. the same factors as written to the .lcf file."""
+    return np.array([combination.get_factors() for combination in combinations], dtype=np.float64)
+
+
+def read_combination_file(combination_fp: Union[str, pathlib.Path]) -> tuple[list[str], np.ndarray]:
+    """Reads the combination names and factor matrix back from a .lcf file written by get_combination_string."""
+    names = []
+    factors = []
+    with open(combination_fp) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            name, _, factor_string = line.rpartition(":")
+            names.append(name.strip())
+            factors.append([float(factor) for factor in factor_string.split()])
+    return names, np.array(factors, dtype=np.float64)
+
+
 if __name__ == '__main__':
 
     # ----------------------------------------------------------------------
@@ -0,0 +1,447 @@
+"""
+fake_st7_backend.py
+
+In-memory stand-in for the Strand7 API over a synthetic NumPy model, so that database_extraction.py can be run,
+profiled and benchmarked on machines without Strand7 (e.g. Linux).
+
+Only the functions used by the extraction are implemented. They take the same arguments as the St7API
+functions and fill the same ctypes arrays, and the constants are those of St7API.
+
+Example:
+    import database_extraction as de
+    from fake_st7_backend import FakeSt7Backend
+
+    de.set_st7_backend(FakeSt7Backend(nodes=20_000, beams=25_000, primary_combinations=200))
+"""
+
+import time
+
+import numpy as np
+
+import St7API
+
+
+def _set_value(reference, value):
+    """Sets an output argument passed either as a ctypes value or as ctypes.byref(value)."""
+    getattr(reference, "_obj", reference).value = value
+
+
+def _set_string(buffer, text: str, max_length: int):
+    buffer.value = text.encode()[:max_length - 1]
+
+
+class FakeSt7Backend:
+    """Synthetic Strand7 model answering the St7API calls made by database_extraction.py.
+
+    The geometry, attributes and loads are generated from the seed, and the results are linear along each beam
+    and scaled by a per-case factor, so every call is cheap and repeatable. Every `restraint_interval`th node is
+    restrained, every `spring_interval`th node (none if 0) is supported by a translational stiffness instead,
+    and only those nodes have non-zero reactions.
+
+    If a (combination x primary case) factor matrix is given, the secondary result cases are those combinations
+    of the primary cases, as when Strand7 solves a linear model's combinations.
+
+    A `call_latency` (seconds) is added to every result call to stand in for the time Strand7 spends reading
+    the result file. It is slept in steps of at least a millisecond, releasing the GIL as the real API does.
+    A `case_latency` is added whenever a result call asks for a different result case to the previous one, to
+    stand in for Strand7 loading that case's results. An `open_latency` is added to opening the model, to stand in
+    for Strand7 loading the model database.
+
+    The result file can also be opened alone as a custom result file (St7OpenResFile), which holds the node
+    results and the principal beam forces at `result_file_stations` evenly spaced stations along each beam."""
+
+    def __init__(self, nodes: int = 10_000, beams: int = 10_000, plates: int = 2_000, load_cases: int = 20,
+                 primary_combinations: int = 100, secondary_combinations: int = 0, loads_per_element: int = 1,
+                 beam_properties: int = 20, plate_properties: int = 5, groups: int = 10, restraint_interval: int = 50,
+                 combination_factors: np.ndarray = None, seed: int = 0, call_latency: float = 0.0,
+                 case_latency: float = 0.0, open_latency: float = 0.0, result_file_stations: int = 5,
+                 spring_interval: int = 0):
+
+        if combination_factors is not None:
+            secondary_combinations = len(combination_factors)
+
+        rng = np.random.default_rng(seed)
+        self.totals = {St7API.tyNODE: nodes, St7API.tyBEAM: beams, St7API.tyPLATE: plates}
+        self.load_cases = load_cases
+        self.primary_combinations = primary_combinations
+        self.secondary_combinations = secondary_combinations
+        self.loads_per_element = loads_per_element
+        self.beam_result_pos_mode = St7API.bpParam
+        self.call_latency = call_latency
+        self.case_latency = case_latency
+        self.open_latency = open_latency
+        self.result_file_stations = result_file_stations
+        self.pending_latency = 0.0
+        self.loaded_case = None
+
+        # Geometry
+        self.node_xyz = rng.uniform(0.0, 100.0, (nodes, 3))
+        beam_index = np.arange(beams)
+        self.beam_nodes = np.column_stack([beam_index % nodes + 1, (beam_index + 1) % nodes + 1])
+        self.beam_lengths = np.linalg.norm(self.node_xyz[self.beam_nodes[:, 1] - 1] -
+                                           self.node_xyz[self.beam_nodes[:, 0] - 1], axis=1)
+        plate_index = np.arange(plates)
+        self.plate_nodes = np.column_stack([(plate_index + i) % nodes + 1 for i in range(4)])
+        self.plate_areas = rng.uniform(0.5, 4.0, plates)
+
+        # Attributes
+        self.properties = {St7API.tyBEAM: rng.integers(1, beam_properties + 1, beams),
+                           St7API.tyPLATE: rng.integers(1, plate_properties + 1, plates)}
+        self.property_counts = {St7API.ptBEAMPROP: beam_properties, St7API.ptPLATEPROP: plate_properties}
+        self.group_count = groups
+        self.groups = {St7API.tyBEAM: rng.integers(1, groups + 1, beams),
+                       St7API.tyPLATE: rng.integers(1, groups + 1, plates)}
+        self.groups[St7API.tyNODE] = np.arange(nodes) % groups + 1
+        self.restrained = np.zeros(nodes, dtype=bool)
+        self.restrained[::restraint_interval] = True
+        self.sprung = np.zeros(nodes, dtype=bool)
+        if spring_interval:
+            self.sprung[spring_interval - 1::spring_interval] = ~self.restrained[spring_interval - 1::spring_interval]
+
+        # Results: value(position) = (intercept + slope * position) * case factor
+        number_of_cases = primary_combinations + secondary_combinations
+        self.case_factors = rng.uniform(-2.0, 2.0, number_of_cases + 1)
+        if combination_factors is not None:
+            self.case_factors[primary_combinations + 1:] = \
+                combination_factors @ self.case_factors[1:combination_factors.shape[1] + 1]
+        self.beam_intercepts = rng.standard_normal((beams, 6)) * 100.0
+        self.beam_slopes = rng.standard_normal((beams, 6)) * 50.0
+        self.node_results = rng.standard_normal((nodes, 6))
+        # Plate stresses: value(point, surface) = (membrane + surface sign * bending) * case factor
+        self.plate_membrane = rng.standard_normal((plates, 4, 10)) * 10.0
+        self.plate_bending = rng.standard_normal((plates, 4, 10)) * 20.0
+        self._last_output = None
+        self._last_view = None
+
+    def __getattr__(self, name):
+        # Constants come from St7API, but functions the fake does not implement must not reach the DLL
+        value = getattr(St7API, name)
+        if callable(value):
+            raise NotImplementedError(f"{name} is not implemented by the fake Strand7 backend.")
+        return value
+
+    def _view(self, output) -> np.ndarray:
+        """NumPy view of a ctypes output array. The extractors reuse their result arrays, so the last view is kept."""
+        if output is not self._last_output:
+            self._last_output = output
+            self._last_view = np.ctypeslib.as_array(output)
+        return self._last_view
+
+    def _invalid_entity(self, entity_type: int, entity: int) -> bool:
+        return not 1 <= entity <= self.totals[entity_type]
+
+    def _invalid_result_case(self, case: int) -> bool:
+        return not 1 <= case <= self.primary_combinations + self.secondary_combinations
+
+    def _load_case(self, entity: int, attribute: int, i: int) -> int:
+        return (entity * 7 + attribute + i * 13) % self.load_cases + 1
+
+    # Model and result files
+    def St7Init(self):
+        return 0
+
+    def St7Release(self):
+        return 0
+
+    def St7OpenFile(self, uID, file_name, scratch_path):
+        time.sleep(self.open_latency)
+        return 0
+
+    def St7CloseFile(self, uID):
+        return 0
+
+    def St7OpenResultFile(self, uID, file_name, spectral_name, combinations, primary_count, secondary_count):
+        _set_value(primary_count, self.primary_combinations)
+        _set_value(secondary_count, self.secondary_combinations)
+        return 0
+
+    def St7CloseResultFile(self, uID):
+        return 0
+
+    def St7OpenResFile(self, uID, file_name):
+        return 0
+
+    def St7CloseResFile(self, uID):
+        return 0
+
+    def St7GetAPIErrorString(self, error_code, message, max_length):
+        _set_string(message, f"Fake Strand7 error {error_code}", max_length)
+        return 0
+
+    # Totals and names
+    def St7GetTotal(self, uID, entity_type, total):
+        _set_value(total, self.totals.get(entity_type, 0))
+        return 0
+
+    def St7GetNumLoadCase(self, uID, load_case_count):
+        _set_value(load_case_count, self.load_cases)
+        return 0
+
+    def St7GetLoadCaseName(self, uID, load_case, name, max_length):
+        if not 1 <= load_case <= self.load_cases:
+            return St7API.ERR7_InvalidLoadCase
+        _set_string(name, f"Load Case {load_case}", max_length)
+        return 0
+
+    def St7GetResultCaseName(self, uID, case, name, max_length):
+        if self._invalid_result_case(case):
+            return St7API.ERR7_InvalidResultCase
+        kind = "ULS" if case <= self.primary_combinations else "SLS"
+        _set_string(name, f"{case}: {kind} Combination {case}", max_length)
+        return 0
+
+    def St7GetPropertyName(self, uID, property_type, property_number, name, max_length):
+        prefix = "Beam" if property_type == St7API.ptBEAMPROP else "Plate"
+        _set_string(name, f"{prefix} Property {getattr(property_number, 'value', property_number)}", max_length)
+        return 0
+
+    def St7GetGroupIDName(self, uID, group_id, name, max_length):
+        _set_string(name, f"Model\\Group {getattr(group_id, 'value', group_id)}", max_length)
+        return 0
+
+    def St7GetTotalProperties(self, uID, totals, last_numbers):
+        for i, property_type in enumerate((St7API.ptBEAMPROP, St7API.ptPLATEPROP)):
+            totals[i] = last_numbers[i] = self.property_counts[property_type]
+        totals[2:St7API.kMaxEntityTotals] = last_numbers[2:St7API.kMaxEntityTotals] = [0, 0]
+        return 0
+
+    def St7GetPropertyNumByIndex(self, uID, property_type, index, property_number):
+        if not 1 <= index <= self.property_counts.get(property_type, 0):
+            return St7API.ERR7_InvalidIndex
+        _set_value(property_number, index)
+        return 0
+
+    def St7GetNumGroups(self, uID, group_count):
+        _set_value(group_count, self.group_count)
+        return 0
+
+    def St7GetGroupByIndex(self, uID, index, name, max_length, group_id):
+        if not 1 <= index <= self.group_count:
+            return St7API.ERR7_InvalidIndex
+        _set_string(name, f"Group {index}", max_length)
+        _set_value(group_id, index)
+        return 0
+
+    def St7GetNumFreedomCase(self, uID, freedom_case_count):
+        _set_value(freedom_case_count, 1)
+        return 0
+
+    def St7GetFreedomCaseName(self, uID, freedom_case, name, max_length):
+        if freedom_case != 1:
+            return St7API.ERR7_InvalidFreedomCase
+        _set_string(name, "Freedom Case 1", max_length)
+        return 0
+
+    # Geometry and attributes
+    def St7GetNodeXYZ(self, uID, node, coordinates):
+        if self._invalid_entity(St7API.tyNODE, node):
+            return St7API.ERR7_InvalidEntityNumber
+        coordinates[:3] = self.node_xyz[node - 1].tolist()
+        return 0
+
+    def St7GetElementConnection(self, uID, entity_type, entity, connections):
+        if self._invalid_entity(entity_type, entity):
+            return St7API.ERR7_InvalidEntityNumber
+        nodes = self.beam_nodes[entity - 1] if entity_type == St7API.tyBEAM else self.plate_nodes[entity - 1]
+        connections[0] = len(nodes)
+        connections[1:len(nodes) + 1] = nodes.tolist()
+        return 0
+
+    def St7GetElementData(self, uID, entity_type, entity, result_case, data):
+        if self._invalid_entity(entity_type, entity):
+            return St7API.ERR7_InvalidEntityNumber
+        data[0] = self.beam_lengths[entity - 1] if entity_type == St7API.tyBEAM else self.plate_areas[entity - 1]
+        return 0
+
+    def St7GetBeamID(self, uID, beam, id_number):
+        _set_value(id_number, beam)
+        return 0
+
+    def St7GetPlateID(self, uID, plate, id_number):
+        _set_value(id_number, plate)
+        return 0
+
+    def St7GetElementProperty(self, uID, property_type, entity, property_number):
+        entity_type = St7API.tyBEAM if property_type == St7API.ptBEAMPROP else St7API.tyPLATE
+        _set_value(property_number, int(self.properties[entity_type][entity - 1]))
+        return 0
+
+    def St7GetPlatePropertyType(self, uID, property_number, property_type, material_type):
+        _set_value(property_type, St7API.ptPlateShell)
+        _set_value(material_type, St7API.mtIsotropic)
+        return 0
+
+    def St7GetEntityGroup(self, uID, entity_type, entity, group_id):
+        _set_value(group_id, int(self.groups[entity_type][entity - 1]))
+        return 0
+
+    def St7GetBeamAxisSystemInitial(self, uID, beam, axes):
+        axes[:9] = [1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0]
+        return 0
+
+    def St7GetNodeRestraint6(self, uID, node, freedom_case, ucs_id, status, values):
+        restrained = int(self.restrained[node - 1])
+        status[:6] = [restrained] * 6
+        values[:6] = [0.0] * 6
+        return 0
+
+    def St7GetNodeKTranslation3F(self, uID, node, freedom_case, ucs_id, stiffness):
+        stiffness[:3] = [1.0e4 if self.sprung[node - 1] else 0.0] * 3
+        return 0
+
+    def St7GetNodeKRotation3F(self, uID, node, freedom_case, ucs_id, stiffness):
+        stiffness[:3] = [0.0] * 3
+        return 0
+
+    # Loading
+    def St7GetEntityAttributeSequenceCount(self, uID, entity_type, entity, attribute, count):
+        _set_value(count, self.loads_per_element)
+        return 0
+
+    def St7GetEntityAttributeSequence(self, uID, entity_type, entity, attribute, count, sequence):
+        for i in range(getattr(count, "value", count)):
+            sequence[4 * i + St7API.ipAttrLocal] = 0
+            sequence[4 * i + St7API.ipAttrAxis] = (entity + i) % 3 + 1
+            sequence[4 * i + St7API.ipAttrCase] = self._load_case(entity, attribute, i)
+            sequence[4 * i + St7API.ipAttrID] = i + 1
+        return 0
+
+    def St7GetNodeForce3(self, uID, node, load_case, forces):
+        forces[:3] = [0.0, 0.0, -float(load_case)]
+        return 0
+
+    def St7GetBeamDistributedForcePrincipal6ID(self, uID, beam, axis, load_case, id_number, load_type, values):
+        _set_value(load_type, St7API.dlConstant)
+        values[:6] = [-1.0 * load_case, -1.0 * load_case, 0.0, 0.0, 0.0, 0.0]
+        return 0
+
+    def St7GetBeamDistributedForceGlobal6ID(self, uID, beam, axis, load_case, id_number, projected, load_type, values):
+        _set_value(projected, 0)
+        _set_value(load_type, St7API.dlLinear)
+        values[:6] = [-1.0 * load_case, -2.0 * load_case, 0.0, 0.0, 0.0, 0.0]
+        return 0
+
+    def St7GetBeamNSMass10ID(self, uID, beam, load_case, id_number, mass_type, values):
+        _set_value(mass_type, St7API.dlConstant)
+        values[:10] = [0.1, 0.1, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0]
+        return 0
+
+    def St7GetBeamPointForcePrincipal4ID(self, uID, beam, load_case, id_number, values):
+        values[:4] = [0.0, 0.0, -1.0 * load_case, 0.5]
+        return 0
+
+    def St7GetBeamPointForceGlobal4ID(self, uID, beam, load_case, id_number, values):
+        values[:4] = [0.0, 0.0, -1.0 * load_case, 0.5]
+        return 0
+
+    def St7GetPlateNormalPressure2(self, uID, plate, load_case, pressures):
+        pressures[:2] = [0.0, -0.5 * load_case]
+        return 0
+
+    def St7GetPlateGlobalPressure3S(self, uID, plate, surface, load_case, projection, pressures):
+        _set_value(projection, St7API.ppProjResultant)
+        pressures[:3] = [0.0, 0.0, -0.5 * load_case]
+        return 0
+
+    def St7GetPlateShear2(self, uID, plate, load_case, shears):
+        shears[:2] = [0.1, 0.1]
+        return 0
+
+    def St7GetPlateNSMass5ID(self, uID, plate, load_case, id_number, values):
+        values[:5] = [0.05, 1.0, 0.0, 0.0, 0.0]
+        return 0
+
+    def _wait(self, case: int):
+        """Accumulates the call latency (and the case latency on a change of case) and sleeps it off once a
+        millisecond is pending."""
+        self.pending_latency += self.call_latency
+        if case != self.loaded_case:
+            self.pending_latency += self.case_latency
+            self.loaded_case = case
+        if self.pending_latency >= 1e-3:
+            time.sleep(self.pending_latency)
+            self.pending_latency = 0.0
+
+    # Results
+    def St7SetBeamResultPosMode(self, uID, mode):
+        self.beam_result_pos_mode = mode
+        return 0
+
+    def St7GetBeamResultArrayPos(self, uID, result_type, result_sub_type, beam, case, number_of_positions,
+                                 positions, number_of_columns, results):
+        if self._invalid_entity(St7API.tyBEAM, beam):
+            return St7API.ERR7_InvalidEntityNumber
+        if self._invalid_result_case(case):
+            return St7API.ERR7_InvalidResultCase
+
+        self._wait(case)
+        scale = self.case_factors[case] * (1.0 if result_type == St7API.rtBeamForce else 1e-3)
+        station_positions = np.ctypeslib.as_array(positions)[:number_of_positions]
+        values = self._view(results)[:number_of_positions * 6].reshape(number_of_positions, 6)
+        np.multiply(np.multiply.outer(station_positions, self.beam_slopes[beam - 1]) + self.beam_intercepts[beam - 1],
+                    scale, out=values)
+        _set_value(number_of_columns, 6)
+        return 0
+
+    def St7GetPlateResultArray(self, uID, result_type, result_sub_type, plate, case, sample_location, surface,
+                               layer, number_of_points, number_of_columns, results):
+        if self._invalid_entity(St7API.tyPLATE, plate):
+            return St7API.ERR7_InvalidEntityNumber
+        if self._invalid_result_case(case):
+            return St7API.ERR7_InvalidResultCase
+
+        self._wait(case)
+        points = 1 if sample_location == St7API.spCentroid else 4
+        columns = 6 if result_sub_type == St7API.stPlateLocal else 10
+        sign = {St7API.psPlateMinusZ: -1.0, St7API.psPlatePlusZ: 1.0}.get(surface, 0.0)
+        values = self._view(results)[:points * columns].reshape(points, columns)
+        np.multiply(self.plate_membrane[plate - 1, :points, :columns] +
+                    sign * self.plate_bending[plate - 1, :points, :columns], self.case_factors[case], out=values)
+        _set_value(number_of_points, points)
+        _set_value(number_of_columns, columns)
+        return 0
+
+    def St7GetNodeResult(self, uID, result_type, node, case, results):
+        if self._invalid_entity(St7API.tyNODE, node):
+            return St7API.ERR7_InvalidEntityNumber
+        if self._invalid_result_case(case):
+            return St7API.ERR7_InvalidResultCase
+
+        self._wait(case)
+        values = self._view(results)
+        if result_type == St7API.rtNodeReact and not (self.restrained[node - 1] or self.sprung[node - 1]):
+            values[:6] = 0.0
+        else:
+            np.multiply(self.node_results[node - 1], self.case_factors[case], out=values[:6])
+        return 0
+
+    def St7GetResFileNodeResult(self, uID, result_type, node, case, results):
+        if self._invalid_entity(St7API.tyNODE, node):
+            return St7API.ERR7_ResFileDoesNotHaveEntity
+        if self._invalid_result_case(case):
+            return St7API.ERR7_ResFileInvalidCase
+        return self.St7GetNodeResult(uID, result_type, node, case, results)
+
+    def St7GetResFileBeamStations(self, uID, beam, number_of_stations):
+        if self._invalid_entity(St7API.tyBEAM, beam):
+            return St7API.ERR7_ResFileDoesNotHaveEntity
+        _set_value(number_of_stations, self.result_file_stations)
+        return 0
+
+    def St7GetResFileBeamResult(self, uID, result_type, beam, case, results):
+        if self._invalid_entity(St7API.tyBEAM, beam):
+            return St7API.ERR7_ResFileDoesNotHaveEntity
+        if self._invalid_result_case(case):
+            return St7API.ERR7_ResFileInvalidCase
+        if result_type != St7API.rtBeamForce:
+            return St7API.ERR7_ResFileQuantityNotExist
+
+        # The principal beam forces, in the custom result file's column order
+        self._wait(case)
+        columns = [St7API.ipBeamSF1, St7API.ipBeamSF2, St7API.ipBeamAxialF, St7API.ipBeamBM1, St7API.ipBeamBM2,
+                   St7API.ipBeamTorque]
+        stations = np.linspace(0.0, 1.0, self.result_file_stations)
+        values = self._view(results)[:self.result_file_stations * 6].reshape(self.result_file_stations, 6)
+        np.multiply(np.multiply.outer(stations, self.beam_slopes[beam - 1, columns]) +
+                    self.beam_intercepts[beam - 1, columns], self.case_factors[case], out=values)
+        return 0
@@ -0,0 +1,321 @@
+"""
+parquet_views.py
+
+Module of DuckDB helpers for querying the Parquet files written by database_extraction.py.
+"""
+
+import json
+import pathlib
+from typing import Iterator, Union
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+SCHEMA_VERSION_KEY = b"schema_version"
+STATION_POSITIONS_KEY = b"station_positions"
+STORAGE_PROFILE_KEY = b"storage_profile"
+STATION_INTERPOLATION_KEY = b"station_interpolation"
+RESULT_CASES_FILE = "result_cases.parquet"
+PROPERTIES_FILE = "properties.parquet"
+GROUPS_FILE = "groups.parquet"
+LOAD_CASES_FILE = "load_cases.parquet"
+BEAM_FORCE_ENVELOPE_FILE = "beam_force_envelope.parquet"
+BEAM_FORCES_FILE = "beam_forces.parquet"
+BEAM_PROPERTIES_FILE = "beam_properties.parquet"
+
+# Global components of the principal axes 1, 2 and 3 (along the beam) in the beam properties
+BEAM_AXIS_COLUMNS = ("Dir1_X", "Dir1_Y", "Dir1_Z", "Dir2_X", "Dir2_Y", "Dir2_Z", "Dir3_X", "Dir3_Y", "Dir3_Z")
+
+# The principal beam force columns as vectors on the principal axes 1, 2 and 3: the shear forces SF1 (Fy) and
+# SF2 (Fz) and axial force (Fx), and the moments BM2 (My) about axis 1, BM1 (Mz) about axis 2 and torque (Mx)
+PRINCIPAL_FORCE_VECTORS = {"F": ("Fy", "Fz", "Fx"), "M": ("My", "Mz", "Mx")}
+
+# Files written with the slim (v2) layout that get a compatibility view
+COMPATIBILITY_VIEW_FILES = (BEAM_FORCES_FILE, "beam_displacements.parquet",
+                            "nodal_reactions.parquet", "nodal_displacements.parquet",
+                            BEAM_PROPERTIES_FILE, "plate_properties.parquet", "nodal_loading.parquet",
+                            "beam_distributed_loading.parquet", "beam_ns_mass_loading.parquet",
+                            "beam_point_loading.parquet", "plate_loading.parquet", "plate_ns_mass_loading.parquet")
+
+# Integer ids of the slim (v2) property and loading layouts: (dimension file, alias, name column)
+_DIMENSION_IDS = {"PropertyNumber": (PROPERTIES_FILE, "P", "PropertyName"),
+                  "GroupID": (GROUPS_FILE, "G", "GroupName"),
+                  "LoadCase": (LOAD_CASES_FILE, "LC", "LoadCaseName")}
+
+
+def _read_schema(parquet_file: Union[str, pathlib.Path]):
+    """Reads the schema of a result file, or of the first part file of an unmerged part folder."""
+    parquet_file = pathlib.Path(parquet_file)
+    if parquet_file.is_dir():
+        parquet_file = min(parquet_file.glob("part-*.parquet"))
+    return pq.read_schema(parquet_file)
+
+
+def _scan(parquet_file: Union[str, pathlib.Path]) -> str:
+    """Gets the DuckDB relation for a result file, or for all the part files of an unmerged part folder.
+
+    The part files are unioned by name, as a decimal column of one part may have fallen back to float64."""
+    if pathlib.Path(parquet_file).is_dir():
+        return f"read_parquet('{pathlib.Path(parquet_file) / 'part-*.parquet'}', union_by_name = true)"
+    return f"'{parquet_file}'"
+
+
+def _sql_string(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def get_partition_directory(root: Union[str, pathlib.Path], partition: dict) -> pathlib.Path:
+    """Gets the folder of one model in a hive-partitioned dataset, e.g. root/version=V1_4_5/model=LB_Gmax."""
+    directory = pathlib.Path(root)
+    for key, value in partition.items():
+        if not str(value) or any(c in str(value) for c in "/\\="):
+            raise ValueError(f"Partition value {value!r} for {key} cannot be used as a folder name.")
+        directory = directory / f"{key}={value}"
+    return directory
+
+
+def get_result_file(directory: Union[str, pathlib.Path], file_name: str, hive: bool = False) -> pathlib.Path:
+    """Gets the path a result type is written to, either directory/beam_forces.parquet or, in a hive-partitioned
+    dataset, directory/result=beam_forces/part-00000.parquet."""
+    directory = pathlib.Path(directory)
+    if hive:
+        return directory / f"result={pathlib.Path(file_name).stem}" / "part-00000.parquet"
+    return directory / file_name
+
+
+def hive_source(root: Union[str, pathlib.Path], file_name: str, **partition_filters) -> str:
+    """Gets the relation for one result type across a hive-partitioned dataset, with a column per partition key.
+
+    e.g. FROM {hive_source(root, "beam_forces.parquet", version="V1_4_5", model=["LB_Gmax", "UB_Gmax"])}
+
+    A filter with a single value goes into the glob, so DuckDB only lists and opens the matching folders. A
+    list of values is applied as an IN filter on the partition column, which DuckDB uses to prune files.
+    Slim (v2) files are presented with the v1 columns, as for result_source. The files are unioned by name, so
+    models written with different storage profiles (e.g. archival decimals and float64) can be read together."""
+
+    root = pathlib.Path(root)
+    result = f"result={pathlib.Path(file_name).stem}"
+    sample = next(root.glob(f"**/{result}/*.parquet"), None)
+    if sample is None:
+        raise FileNotFoundError(f"No {result} files found under {root}.")
+
+    keys = tuple(part.split("=", 1)[0] for part in sample.relative_to(root).parts[:-2])
+    unknown = set(partition_filters) - set(keys)
+    if unknown:
+        raise ValueError(f"Unknown partition keys {sorted(unknown)}. The dataset is partitioned by {list(keys)}.")
+
+    def scan(result_folder: str) -> str:
+        segments = [f"{key}={partition_filters[key]}" if isinstance(partition_filters.get(key), str) else f"{key}=*"
+                    for key in keys]
+        glob = root.joinpath(*segments, result_folder, "*.parquet")
+        conditions = [f"{key} IN ({', '.join(_sql_string(v) for v in values)})"
+                      for key, values in partition_filters.items() if not isinstance(values, str)]
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return (f"(SELECT * EXCLUDE (result) FROM read_parquet('{glob}', hive_partitioning = true, "
+                f"hive_types_autocast = false, union_by_name = true){where})")
+
+    if get_schema_version(sample) < 2:
+        return scan(result)
+
+    return _compatibility_select(_read_schema(sample), scan(result),
+                                 lambda dimension_file: scan(f"result={pathlib.Path(dimension_file).stem}"), keys)
+
+
+def get_result_path(directory: Union[str, pathlib.Path], file_name: str) -> pathlib.Path:
+    """Gets the path of an extracted result, falling back to its part folder (e.g. beam_forces_parts) when the
+    parallel extraction was run without merging the part files."""
+    directory = pathlib.Path(directory)
+    parquet_file = directory / file_name
+    part_directory = directory / f"{parquet_file.stem}_parts"
+    if not parquet_file.exists() and part_directory.is_dir():
+        return part_directory
+    return parquet_file
+
+
+def get_schema_version(parquet_file: Union[str, pathlib.Path]) -> int:
+    """Returns the result schema version recorded in the Parquet key-value metadata (1 if absent)."""
+    metadata = _read_schema(parquet_file).metadata or {}
+    return int(metadata.get(SCHEMA_VERSION_KEY, b"1"))
+
+
+def _dimension_select(schema, relation: str, dimension_relation, keys: tuple = ()) -> str:
+    """Builds the query presenting slim (v2) property or loading rows from `relation` with the original (v1)
+    columns, joining each name back from its dimension table on the id and any partition `keys`."""
+
+    columns = [f"R.{key}" for key in keys]
+    joins = []
+    for name in schema.names:
+        columns.append(f"R.{name}")
+        if name in _DIMENSION_IDS:
+            dimension_file, alias, name_column = _DIMENSION_IDS[name]
+            condition = f"{alias}.{name} = R.{name}" + "".join(f" AND {alias}.{key} = R.{key}" for key in keys)
+            if name == "PropertyNumber":
+                entity_type = "Beam" if "BeamNumber" in schema.names else "Plate"
+                condition += f" AND {alias}.EntityType = '{entity_type}'"
+            columns.append(f"{alias}.{name_column}")
+            joins.append(f"LEFT JOIN {dimension_relation(dimension_file)} AS {alias} ON {condition}")
+
+    return f"""(SELECT {', '.join(columns)}
+    FROM {relation} AS R
+    {chr(10).join(joins)})"""
+
+
+def _compatibility_select(schema, relation: str, dimension_relation, keys: tuple = ()) -> str:
+    """Builds the query presenting slim (v2) rows from `relation` with the original (v1) columns, joining the
+    ResultCaseName on the ResultCase and any partition `keys`. `dimension_relation` gets the relation of a
+    dimension table (e.g. result_cases.parquet) from its file name."""
+
+    if "ResultCase" not in schema.names:
+        return _dimension_select(schema, relation, dimension_relation, keys)
+
+    entity = "BeamNumber" if "BeamNumber" in schema.names else "NodeNumber"
+    value_columns = ", ".join(f"R.{name}" for name in schema.names if name not in (entity, "ResultCase", "Station"))
+    key_columns = "".join(f"R.{key}, " for key in keys)
+    key_joins = "".join(f" AND RC.{key} = R.{key}" for key in keys)
+
+    if "Station" in schema.names:
+        positions = json.loads(schema.metadata[STATION_POSITIONS_KEY])
+        position_list = f"CAST([{', '.join(repr(float(p)) for p in positions)}] AS DOUBLE[])"
+        label_list = f"[{', '.join(repr(f'{p:.2f}') for p in positions)}]"
+        result_id = f"concat_ws('-', R.{entity}, R.ResultCase, {label_list}[R.Station + 1])"
+        position = f"({position_list})[R.Station + 1] AS Position, "
+    else:
+        result_id = f"concat_ws('-', R.{entity}, R.ResultCase)"
+        position = ""
+
+    query = f"""(SELECT {key_columns}{result_id} AS ResultId, R.{entity}, CAST(R.ResultCase AS INTEGER) AS ResultCase,
+    RC.ResultCaseName, {position}{value_columns}
+    FROM {relation} AS R
+    JOIN {dimension_relation(RESULT_CASES_FILE)} AS RC ON RC.ResultCase = R.ResultCase{key_joins})"""
+
+    return query
+
+
+def get_compatibility_query(parquet_file: Union[str, pathlib.Path]) -> str:
+    """Gets a query presenting a slim (v2) result file with the original (v1) columns.
+
+    The ResultCaseName, and the property, group and load case names, are joined back from the dimension tables
+    written alongside the result file, and the Position and string ResultId are rebuilt from the integer
+    station index."""
+
+    parquet_file = pathlib.Path(parquet_file)
+    hive = parquet_file.parent.name.startswith("result=")
+    directory = parquet_file.parent.parent if hive else parquet_file.parent
+
+    return _compatibility_select(_read_schema(parquet_file), _scan(parquet_file),
+                                 lambda dimension_file: f"'{get_result_file(directory, dimension_file, hive)}'")
+
+
+def result_source(parquet_file: Union[str, pathlib.Path]) -> str:
+    """Gets the relation to use in a FROM clause for an extracted result file.
+
+    Original (v1) files are returned as the quoted file path, so existing queries are unchanged. Slim (v2)
+    files are returned as a compatibility subquery exposing the v1 columns. Part folders left by an unmerged
+    parallel extraction are scanned as a single dataset."""
+
+    if get_schema_version(parquet_file) < 2:
+        return _scan(parquet_file)
+    return get_compatibility_query(parquet_file)
+
+
+def create_compatibility_views(conn, directory: Union[str, pathlib.Path]):
+    """Creates a view per result file in an extraction directory (beam_forces, nodal_reactions etc.)
+    that always exposes the v1 columns, regardless of the layout the files were written with."""
+
+    directory = pathlib.Path(directory)
+    for file_name in COMPATIBILITY_VIEW_FILES:
+        parquet_file = get_result_path(directory, file_name)
+        if parquet_file.exists():
+            view_name = file_name.split(".")[0]
+            conn.execute(f"CREATE OR REPLACE VIEW {view_name} AS SELECT * FROM {result_source(parquet_file)}")
+
+
+def get_beam_axes(beam_properties: Union[str, pathlib.Path, pa.Table]) -> np.ndarray:
+    """Gets the principal axis vectors of every beam from the beam properties (a file or table), as an array
+    indexed by beam number, where axes[beam] has a row per principal axis 1, 2 and 3 in global components."""
+
+    if not isinstance(beam_properties, pa.Table):
+        beam_properties = pq.read_table(beam_properties, columns=["BeamNumber", *BEAM_AXIS_COLUMNS])
+
+    beam_numbers = beam_properties.column("BeamNumber").to_numpy()
+    axes = np.full((beam_numbers.max(initial=0) + 1, 3, 3), np.nan)
+    axes[beam_numbers] = np.column_stack([beam_properties.column(c).to_numpy() for c in BEAM_AXIS_COLUMNS]
+                                         ).reshape(-1, 3, 3)
+    return axes
+
+
+def principal_to_global(data: Union[pa.RecordBatch, pa.Table], axes: np.ndarray) -> Union[pa.RecordBatch, pa.Table]:
+    """Transforms a batch or table of principal beam forces (v1 or v2 layout) to the global axes, replacing the
+    Fx, Fy, Fz, Mx, My and Mz columns with the global components as float64, with `axes` from get_beam_axes.
+
+    e.g. for batch in pq.ParquetFile(beam_forces_file).iter_batches(): principal_to_global(batch, axes)"""
+
+    beam_axes = axes[data.column("BeamNumber").to_numpy()]
+    schema = data.schema
+    columns = list(data.columns)
+    for names in PRINCIPAL_FORCE_VECTORS.values():
+        principal = np.column_stack([data.column(name).cast(pa.float64()).to_numpy() for name in names])
+        # The global vector is the sum of each principal component times its axis
+        global_vector = np.einsum("ni,nij->nj", principal, beam_axes)
+        for j, name in enumerate(sorted(names)):
+            index = schema.get_field_index(name)
+            schema = schema.set(index, schema.field(index).with_type(pa.float64()))
+            columns[index] = pa.array(global_vector[:, j])
+    return type(data).from_arrays(columns, schema=schema)
+
+
+def iter_global_beam_forces(directory: Union[str, pathlib.Path], columns: list = None,
+                            batch_size: int = 65536) -> Iterator[pa.RecordBatch]:
+    """Reads the principal beam forces of an extraction directory as RecordBatches in the global axes, using the
+    principal axis vectors recorded in the beam properties."""
+
+    directory = pathlib.Path(directory)
+    axes = get_beam_axes(get_result_path(directory, BEAM_PROPERTIES_FILE))
+    if columns is not None:
+        columns = list(dict.fromkeys(["BeamNumber", *columns, "Fx", "Fy", "Fz", "Mx", "My", "Mz"]))
+
+    beam_forces = get_result_path(directory, BEAM_FORCES_FILE)
+    files = sorted(beam_forces.glob("part-*.parquet")) if beam_forces.is_dir() else [beam_forces]
+    for parquet_file in files:
+        for batch in pq.ParquetFile(parquet_file).iter_batches(batch_size=batch_size, columns=columns):
+            yield principal_to_global(batch, axes)
+
+
+def create_global_force_macro(conn):
+    """Creates the principal_to_global(axis1, axis2, axis3, v1, v2, v3) macro, giving one global component of a
+    vector from its principal components v1, v2 and v3 and the same global component of each principal axis.
+
+    e.g. principal_to_global(P.Dir1_X, P.Dir2_X, P.Dir3_X, F.Fy, F.Fz, F.Fx) is the global X force."""
+
+    conn.execute("CREATE OR REPLACE MACRO principal_to_global(axis1, axis2, axis3, v1, v2, v3) AS "
+                 "CAST(axis1 AS DOUBLE) * v1 + CAST(axis2 AS DOUBLE) * v2 + CAST(axis3 AS DOUBLE) * v3")
+
+
+def get_global_beam_forces_query(directory: Union[str, pathlib.Path]) -> str:
+    """Gets a query presenting the principal beam forces of an extraction directory in the global axes, with the
+    v1 columns as for result_source. Requires the principal_to_global macro (create_global_force_macro)."""
+
+    directory = pathlib.Path(directory)
+    beam_forces = result_source(get_result_path(directory, BEAM_FORCES_FILE))
+    beam_properties = _scan(get_result_path(directory, BEAM_PROPERTIES_FILE))
+
+    replacements = []
+    for names in PRINCIPAL_FORCE_VECTORS.values():
+        arguments = ", ".join(f"F.{name}" for name in names)
+        for axis, name in zip("XYZ", sorted(names)):
+            replacements.append(f"principal_to_global(P.Dir1_{axis}, P.Dir2_{axis}, P.Dir3_{axis}, {arguments}) "
+                                f"AS {name}")
+
+    return f"""(SELECT F.* REPLACE ({', '.join(replacements)})
+    FROM {beam_forces} AS F
+    JOIN {beam_properties} AS P ON P.BeamNumber = F.BeamNumber)"""
+
+
+def create_global_beam_forces_view(conn, directory: Union[str, pathlib.Path]):
+    """Creates the principal_to_global macro and a global_beam_forces view of the beam forces in an extraction
+    directory, so global forces are read from the principal extraction rather than extracted a second time."""
+
+    create_global_force_macro(conn)
+    conn.execute(f"CREATE OR REPLACE VIEW global_beam_forces AS SELECT * FROM "
+                 f"{get_global_beam_forces_query(directory)}")
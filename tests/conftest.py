@@ -0,0 +1,45 @@
+"""
+Shared fixtures for the tests, which run the extraction against the synthetic model of fake_st7_backend.
+
+The scripts are not packaged, so the repository root is put on the path as when they are run from it.
+"""
+
+import logging
+import pathlib
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+import database_extraction as de  # noqa: E402
+from database_extraction import ResultType  # noqa: E402
+
+
+def get_output_options(*result_types: ResultType) -> dict:
+    """Output options selecting only the given result types."""
+    return {rt.label: "TRUE" if rt in result_types else "FALSE" for rt in ResultType}
+
+
+@pytest.fixture
+def st7_backend():
+    """Sets a fake Strand7 backend for the test and restores the previous one afterwards."""
+    previous = de.get_st7_backend()
+    logging.disable(logging.INFO)
+
+    def set_backend(backend):
+        de.set_st7_backend(backend)
+        return backend
+
+    yield set_backend
+    de.set_st7_backend(previous)
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def model_files(tmp_path: pathlib.Path) -> tuple[pathlib.Path, pathlib.Path]:
+    """Empty model and result files, which the fake backend only needs to exist."""
+    model_file, result_file = tmp_path / "model.st7", tmp_path / "model.LSA"
+    model_file.touch()
+    result_file.touch()
+    return model_file, result_file
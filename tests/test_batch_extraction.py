@@ -0,0 +1,202 @@
+import json
+import logging
+import multiprocessing
+import os
+import pathlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import database_extraction as de
+from batch_extraction import (ExtractionJob, claim_job, complete_job, enqueue_jobs, get_job_id,
+                              get_unchanged_result_types, heartbeat, publish_staged, requeue_stale_claims, run_queue_worker)
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+from parquet_views import BEAM_FORCE_ENVELOPE_FILE
+
+from conftest import get_output_options
+
+RESULT_TYPES = (ResultType.NODAL_REACTIONS, ResultType.BEAM_FORCES)
+
+
+def _get_job(model_files, directory) -> ExtractionJob:
+    return ExtractionJob(*model_files, directory, output_options=get_output_options(*RESULT_TYPES))
+
+
+def test_unchanged_result_types_follow_the_mode(st7_backend, model_files, tmp_path):
+    st7_backend(FakeSt7Backend(nodes=20, beams=10, plates=0, primary_combinations=2))
+    job = _get_job(model_files, tmp_path)
+    de.extract_model_data(*model_files, tmp_path, tmp_path, output_options=job.output_options,
+                          write_topology=True)
+    assert get_unchanged_result_types(job) == list(RESULT_TYPES)
+    # A results-only run reads the result file alone, which the full extraction's files were not
+    assert get_unchanged_result_types(job, results_only=True) == []
+
+    de.extract_result_file_data(job.result_file, tmp_path, output_options=job.output_options)
+    assert get_unchanged_result_types(job, results_only=True) == list(RESULT_TYPES)
+    assert get_unchanged_result_types(job) == []
+
+
+def test_missing_envelope_is_changed(st7_backend, model_files, tmp_path):
+    st7_backend(FakeSt7Backend(nodes=20, beams=10, plates=0, primary_combinations=2))
+    job = _get_job(model_files, tmp_path)
+    de.extract_model_data(*model_files, tmp_path, tmp_path, output_options=job.output_options, envelopes=True)
+    assert get_unchanged_result_types(job, envelopes=True) == list(RESULT_TYPES)
+
+    (tmp_path / BEAM_FORCE_ENVELOPE_FILE).unlink()
+    assert get_unchanged_result_types(job, envelopes=True) == [ResultType.NODAL_REACTIONS]
+
+
+def _drain_queue(queue_directory, scratch_path, licence_directory) -> list[dict]:
+    """Runs a queue worker in a spawned process, with its own fake backend."""
+    logging.disable(logging.INFO)
+    de.set_st7_backend(FakeSt7Backend(nodes=20, beams=10, plates=0, primary_combinations=2))
+    return run_queue_worker(queue_directory, scratch_path, licence_directory, licences=4, stale_after=600.0)
+
+
+def _get_queued_jobs(tmp_path, count: int) -> list[ExtractionJob]:
+    jobs = []
+    for i in range(count):
+        model_file, result_file = tmp_path / "models" / f"model{i}.st7", tmp_path / "models" / f"model{i}.LSA"
+        model_file.parent.mkdir(exist_ok=True)
+        model_file.touch()
+        result_file.touch()
+        jobs.append(ExtractionJob(model_file, result_file, tmp_path / "output" / f"model{i}",
+                                  output_options=get_output_options(ResultType.NODAL_REACTIONS)))
+    return jobs
+
+
+def _age(file_path, seconds: float):
+    modified = time.time() - seconds
+    os.utime(file_path, (modified, modified))
+
+
+def test_queue_workers_claim_each_job_once(tmp_path):
+    queue = tmp_path / "queue"
+    jobs = _get_queued_jobs(tmp_path, 8)
+    assert enqueue_jobs(queue, jobs) == 8
+    # Jobs queued long ago must not look stale the moment they are claimed
+    for pending in (queue / "pending").glob("*.json"):
+        _age(pending, 3600.0)
+
+    with ProcessPoolExecutor(max_workers=4, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_drain_queue, queue, tmp_path / "scratch", tmp_path / "licences")
+                   for _ in range(4)]
+        summaries = [summary for future in futures for summary in future.result()]
+
+    assert sorted(summary["ModelFile"] for summary in summaries) == sorted(str(job.model_file) for job in jobs)
+    assert all(summary["Status"] == "COMPLETE" for summary in summaries)
+    assert not [file for folder in ("pending", "claimed", "failed") for file in (queue / folder).iterdir()]
+    for job in jobs:
+        with open(queue / "done" / f"{get_job_id(job)}.json") as f:
+            record = json.load(f)
+        assert record["Attempts"] == 1 and len(record["History"]) == 1
+        assert (job.directory / ResultType.NODAL_REACTIONS.file_name).exists()
+        assert not list(job.directory.parent.glob(f".{job.directory.name}.*"))
+
+
+def test_stale_claims_are_requeued(tmp_path):
+    queue = tmp_path / "queue"
+    enqueue_jobs(queue, _get_queued_jobs(tmp_path, 2))
+    for pending in (queue / "pending").glob("*.json"):
+        _age(pending, 3600.0)
+
+    first, _ = claim_job(queue, "worker-1", stale_after=60.0)
+    second, _ = claim_job(queue, "worker-2", stale_after=60.0)
+    assert requeue_stale_claims(queue, 60.0) == []
+
+    _age(first, 120.0)
+    assert requeue_stale_claims(queue, 60.0) == [first.name]
+    assert (queue / "pending" / first.name).exists() and second.exists()
+
+    reclaimed, _ = claim_job(queue, "worker-3", stale_after=60.0)
+    with open(reclaimed) as f:
+        record = json.load(f)
+    assert reclaimed.name == first.name
+    assert record["Attempts"] == 2
+    assert [entry["Worker"] for entry in record["History"]] == ["worker-1", "worker-3"]
+
+
+def test_failed_jobs_are_retried_up_to_max_attempts(tmp_path):
+    queue = tmp_path / "queue"
+    enqueue_jobs(queue, _get_queued_jobs(tmp_path, 1))
+    failed = {"Status": "FAILED", "Error": "RuntimeError: licence lost"}
+
+    claim, _ = claim_job(queue, "worker-1")
+    complete_job(queue, claim, "worker-1", failed, max_attempts=2)
+    assert (queue / "pending" / claim.name).exists()
+
+    claim, _ = claim_job(queue, "worker-2")
+    complete_job(queue, claim, "worker-2", failed, max_attempts=2)
+    assert claim_job(queue, "worker-3") is None
+    with open(queue / "failed" / claim.name) as f:
+        record = json.load(f)
+    assert record["Attempts"] == 2
+    assert [entry["Summary"]["Status"] for entry in record["History"]] == ["FAILED", "FAILED"]
+
+
+
+def test_retried_job_claimed_as_it_is_requeued_runs_once(tmp_path, monkeypatch):
+    queue = tmp_path / "queue"
+    enqueue_jobs(queue, _get_queued_jobs(tmp_path, 1))
+    claim, _ = claim_job(queue, "worker-1")
+
+    # Another worker claims the job the moment it is back in pending
+    rename = os.rename
+
+    def rename_and_claim(source, destination):
+        rename(source, destination)
+        if pathlib.Path(destination).parent.name == "pending":
+            assert claim_job(queue, "worker-2") is not None
+
+    monkeypatch.setattr(os, "rename", rename_and_claim)
+    complete_job(queue, claim, "worker-1", {"Status": "FAILED", "Error": "RuntimeError: licence lost"})
+    monkeypatch.undo()
+
+    assert not list((queue / "pending").iterdir())
+    with open(claim) as f:
+        record = json.load(f)
+    assert [entry["Worker"] for entry in record["History"]] == ["worker-1", "worker-2"]
+    assert record["History"][0]["Summary"]["Status"] == "FAILED"
+
+
+def test_stale_worker_leaves_the_new_claim_alone(tmp_path):
+    queue = tmp_path / "queue"
+    enqueue_jobs(queue, _get_queued_jobs(tmp_path, 1))
+    claim, _ = claim_job(queue, "worker-1")
+    _age(claim, 120.0)
+    assert requeue_stale_claims(queue, 60.0) == [claim.name]
+    assert claim_job(queue, "worker-2", stale_after=60.0)[0] == claim
+
+    # The stale worker neither heartbeats nor completes the other worker's claim of the same job
+    _age(claim, 30.0)
+    modified = claim.stat().st_mtime
+    with heartbeat(claim, "worker-1", interval=0.01):
+        time.sleep(0.1)
+    assert claim.stat().st_mtime == modified
+    complete_job(queue, claim, "worker-1", {"Status": "COMPLETE"})
+    assert claim.exists() and not list((queue / "done").iterdir())
+
+    with heartbeat(claim, "worker-2", interval=0.01):
+        time.sleep(0.1)
+    assert claim.stat().st_mtime > modified
+    complete_job(queue, claim, "worker-2", {"Status": "COMPLETE"})
+    with open(queue / "done" / claim.name) as f:
+        record = json.load(f)
+    assert [("Finished" in entry, entry["Worker"]) for entry in record["History"]] == [(False, "worker-1"),
+                                                                                       (True, "worker-2")]
+
+
+def test_publish_staged_replaces_the_outputs(tmp_path):
+    staging, directory = tmp_path / ".output.staging", tmp_path / "output"
+    (directory / "result=beam_forces").mkdir(parents=True)
+    (directory / "result=beam_forces" / "data.parquet").write_text("old")
+    (directory / "kept.txt").write_text("kept")
+    (staging / "result=beam_forces").mkdir(parents=True)
+    (staging / "result=beam_forces" / "data.parquet").write_text("new")
+    (staging / "extraction_report.json").write_text("{}")
+
+    publish_staged(staging, directory)
+    assert (directory / "result=beam_forces" / "data.parquet").read_text() == "new"
+    assert (directory / "extraction_report.json").read_text() == "{}"
+    assert (directory / "kept.txt").read_text() == "kept"
+    assert not staging.exists()
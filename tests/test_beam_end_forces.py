@@ -0,0 +1,76 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import database_extraction as de
+import St7API
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+
+from conftest import get_output_options
+
+TENSION = 100.0
+FORCE_COLUMNS = ["Fx", "Fy", "Fz", "Mx", "My", "Mz"]
+
+
+class _TensionChainBackend(FakeSt7Backend):
+    """A straight chain of beams along a sloping line, N2 of each beam being N1 of the next, under a uniform axial
+    tension that is the same at every station of every beam. The global beam forces are the tension along the
+    line from N1 to N2, as Strand7 reports them (see _BEAM_END_SIGNS)."""
+
+    def __init__(self, beams: int, **options):
+        super().__init__(nodes=beams + 1, beams=beams, plates=0, **options)
+        self.direction = np.array([3.0, 4.0, 12.0]) / 13.0
+        self.node_xyz = np.arange(beams + 1)[:, None] * 2.0 * self.direction
+        self.beam_lengths = np.full(beams, 2.0)
+
+    def St7GetBeamResultArrayPos(self, uID, result_type, result_sub_type, beam, case, number_of_positions,
+                                 positions, number_of_columns, results):
+        error = super().St7GetBeamResultArrayPos(uID, result_type, result_sub_type, beam, case, number_of_positions,
+                                                 positions, number_of_columns, results)
+        if error or result_type != St7API.rtBeamForce or result_sub_type != St7API.stBeamGlobal:
+            return error
+
+        values = self._view(results)[:number_of_positions * 6].reshape(number_of_positions, 6)
+        values[:] = 0.0
+        forces = [St7API.ipBeamFX, St7API.ipBeamFY, St7API.ipBeamFZ]
+        values[:, forces] = TENSION * self.case_factors[case] * self.direction
+        return 0
+
+
+def _extract_end_forces(st7_backend, model_files, directory, beams: int = 6):
+    backend = st7_backend(_TensionChainBackend(beams, primary_combinations=3))
+    de.extract_model_data(*model_files, directory, directory,
+                          output_options=get_output_options(ResultType.BEAM_END_FORCES))
+    return backend, pq.read_table(directory / ResultType.BEAM_END_FORCES.file_name)
+
+
+def test_axial_tension_gives_equal_and_opposite_end_forces(st7_backend, model_files, tmp_path):
+    backend, table = _extract_end_forces(st7_backend, model_files, tmp_path)
+    table = table.sort_by([("BeamNumber", "ascending"), ("ResultCase", "ascending"), ("BeamEnd", "ascending")])
+    forces = np.column_stack([table[name].to_numpy() for name in FORCE_COLUMNS]).reshape(-1, 2, 6)
+    cases = table["ResultCase"].to_numpy().reshape(-1, 2)[:, 0]
+
+    # The N2 end keeps the tension along N1 to N2 and the N1 end is negated
+    expected = TENSION * backend.case_factors[cases][:, None] * backend.direction
+    np.testing.assert_allclose(forces[:, 1, :3], expected, rtol=1e-12)
+    np.testing.assert_allclose(forces[:, 0, :3], -expected, rtol=1e-12)
+    np.testing.assert_allclose(forces[:, :, 3:], 0.0, atol=1e-12)
+
+    nodes = table["NodeNumber"].to_numpy().reshape(-1, 2)
+    np.testing.assert_array_equal(nodes, backend.beam_nodes[table["BeamNumber"].to_numpy().reshape(-1, 2)[:, 0] - 1])
+
+
+def test_end_forces_sum_to_zero_at_a_free_node(st7_backend, model_files, tmp_path):
+    beams = 6
+    backend, table = _extract_end_forces(st7_backend, model_files, tmp_path, beams)
+
+    # Every node but the two at the ends of the chain joins the N2 end of one beam to the N1 end of the next
+    free_nodes = table.filter(pc.is_in(table["NodeNumber"], value_set=pa.array(range(2, beams + 1), pa.int32())))
+    assert free_nodes.num_rows == 2 * (beams - 1) * backend.primary_combinations
+    sums = free_nodes.group_by(["NodeNumber", "ResultCase"]).aggregate([(name, "sum") for name in FORCE_COLUMNS])
+    assert sums.num_rows == (beams - 1) * backend.primary_combinations
+    for name in FORCE_COLUMNS:
+        np.testing.assert_allclose(sums[f"{name}_sum"].to_numpy(), 0.0, atol=1e-9, err_msg=name)
+    assert np.abs(free_nodes["Fz"].to_numpy()).min() > 1.0
@@ -0,0 +1,52 @@
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+import database_extraction as de
+from database_extraction import BeamForceEnvelope, ExtractionFilter, ResultType
+from fake_st7_backend import FakeSt7Backend
+from parquet_views import BEAM_FORCE_ENVELOPE_FILE
+
+from conftest import get_output_options
+
+POSITIONS = (1.0, 0.5, 0.0)
+
+
+def _get_envelope(seed: int = 0) -> BeamForceEnvelope:
+    rng = np.random.default_rng(seed)
+    rows = 4 * len(POSITIONS) * 3
+    envelope = BeamForceEnvelope(POSITIONS)
+    filled = {"BeamNumber": np.repeat(np.arange(1, 5), len(POSITIONS) * 3),
+              "Station": np.tile(np.arange(len(POSITIONS)), 4 * 3),
+              "ResultCase": np.tile(np.repeat(np.arange(1, 4), len(POSITIONS)), 4)}
+    filled.update({c: rng.standard_normal(rows) for c in BeamForceEnvelope.components})
+    envelope.update(filled)
+    return envelope
+
+
+def test_round_trip_with_unsorted_positions():
+    envelope = _get_envelope()
+    table = envelope.to_table()
+    station_rows = table.filter(table["Position"].is_valid())
+    assert station_rows["Position"].to_pylist()[:3 * 6:6] == list(POSITIONS)
+
+    read_back = BeamForceEnvelope.from_table(table, POSITIONS)
+    for name in ("maxima", "minima", "max_cases", "min_cases"):
+        np.testing.assert_array_equal(getattr(read_back, name), getattr(envelope, name))
+    assert read_back.to_table().equals(table)
+
+
+def test_unknown_positions_are_refused():
+    with pytest.raises(ValueError, match="not among its stations"):
+        BeamForceEnvelope.from_table(_get_envelope().to_table(), (0.0, 1.0, 0.25))
+
+
+def test_parallel_envelope_with_unsorted_positions(st7_backend, model_files, tmp_path):
+    st7_backend(FakeSt7Backend(nodes=30, beams=20, plates=0, primary_combinations=6))
+    options = {"output_options": get_output_options(ResultType.BEAM_FORCES), "envelopes": True,
+               "result_filters": {ResultType.BEAM_FORCES: ExtractionFilter(positions=POSITIONS)}}
+    de.extract_model_data(*model_files, tmp_path / "scratch", tmp_path / "serial", **options)
+    de.extract_model_data_parallel(*model_files, tmp_path / "scratch", tmp_path / "parallel", workers=3, **options)
+
+    serial = pq.read_table(tmp_path / "serial" / BEAM_FORCE_ENVELOPE_FILE)
+    assert pq.read_table(tmp_path / "parallel" / BEAM_FORCE_ENVELOPE_FILE).equals(serial)
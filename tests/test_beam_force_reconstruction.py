@@ -0,0 +1,114 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from beam_force_reconstruction import (BEAM_DISTRIBUTED_LOADING_FILE, BEAM_POINT_LOADING_FILE,
+                                       get_load_case_factors, reconstruct_beam_forces)
+from parquet_views import BEAM_AXIS_COLUMNS, BEAM_FORCES_FILE, BEAM_PROPERTIES_FILE
+
+LENGTH = 10.0
+FORCE_COLUMNS = ["Fx", "Fy", "Fz", "Mx", "My", "Mz"]
+
+
+def _write_beam(directory, end_forces: dict, distributed: list = (), points: list = ()):
+    """Writes a simply supported beam 1 of LENGTH along global X, with the principal forces at its two end
+    stations for each result case ({case: (forces at end 1, forces at end 2)}, as dicts of the columns), and its
+    distributed loads (load case, principal axis, load type, PA, PB) and point loads (load case, position,
+    principal components)."""
+    properties = {"BeamNumber": pa.array([1], pa.int32()), "Length": [LENGTH]}
+    for name, value in zip(BEAM_AXIS_COLUMNS, np.eye(3)[[1, 2, 0]].ravel()):
+        properties[name] = [float(value)]
+    pq.write_table(pa.table(properties), directory / BEAM_PROPERTIES_FILE)
+
+    rows = [(case, position, forces) for case, ends in end_forces.items() for position, forces in zip((0.0, 1.0), ends)]
+    columns = {"ResultId": [f"1-{case}-{position:.2f}" for case, position, _ in rows],
+               "BeamNumber": pa.array([1] * len(rows), pa.int32()),
+               "ResultCase": pa.array([case for case, _, _ in rows], pa.int32()),
+               "ResultCaseName": [f"{case}: ULS Combination {case}" for case, _, _ in rows],
+               "Position": [position for _, position, _ in rows]}
+    for name in FORCE_COLUMNS:
+        columns[name] = [float(forces.get(name, 0.0)) for _, _, forces in rows]
+    pq.write_table(pa.table(columns), directory / BEAM_FORCES_FILE)
+
+    pq.write_table(pa.table({"LoadAxesType": ["DistPrincipal"] * len(distributed),
+                             "BeamNumber": pa.array([1] * len(distributed), pa.int32()),
+                             "LoadCase": pa.array([load[0] for load in distributed], pa.int32()),
+                             "Axis": pa.array([load[1] for load in distributed], pa.int32()),
+                             "LoadType": [load[2] for load in distributed],
+                             "Projected": pa.array([False] * len(distributed), pa.bool_()),
+                             "PA": pa.array([load[3] for load in distributed], pa.float64()),
+                             "PB": pa.array([load[4] for load in distributed], pa.float64()),
+                             **{name: pa.array([0.0] * len(distributed)) for name in ("P1", "P2", "a", "b")}}),
+                   directory / BEAM_DISTRIBUTED_LOADING_FILE)
+
+    pq.write_table(pa.table({"LoadAxesType": ["Principal"] * len(points),
+                             "BeamNumber": pa.array([1] * len(points), pa.int32()),
+                             "LoadCase": pa.array([load[0] for load in points], pa.int32()),
+                             "Position": pa.array([load[1] for load in points], pa.float64()),
+                             **{name: pa.array([load[2][i] for load in points], pa.float64())
+                                for i, name in enumerate(("PointLoadX", "PointLoadY", "PointLoadZ"))}}),
+                   directory / BEAM_POINT_LOADING_FILE)
+
+
+def _reconstruct(directory, positions, **options) -> dict:
+    table = reconstruct_beam_forces(directory, [(1, p) for p in positions], **options)
+    return {name: table[name].to_numpy().reshape(len(positions), -1) for name in FORCE_COLUMNS}
+
+
+def test_uniform_load(tmp_path):
+    # q = 1 on axis 1: the reactions are qL/2 and the moment about axis 2 sags to -qL^2/8 at midspan
+    _write_beam(tmp_path, {1: ({"Fy": 5.0}, {"Fy": -5.0})}, distributed=[(1, 1, "Constant", 1.0, 1.0)])
+    positions = [0.0, 0.25, 0.5, 0.75, 1.0]
+    forces = _reconstruct(tmp_path, positions)
+
+    x = np.array(positions) * LENGTH
+    np.testing.assert_allclose(forces["Fy"][:, 0], 5.0 - x)
+    np.testing.assert_allclose(forces["Mz"][:, 0], -x * (LENGTH - x) / 2)
+    np.testing.assert_allclose(forces["Mz"][2, 0], -12.5)
+    for name in ("Fx", "Fz", "Mx", "My"):
+        np.testing.assert_allclose(forces[name], 0.0, atol=1e-12)
+
+
+def test_uniform_load_on_axis_2_bends_about_axis_1(tmp_path):
+    # The same load on axis 2 gives the moment about axis 1 (BM2) the opposite sign
+    _write_beam(tmp_path, {1: ({"Fz": 5.0}, {"Fz": -5.0})}, distributed=[(1, 2, "Constant", 1.0, 1.0)])
+    forces = _reconstruct(tmp_path, [0.5])
+    np.testing.assert_allclose(forces["Fz"], 0.0, atol=1e-12)
+    np.testing.assert_allclose(forces["My"], 12.5)
+    np.testing.assert_allclose(forces["Mz"], 0.0, atol=1e-12)
+
+
+def test_linear_load_statics(tmp_path):
+    # q(s) = 1 + 0.2 s on axis 1 (20 in total), with the end reactions R1 = 25/3 and R2 = 35/3
+    r1 = (LENGTH ** 2 / 2 + 0.2 * LENGTH ** 3 / 6) / LENGTH
+    _write_beam(tmp_path, {1: ({"Fy": r1}, {"Fy": r1 - 20.0})}, distributed=[(1, 1, "Linear", 1.0, 3.0)])
+    positions = np.linspace(0.0, 1.0, 11)
+    forces = _reconstruct(tmp_path, positions)
+
+    x = positions * LENGTH
+    np.testing.assert_allclose(forces["Fy"][:, 0], r1 - (x + 0.1 * x ** 2))
+    np.testing.assert_allclose(forces["Mz"][:, 0], -(r1 * x - (x ** 2 / 2 + 0.2 * x ** 3 / 6)), atol=1e-12)
+
+
+def test_point_load(tmp_path):
+    # P = 10 on axis 2 at 3 from end 1: the reactions are 7 and 3, and the moment about axis 1 peaks at 21
+    _write_beam(tmp_path, {1: ({"Fz": 7.0}, {"Fz": -3.0})}, points=[(1, 3.0, (0.0, 10.0, 0.0))])
+    positions = [0.0, 0.2, 0.3, 0.5, 1.0]
+    forces = _reconstruct(tmp_path, positions)
+
+    # A load at a position is taken to act just past it
+    np.testing.assert_allclose(forces["Fz"][:, 0], [7.0, 7.0, 7.0, -3.0, -3.0])
+    np.testing.assert_allclose(forces["My"][:, 0], [0.0, 14.0, 21.0, 15.0, 0.0], atol=1e-12)
+
+
+def test_combinations_need_load_case_factors(tmp_path):
+    # Result case 2 is 1.5 x load case 1
+    _write_beam(tmp_path, {1: ({"Fy": 5.0}, {"Fy": -5.0}), 2: ({"Fy": 7.5}, {"Fy": -7.5})},
+                distributed=[(1, 1, "Constant", 1.0, 1.0)])
+    with pytest.raises(ValueError, match="Result case 2 is not a load case"):
+        _reconstruct(tmp_path, [0.5])
+
+    forces = _reconstruct(tmp_path, [0.5], load_case_factors=get_load_case_factors(1, [[1.5]]))
+    np.testing.assert_allclose(forces["Mz"], [[-12.5, -18.75]])
+    np.testing.assert_allclose(forces["Fy"], 0.0, atol=1e-12)
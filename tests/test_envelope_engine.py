@@ -0,0 +1,57 @@
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import database_extraction as de
+from database_extraction import ResultType
+from envelope_engine import get_envelope_query, write_envelope
+from fake_st7_backend import FakeSt7Backend
+from parquet_views import BEAM_FORCES_FILE
+
+from conftest import get_output_options
+
+
+@pytest.fixture
+def extractions(st7_backend, model_files, tmp_path) -> dict:
+    """The beam forces and properties of two models, each extracted in the v1 and v2 layouts."""
+    directories = {}
+    for seed, model in enumerate(("LB_Gmax", "UB_Gmax")):
+        st7_backend(FakeSt7Backend(nodes=30, beams=20, plates=0, primary_combinations=3, seed=seed))
+        for schema_version in (1, 2):
+            directory = tmp_path / f"v{schema_version}" / model
+            de.extract_model_data(*model_files, directory, directory, schema_version=schema_version,
+                                  output_options=get_output_options(ResultType.BEAM_FORCES,
+                                                                    ResultType.BEAM_PROPERTIES))
+            directories.setdefault(schema_version, {})[model] = directory
+    return directories
+
+
+@pytest.mark.parametrize("group_by", [("BeamNumber",), ("GroupName", "PropertyName")])
+def test_v1_and_v2_envelopes_match(extractions, group_by):
+    envelopes = {schema_version: duckdb.sql(get_envelope_query(models, group_by=group_by, governing=True)).fetchall()
+                 for schema_version, models in extractions.items()}
+    assert len(envelopes[1]) == 2 * len({row[:len(group_by)] for row in envelopes[1]}) > 0
+    assert envelopes[1] == envelopes[2]
+
+
+def test_envelope_takes_the_extremes_of_every_model(extractions, tmp_path):
+    models = extractions[2]
+    output_fp = tmp_path / "envelope.csv"
+    rows = write_envelope(models, output_fp, group_by=("BeamNumber",), components=("Mz",), decimals=6)
+
+    forces = pa.concat_tables(pq.read_table(directory / BEAM_FORCES_FILE, columns=["BeamNumber", "Mz"])
+                              for directory in models.values())
+    envelope = duckdb.read_csv(str(output_fp)).fetchall()
+    assert rows == len(envelope) == 2 * len(set(forces["BeamNumber"].to_pylist()))
+    for beam, bound, value in envelope:
+        moments = [m for b, m in zip(forces["BeamNumber"].to_pylist(), forces["Mz"].to_pylist()) if b == beam]
+        assert value == pytest.approx(round(max(moments) if bound == "Max" else min(moments), 6), abs=1e-6)
+
+
+def test_halves_are_rounded_away_from_zero(tmp_path):
+    # Unlike the Python round of the old scripts, which gives 2.67 and -2.67 for the binary value of 2.675
+    pq.write_table(pa.table({"BeamNumber": pa.array([1, 1], pa.int32()), "Fx": [2.675, -2.675]}),
+                   tmp_path / BEAM_FORCES_FILE)
+    query = get_envelope_query({"Model": tmp_path}, components=("Fx",))
+    assert duckdb.sql(query).fetchall() == [(1, "Max", 2.68), (1, "Min", -2.68)]
@@ -0,0 +1,31 @@
+import database_extraction as de
+from database_extraction import ExtractionFilter, ResultType
+from fake_st7_backend import FakeSt7Backend
+
+from conftest import get_output_options
+
+RESULT_TYPES = (ResultType.NODAL_REACTIONS, ResultType.NODAL_DISPLACEMENTS, ResultType.BEAM_FORCES)
+RESULT_FILTERS = {rt: ExtractionFilter(groups=("Model\\Group 2", "Model\\Group 5")) for rt in RESULT_TYPES}
+
+
+class _CountingBackend(FakeSt7Backend):
+    """Counts the load case name lookups, which are only made when the model dimensions are read."""
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.load_case_name_calls = 0
+
+    def St7GetLoadCaseName(self, uID, load_case, name, max_length):
+        self.load_case_name_calls += 1
+        return super().St7GetLoadCaseName(uID, load_case, name, max_length)
+
+
+def test_dry_run_reads_the_dimensions_once(st7_backend, model_files, tmp_path):
+    backend = st7_backend(_CountingBackend(nodes=60, beams=30, plates=0, primary_combinations=3))
+    estimates = de.estimate_model_data(*model_files, tmp_path, output_options=get_output_options(*RESULT_TYPES),
+                                       result_filters=RESULT_FILTERS)
+    assert backend.load_case_name_calls == backend.load_cases
+
+    rows = de.extract_model_data(*model_files, tmp_path, tmp_path / "output",
+                                 output_options=get_output_options(*RESULT_TYPES), result_filters=RESULT_FILTERS)
+    assert {name: estimate["ExpectedRows"] for name, estimate in estimates.items()} == rows
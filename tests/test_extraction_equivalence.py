@@ -0,0 +1,125 @@
+import duckdb
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+import database_extraction as de
+from database_extraction import BeamForceEnvelope, ResultType
+from fake_st7_backend import FakeSt7Backend
+from parquet_views import BEAM_FORCE_ENVELOPE_FILE, BEAM_FORCES_FILE
+
+from conftest import get_output_options
+
+RESULT_TYPES = (ResultType.NODAL_REACTIONS, ResultType.NODAL_DISPLACEMENTS, ResultType.BEAM_FORCES,
+                ResultType.BEAM_END_FORCES, ResultType.BEAM_DISPLACEMENTS, ResultType.PLATE_LOCAL_STRESSES,
+                ResultType.BEAM_PROPERTIES)
+FUSED_TYPES = [rt for rt in RESULT_TYPES if rt.result_stream is not None]
+INTERRUPTED_CASE = 4
+
+
+def _get_backend(**options) -> FakeSt7Backend:
+    return FakeSt7Backend(nodes=40, beams=30, plates=12, primary_combinations=6, restraint_interval=5, **options)
+
+
+class _InterruptedBackend(FakeSt7Backend):
+    """Fails the first time the beam results of a case are read, as a run killed part way through would."""
+
+    def St7GetBeamResultArrayPos(self, uID, result_type, result_sub_type, beam, case, *args):
+        if case == INTERRUPTED_CASE:
+            raise RuntimeError("The extraction was interrupted.")
+        return super().St7GetBeamResultArrayPos(uID, result_type, result_sub_type, beam, case, *args)
+
+
+def _assert_same_rows(directory, reference_directory, result_types=RESULT_TYPES):
+    """Asserts that every result file holds the same rows as the reference, in whatever order they were written."""
+    for rt in result_types:
+        reference_table = pq.read_table(reference_directory / rt.file_name)
+        table = pq.read_table(directory / rt.file_name)
+        assert table.schema == reference_table.schema
+        assert table.num_rows == reference_table.num_rows > 0
+
+        keys = [(name, "ascending") for name in reference_table.column_names]
+        reference_table = reference_table.sort_by(keys)
+        table = table.sort_by(keys)
+        for name in reference_table.column_names:
+            reference_column = reference_table[name].to_numpy()
+            column = table[name].to_numpy()
+            if np.issubdtype(reference_column.dtype, np.floating):
+                np.testing.assert_allclose(column, reference_column, rtol=1e-12, atol=1e-9)
+            else:
+                np.testing.assert_array_equal(column, reference_column)
+
+
+@pytest.fixture(params=[1, 2], ids=["v1", "v2"])
+def reference(request, st7_backend, model_files, tmp_path):
+    """The unfused, serial and unpipelined extraction the faster paths must reproduce."""
+    st7_backend(_get_backend())
+    options = {"output_options": get_output_options(*RESULT_TYPES), "schema_version": request.param}
+    directory = tmp_path / "reference"
+    rows_written = de.extract_model_data(*model_files, tmp_path / "scratch", directory, **options)
+    return directory, rows_written, options
+
+
+def test_fused_files_match_the_unfused_row_for_row(reference, model_files, tmp_path):
+    reference_directory, reference_rows, options = reference
+    rows_written = de.extract_model_data(*model_files, tmp_path / "scratch", tmp_path / "fused", fused=FUSED_TYPES,
+                                         **options)
+    assert rows_written == reference_rows
+    _assert_same_rows(tmp_path / "fused", reference_directory)
+
+
+def test_pipelined_files_match_the_unpipelined_row_for_row(reference, model_files, tmp_path):
+    reference_directory, reference_rows, options = reference
+    rows_written = de.extract_model_data(*model_files, tmp_path / "scratch", tmp_path / "pipelined", pipelined=True,
+                                         **options)
+    assert rows_written == reference_rows
+    _assert_same_rows(tmp_path / "pipelined", reference_directory)
+
+
+def test_parallel_files_match_the_serial_row_for_row(reference, model_files, tmp_path):
+    # The shard processes are forked, so they inherit the fake backend
+    reference_directory, reference_rows, options = reference
+    rows_written = de.extract_model_data_parallel(*model_files, tmp_path / "scratch", tmp_path / "parallel",
+                                                  workers=3, **options)
+    assert rows_written == reference_rows
+    _assert_same_rows(tmp_path / "parallel", reference_directory)
+
+
+def test_resumed_files_match_the_uninterrupted_row_for_row(reference, st7_backend, model_files, tmp_path):
+    reference_directory, reference_rows, options = reference
+    directory = tmp_path / "resumable"
+    st7_backend(_InterruptedBackend(nodes=40, beams=30, plates=12, primary_combinations=6, restraint_interval=5))
+    with pytest.raises(RuntimeError, match="interrupted"):
+        de.extract_model_data_resumable(*model_files, tmp_path / "scratch", directory, cases_per_part=2, **options)
+    assert any(directory.glob("**/*.parquet"))
+
+    st7_backend(_get_backend())
+    rows_written = de.extract_model_data_resumable(*model_files, tmp_path / "scratch", directory, cases_per_part=2,
+                                                   **options)
+    assert rows_written == reference_rows
+    _assert_same_rows(directory, reference_directory)
+
+
+def test_envelope_matches_the_extremes_of_the_beam_forces(st7_backend, model_files, tmp_path):
+    st7_backend(_get_backend())
+    de.extract_model_data(*model_files, tmp_path / "scratch", tmp_path, envelopes=True,
+                          output_options=get_output_options(ResultType.BEAM_FORCES))
+
+    # Ties go to the lowest case number, as in BeamForceEnvelope
+    unpivoted = f"""
+        UNPIVOT (SELECT BeamNumber, Position, ResultCase, {', '.join(BeamForceEnvelope.components)}
+                 FROM read_parquet('{(tmp_path / BEAM_FORCES_FILE).as_posix()}'))
+        ON {', '.join(BeamForceEnvelope.components)} INTO NAME Component VALUE Value"""
+    expected = duckdb.sql(f"""
+        SELECT BeamNumber, Position, Component, max(Value), arg_max(ResultCase, [Value, -ResultCase]),
+               min(Value), arg_min(ResultCase, [Value, ResultCase])
+        FROM ({unpivoted})
+        GROUP BY GROUPING SETS ((BeamNumber, Position, Component), (BeamNumber, Component))
+        ORDER BY ALL""").fetchall()
+    envelope = duckdb.sql(f"""
+        SELECT BeamNumber, Position, Component, Max, MaxCase, Min, MinCase
+        FROM read_parquet('{(tmp_path / BEAM_FORCE_ENVELOPE_FILE).as_posix()}')
+        ORDER BY ALL""").fetchall()
+    assert len(envelope) == len(expected) > 0
+    for row, expected_row in zip(envelope, expected):
+        assert row == pytest.approx(expected_row, rel=1e-12, abs=1e-9)
@@ -0,0 +1,75 @@
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from parquet_views import (BEAM_AXIS_COLUMNS, BEAM_FORCES_FILE, BEAM_PROPERTIES_FILE, create_global_beam_forces_view,
+                           get_beam_axes, iter_global_beam_forces, principal_to_global)
+
+COS, SIN = np.cos(np.radians(30.0)), np.sin(np.radians(30.0))
+
+# Principal axes 1, 2 and 3 (along the beam) of two rotated beams: beam 1 along global Y with axis 1 up and
+# axis 2 along global X, and beam 2 along global X rolled 30 degrees about its axis
+BEAM_AXES = {1: ((0.0, 0.0, 1.0), (1.0, 0.0, 0.0), (0.0, 1.0, 0.0)),
+             2: ((0.0, COS, SIN), (0.0, -SIN, COS), (1.0, 0.0, 0.0))}
+
+# Principal forces: axial Fx along axis 3, shears SF1 (Fy) along axis 1 and SF2 (Fz) along axis 2, torque Mx
+# about axis 3, BM2 (My) about axis 1 and BM1 (Mz) about axis 2
+PRINCIPAL = {1: {"Fx": 30.0, "Fy": 10.0, "Fz": 20.0, "Mx": 3.0, "My": 1.0, "Mz": 2.0},
+             2: {"Fx": 5.0, "Fy": 10.0, "Fz": 0.0, "Mx": 0.0, "My": 4.0, "Mz": -6.0}}
+
+# The same forces worked out by hand in the global axes
+GLOBAL = {1: {"Fx": 20.0, "Fy": 30.0, "Fz": 10.0, "Mx": 2.0, "My": 3.0, "Mz": 1.0},
+          2: {"Fx": 5.0, "Fy": 10.0 * COS, "Fz": 10.0 * SIN,
+              "Mx": 0.0, "My": 4.0 * COS + 6.0 * SIN, "Mz": 4.0 * SIN - 6.0 * COS}}
+
+FORCE_COLUMNS = ["Fx", "Fy", "Fz", "Mx", "My", "Mz"]
+
+
+@pytest.fixture
+def extraction(tmp_path):
+    """An extraction directory with the v1 beam properties and forces of the two rotated beams."""
+    properties = {"BeamNumber": pa.array(list(BEAM_AXES), pa.int32())}
+    for i, name in enumerate(BEAM_AXIS_COLUMNS):
+        properties[name] = pa.array([np.ravel(axes)[i] for axes in BEAM_AXES.values()], pa.float64())
+    pq.write_table(pa.table(properties), tmp_path / BEAM_PROPERTIES_FILE)
+
+    forces = {"ResultId": [f"{beam}-1-0.50" for beam in PRINCIPAL],
+              "BeamNumber": pa.array(list(PRINCIPAL), pa.int32()), "ResultCase": pa.array([1, 1], pa.int32()),
+              "ResultCaseName": ["1: ULS Combination 1"] * 2, "Position": [0.5, 0.5]}
+    for name in FORCE_COLUMNS:
+        forces[name] = pa.array([values[name] for values in PRINCIPAL.values()], pa.float64())
+    pq.write_table(pa.table(forces), tmp_path / BEAM_FORCES_FILE)
+    return tmp_path
+
+
+def _assert_global(table: pa.Table):
+    for name in FORCE_COLUMNS:
+        expected = [GLOBAL[beam][name] for beam in table["BeamNumber"].to_pylist()]
+        np.testing.assert_allclose(table[name].to_numpy(), expected, atol=1e-12, err_msg=name)
+
+
+def test_principal_to_global_with_rotated_axes(extraction):
+    axes = get_beam_axes(extraction / BEAM_PROPERTIES_FILE)
+    _assert_global(principal_to_global(pq.read_table(extraction / BEAM_FORCES_FILE), axes))
+
+
+def test_global_batches_with_rotated_axes(extraction):
+    _assert_global(pa.Table.from_batches(list(iter_global_beam_forces(extraction))))
+
+
+def test_global_view_with_rotated_axes(extraction):
+    conn = duckdb.connect()
+    create_global_beam_forces_view(conn, extraction)
+    _assert_global(conn.execute("SELECT * FROM global_beam_forces ORDER BY BeamNumber").to_arrow_table())
+
+
+def test_global_forces_keep_their_magnitude(extraction):
+    # A rotation keeps the length of every force and moment vector
+    axes = get_beam_axes(extraction / BEAM_PROPERTIES_FILE)
+    table = principal_to_global(pq.read_table(extraction / BEAM_FORCES_FILE), axes)
+    for names in (["Fx", "Fy", "Fz"], ["Mx", "My", "Mz"]):
+        principal = [np.linalg.norm([PRINCIPAL[beam][name] for name in names]) for beam in PRINCIPAL]
+        global_values = np.column_stack([table[name].to_numpy() for name in names])
+        np.testing.assert_allclose(np.linalg.norm(global_values, axis=1), principal)
@@ -0,0 +1,34 @@
+import numpy as np
+import pyarrow.parquet as pq
+
+import database_extraction as de
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+
+from conftest import get_output_options
+
+
+def _extract_reactions(st7_backend, model_files, directory, **options):
+    st7_backend(FakeSt7Backend(nodes=40, beams=10, plates=0, primary_combinations=3, restraint_interval=10,
+                               spring_interval=4))
+    de.extract_model_data(*model_files, directory, directory,
+                          output_options=get_output_options(ResultType.NODAL_REACTIONS), **options)
+    return pq.read_table(directory / ResultType.NODAL_REACTIONS.file_name)
+
+
+def test_reactions_include_restrained_and_spring_supported_nodes(st7_backend, model_files, tmp_path):
+    reactions = _extract_reactions(st7_backend, model_files, tmp_path / "supported")
+    nodes = sorted(set(reactions["NodeNumber"].to_pylist()))
+    restrained = list(range(1, 41, 10))
+    sprung = [node for node in range(4, 41, 4) if node not in restrained]
+    assert nodes == sorted(restrained + sprung)
+
+
+def test_supported_node_reactions_match_all_nodes(st7_backend, model_files, tmp_path):
+    supported = _extract_reactions(st7_backend, model_files, tmp_path / "supported")
+    every_node = _extract_reactions(st7_backend, model_files, tmp_path / "all", all_reaction_nodes=True)
+
+    components = ["Rx", "Ry", "Rz", "Rxx", "Ryy", "Rzz"]
+    values = np.column_stack([every_node[name].to_numpy() for name in components])
+    nonzero = every_node.filter(np.abs(values).max(axis=1) > 0)
+    assert nonzero["ResultId"].to_pylist() == supported["ResultId"].to_pylist()
@@ -0,0 +1,17 @@
+import database_extraction as de
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+
+from conftest import get_output_options
+
+RESULT_TYPES = (ResultType.NODAL_REACTIONS, ResultType.BEAM_FORCES, ResultType.BEAM_PROPERTIES)
+
+
+def test_parallel_rows_are_per_result_file(st7_backend, model_files, tmp_path):
+    # The shard processes are forked, so they inherit the fake backend
+    st7_backend(FakeSt7Backend(nodes=30, beams=20, plates=0, primary_combinations=5))
+    options = {"output_options": get_output_options(*RESULT_TYPES)}
+    serial = de.extract_model_data(*model_files, tmp_path / "scratch", tmp_path / "serial", **options)
+    parallel = de.extract_model_data_parallel(*model_files, tmp_path / "scratch", tmp_path / "parallel", workers=3,
+                                              **options)
+    assert parallel == serial
@@ -0,0 +1,100 @@
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+import database_extraction as de
+import St7API
+from database_extraction import ResultType
+from fake_st7_backend import FakeSt7Backend
+from parquet_views import STATION_INTERPOLATION_KEY
+
+from conftest import get_output_options
+
+OUTPUT_OPTIONS = get_output_options(ResultType.NODAL_REACTIONS, ResultType.BEAM_FORCES)
+FORCE_COLUMNS = ["Fx", "Fy", "Fz", "Mx", "My", "Mz"]
+
+
+def _get_backend(**options) -> FakeSt7Backend:
+    return FakeSt7Backend(**{"nodes": 40, "beams": 12, "plates": 0, "primary_combinations": 3, **options})
+
+
+class _MissingBeamBackend(FakeSt7Backend):
+    """A result file without results for beam 2, which the API only warns about."""
+
+    def St7GetResFileBeamStations(self, uID, beam, number_of_stations):
+        if beam == 2:
+            return St7API.ERR7_ResultIsNotAvailable
+        return super().St7GetResFileBeamStations(uID, beam, number_of_stations)
+
+    def St7GetResFileBeamResult(self, uID, result_type, beam, case, results):
+        if beam == 2:
+            return St7API.ERR7_ResultIsNotAvailable
+        return super().St7GetResFileBeamResult(uID, result_type, beam, case, results)
+
+
+@pytest.fixture
+def full_extraction(st7_backend, model_files, tmp_path):
+    """Extracts the model in full, writing the topology snapshot, and returns its beam forces."""
+    st7_backend(_get_backend())
+    directory = tmp_path / "full"
+    de.extract_model_data(*model_files, directory, directory, output_options=OUTPUT_OPTIONS, write_topology=True)
+    return directory, pq.read_table(directory / ResultType.BEAM_FORCES.file_name)
+
+
+def _extract_result_file(directory, model_files, **options):
+    de.extract_result_file_data(model_files[1], directory, output_options=OUTPUT_OPTIONS, **options)
+    return pq.read_table(directory / ResultType.BEAM_FORCES.file_name)
+
+
+def test_result_file_stations_match_full_extraction(st7_backend, model_files, full_extraction):
+    directory, full = full_extraction
+    beam_forces = _extract_result_file(directory, model_files)
+
+    assert beam_forces["ResultId"].to_pylist() == full["ResultId"].to_pylist()
+    for name in FORCE_COLUMNS:
+        np.testing.assert_allclose(beam_forces[name].to_numpy(), full[name].to_numpy())
+    assert STATION_INTERPOLATION_KEY not in beam_forces.schema.metadata
+
+
+def test_positions_between_stations_are_refused(st7_backend, model_files, full_extraction):
+    directory, _ = full_extraction
+    st7_backend(_get_backend(result_file_stations=3))
+    with pytest.raises(ValueError, match="not at the 3 stations"):
+        _extract_result_file(directory, model_files)
+
+
+def test_interpolated_stations_are_marked(st7_backend, model_files, full_extraction):
+    directory, full = full_extraction
+    st7_backend(_get_backend(result_file_stations=3))
+    beam_forces = _extract_result_file(directory, model_files, interpolate_stations=True)
+
+    assert beam_forces.schema.metadata[STATION_INTERPOLATION_KEY] == b"linear"
+    # The fake's forces vary linearly along the beams, so the interpolation is exact for them
+    for name in FORCE_COLUMNS:
+        np.testing.assert_allclose(beam_forces[name].to_numpy(), full[name].to_numpy())
+
+
+@pytest.mark.parametrize("options, total", [({"nodes": 41}, "40 nodes"), ({"beams": 11}, "12 beams"),
+                                            ({"primary_combinations": 4}, "3 result cases")])
+def test_result_file_must_match_topology(st7_backend, model_files, full_extraction, options, total):
+    directory, _ = full_extraction
+    beam_forces_file = directory / ResultType.BEAM_FORCES.file_name
+    modified = beam_forces_file.stat().st_mtime_ns
+
+    st7_backend(_get_backend(**options))
+    with pytest.raises(ValueError, match=total):
+        _extract_result_file(directory, model_files)
+    assert beam_forces_file.stat().st_mtime_ns == modified
+
+
+def test_missing_beam_results_are_zeroed(st7_backend, model_files, full_extraction):
+    directory, full = full_extraction
+    st7_backend(_MissingBeamBackend(nodes=40, beams=12, plates=0, primary_combinations=3))
+    beam_forces = _extract_result_file(directory, model_files)
+
+    values = np.column_stack([beam_forces[name].to_numpy() for name in FORCE_COLUMNS])
+    expected = np.column_stack([full[name].to_numpy() for name in FORCE_COLUMNS])
+    missing = beam_forces["BeamNumber"].to_numpy() == 2
+    assert missing.any()
+    assert not values[missing].any()
+    np.testing.assert_allclose(values[~missing], expected[~missing])
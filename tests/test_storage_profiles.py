@@ -0,0 +1,69 @@
+import duckdb
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import database_extraction as de
+from database_extraction import ResultType
+from parquet_views import result_source
+
+
+def _beam_forces(first_beam: int, fx: list) -> pa.Table:
+    rows = len(fx)
+    schema = ResultType.BEAM_FORCES.slim_schema
+    columns = {"BeamNumber": np.arange(first_beam, first_beam + rows, dtype=np.int32),
+               "ResultCase": np.ones(rows, dtype=np.int16), "Station": np.zeros(rows, dtype=np.int8),
+               "Fx": np.asarray(fx, dtype=np.float64)}
+    for name in ("Fy", "Fz", "Mx", "My", "Mz"):
+        columns[name] = np.full(rows, 1.23456)
+    return pa.table({f.name: pa.array(columns[f.name], f.type) for f in schema}, schema=schema)
+
+
+def _write(file_path, *tables) -> pa.Schema:
+    profile = de.get_storage_profile("archival")
+    with de._ProfiledWriter(file_path, profile.apply(tables[0].schema), profile) as writer:
+        for table in tables:
+            writer.write(table)
+    return writer.schema
+
+
+def test_archival_profile_stores_decimals_in_range(tmp_path):
+    file_path = tmp_path / "beam_forces.parquet"
+    _write(file_path, _beam_forces(1, [1.23456, -999_999.999]))
+
+    table = pq.read_table(file_path)
+    assert table.schema.field("Fx").type == pa.decimal128(9, 3)
+    assert [float(v) for v in table["Fx"].to_pylist()] == [1.235, -999_999.999]
+
+
+def test_archival_profile_falls_back_to_float_for_out_of_range_columns(tmp_path):
+    file_path = tmp_path / "beam_forces.parquet"
+    schema = _write(file_path, _beam_forces(1, [1.23456, 2.5]), _beam_forces(3, [2.5e6, -1.0]),
+                    _beam_forces(5, [np.nan, 3.0]))
+
+    table = pq.read_table(file_path)
+    assert schema.field("Fx").type == pa.float64()
+    assert table.schema.field("Fx").type == pa.float64()
+    assert table.schema.field("Fy").type == pa.decimal128(9, 3)
+    assert table.schema.metadata == schema.metadata
+    np.testing.assert_array_equal(table["Fx"].to_numpy()[:4], [1.235, 2.5, 2.5e6, -1.0])
+    assert np.isnan(table["Fx"].to_numpy()[4])
+    assert table["BeamNumber"].to_pylist() == list(range(1, 7))
+    assert pq.ParquetFile(file_path).num_row_groups == 3
+    assert not list(tmp_path.glob("*.narrow"))
+
+
+def test_parts_with_a_fallback_column_merge_and_read_as_float(tmp_path):
+    part_directory = tmp_path / "beam_forces_parts"
+    part_directory.mkdir()
+    _write(part_directory / "part-00001-00001.parquet", _beam_forces(1, [1.0, 2.0]))
+    _write(part_directory / "part-00002-00002.parquet", _beam_forces(3, [3.0e6, 4.0]))
+
+    scanned = duckdb.sql(f"SELECT Fx FROM {result_source(part_directory)} ORDER BY BeamNumber").fetchall()
+    assert [row[0] for row in scanned] == [1.0, 2.0, 3.0e6, 4.0]
+
+    file_path = tmp_path / "beam_forces.parquet"
+    assert de.merge_part_files(part_directory, file_path) == 4
+    table = pq.read_table(file_path)
+    assert table.schema.field("Fx").type == pa.float64()
+    assert table["Fx"].to_pylist() == [1.0, 2.0, 3.0e6, 4.0]
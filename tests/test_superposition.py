@@ -0,0 +1,62 @@
+import numpy as np
+import pyarrow.parquet as pq
+
+import database_extraction as de
+from database_extraction import CombinationSet, ResultType
+from fake_st7_backend import FakeSt7Backend
+
+from conftest import get_output_options
+
+SUPERPOSED_TYPES = (ResultType.BEAM_FORCES, ResultType.NODAL_REACTIONS, ResultType.BEAM_END_FORCES)
+
+
+def _combinations(number_of_combinations: int, number_of_primary_cases: int) -> CombinationSet:
+    """Combinations named as the fake backend names its secondary result cases."""
+    rng = np.random.default_rng(1)
+    factors = rng.choice([0.0, 0.9, 1.35, 1.5], size=(number_of_combinations, number_of_primary_cases))
+    case_numbers = range(number_of_primary_cases + 1, number_of_primary_cases + number_of_combinations + 1)
+    return CombinationSet(tuple(f"{case}: SLS Combination {case}" for case in case_numbers), factors)
+
+
+def _extract(st7_backend, model_files, directory, combinations, schema_version, **backend_options):
+    st7_backend(FakeSt7Backend(nodes=60, beams=40, plates=0, primary_combinations=4,
+                               combination_factors=combinations.factors, restraint_interval=5, **backend_options))
+    return de.extract_model_data(*model_files, directory, directory,
+                                 output_options=get_output_options(*SUPERPOSED_TYPES), schema_version=schema_version,
+                                 combinations=combinations if directory.name == "superposed" else None)
+
+
+def test_superposed_files_match_the_solved_combinations_row_for_row(st7_backend, model_files, tmp_path):
+    combinations = _combinations(6, 4)
+    for schema_version in (1, 2):
+        solved = _extract(st7_backend, model_files, tmp_path / f"v{schema_version}" / "solved", combinations,
+                          schema_version)
+        superposed = _extract(st7_backend, model_files, tmp_path / f"v{schema_version}" / "superposed",
+                              combinations, schema_version)
+        assert superposed == solved
+
+        for rt in SUPERPOSED_TYPES:
+            solved_table = pq.read_table(tmp_path / f"v{schema_version}" / "solved" / rt.file_name)
+            superposed_table = pq.read_table(tmp_path / f"v{schema_version}" / "superposed" / rt.file_name)
+            assert superposed_table.schema == solved_table.schema
+            assert superposed_table.num_rows == solved_table.num_rows
+
+            for name in solved_table.column_names:
+                solved_column = solved_table[name].to_numpy()
+                superposed_column = superposed_table[name].to_numpy()
+                if np.issubdtype(solved_column.dtype, np.floating):
+                    np.testing.assert_allclose(superposed_column, solved_column, rtol=1e-12, atol=1e-9)
+                else:
+                    np.testing.assert_array_equal(superposed_column, solved_column)
+
+
+def test_primary_cases_are_read_through_exactly(st7_backend, model_files, tmp_path):
+    combinations = _combinations(3, 4)
+    _extract(st7_backend, model_files, tmp_path / "solved", combinations, 1)
+    _extract(st7_backend, model_files, tmp_path / "superposed", combinations, 1)
+
+    filters = [("ResultCase", "<=", 4)]
+    solved = pq.read_table(tmp_path / "solved" / ResultType.BEAM_FORCES.file_name, filters=filters)
+    superposed = pq.read_table(tmp_path / "superposed" / ResultType.BEAM_FORCES.file_name, filters=filters)
+    assert superposed.num_rows == 4 * 40 * 5
+    assert superposed.equals(solved)